@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Audio output formats, to the ffmpeg muxer and encoder options they use
+AUDIO_FORMATS: dict[str, dict[str, str]] = {
+    "mp3": {"format": "mp3", "acodec": "libmp3lame", "q:a": "4"},
+    "m4a": {"format": "ipod", "acodec": "aac", "movflags": "+faststart"},
+    "aac": {"format": "adts", "acodec": "aac"},
+    "wav": {"format": "wav", "acodec": "pcm_s16le"},
+    "ogg": {"format": "ogg", "acodec": "libvorbis"},
+    "opus": {"format": "ogg", "acodec": "libopus"},
+}
+
+###############################################################################
+
+
+def is_audio_format(output_format: str) -> bool:
+    return output_format.lower() in AUDIO_FORMATS
+
+
+def clip_audio(
+    source: str,
+    start_time: str,
+    end_time: str,
+    output_path: Path,
+    output_format: str,
+    input_options: dict | None = None,
+) -> Path:
+    """
+    Clip the audio of a video to a time range.
+
+    Only the first audio stream is selected, so video packets are skipped
+    by the demuxer instead of being decoded, and only the requested time
+    range is encoded.
+
+    Parameters
+    ----------
+    source: str
+        Local path or URL of the session video, or of its audio stream
+    start_time: str
+        The start time of the clip in HH:MM:SS
+    end_time: str
+        The end time of the clip in HH:MM:SS
+    output_path: Path
+        The path to store the clip to
+    output_format: str
+        One of AUDIO_FORMATS
+    input_options: dict | None
+        ffmpeg options for reading source
+
+    Returns
+    -------
+    Path
+        The path the clip was stored to.
+
+    Raises
+    ------
+    ffmpeg.Error
+        If the source could not be read or clipped
+    """
+    import ffmpeg
+
+    audio = ffmpeg.input(source, ss=start_time, to=end_time, **(input_options or {}))
+    try:
+        (
+            ffmpeg.output(
+                audio["a:0"],
+                str(output_path),
+                **AUDIO_FORMATS[output_format.lower()],
+            ).run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        log.error(e.stderr)
+        raise
+
+    log.info(f"Finished clipping the audio of {source} to {output_path}")
+    return output_path
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+import struct
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Boxes on the way from moov to an h264 track's avcC,
+# to how many bytes of their own fields come before their child boxes
+AVCC_PARENTS = {
+    b"moov": 0,
+    b"trak": 0,
+    b"mdia": 0,
+    b"minf": 0,
+    b"stbl": 0,
+    b"stsd": 8,
+    b"avc1": 78,
+}
+
+# seq_parameter_set_id and pic_parameter_set_id are 0 to 31 and 0 to 255,
+# ids for new parameter sets are picked in the range both allow
+MAX_PARAMETER_SET_ID = 31
+
+###############################################################################
+
+
+class AvcConfig(NamedTuple):
+    """
+    AVCDecoderConfigurationRecord, the avcC box of an h264 mp4 track,
+    holding the parameter sets its samples are decoded with
+    """
+
+    profile: int
+    compatibility: int
+    level: int
+    length_size: int
+    sps: list[bytes]
+    pps: list[bytes]
+    # Chroma format, bit depths and SPS extensions of High profiles
+    extension: bytes = b""
+
+    @classmethod
+    def parse(cls, data: bytes) -> AvcConfig:
+        profile, compatibility, level, length_size, sps_count = data[1:6]
+        offset = 6
+        sps, offset = _read_nal_units(data, offset, sps_count & 0x1F)
+        pps, offset = _read_nal_units(data, offset + 1, data[offset])
+        return cls(
+            profile,
+            compatibility,
+            level,
+            (length_size & 0x03) + 1,
+            sps,
+            pps,
+            data[offset:],
+        )
+
+    def serialize(self) -> bytes:
+        data = bytes(
+            [
+                1,
+                self.profile,
+                self.compatibility,
+                self.level,
+                0xFC | (self.length_size - 1),
+                0xE0 | len(self.sps),
+            ]
+        )
+        data += b"".join(struct.pack(">H", len(nal)) + nal for nal in self.sps)
+        data += bytes([len(self.pps)])
+        data += b"".join(struct.pack(">H", len(nal)) + nal for nal in self.pps)
+        return data + self.extension
+
+    def get_parameter_set_ids(self) -> set[int]:
+        """
+        Ids of the SPS and PPS of the config
+        """
+        return {get_sps_id(nal) for nal in self.sps} | {
+            get_pps_id(nal) for nal in self.pps
+        }
+
+    def merge(self, other: AvcConfig) -> AvcConfig:
+        """
+        Config holding the parameter sets of both configs, so samples
+        encoded with either decode from it. Their ids must not overlap.
+        """
+        if self.get_parameter_set_ids() & other.get_parameter_set_ids():
+            raise ValueError("Parameter set ids overlap")
+
+        return self._replace(
+            # Constraint flags only hold if both encodings meet them
+            compatibility=self.compatibility & other.compatibility,
+            level=max(self.level, other.level),
+            sps=self.sps + other.sps,
+            pps=self.pps + other.pps,
+        )
+
+
+def _read_nal_units(data: bytes, offset: int, count: int) -> tuple[list[bytes], int]:
+    nal_units = []
+    for _ in range(count):
+        (size,) = struct.unpack_from(">H", data, offset)
+        start = offset + 2
+        offset = start + size
+        nal_units.append(data[start:offset])
+
+    return nal_units, offset
+
+
+def _read_ue(data: bytes, bit: int) -> int:
+    # Exp-Golomb coded unsigned integer starting at bit
+    def read_bit() -> int:
+        nonlocal bit
+        value = (data[bit // 8] >> (7 - bit % 8)) & 1
+        bit += 1
+        return value
+
+    zeros = 0
+    while not read_bit():
+        zeros += 1
+
+    value = 0
+    for _ in range(zeros):
+        value = value << 1 | read_bit()
+
+    return (1 << zeros) - 1 + value
+
+
+def _get_rbsp(nal: bytes) -> bytes:
+    # NAL unit payload without its header and emulation prevention bytes
+    return nal[1:].replace(b"\x00\x00\x03", b"\x00\x00")
+
+
+def get_sps_id(nal: bytes) -> int:
+    # seq_parameter_set_id follows profile_idc, the constraint flags and level_idc
+    return _read_ue(_get_rbsp(nal), 24)
+
+
+def get_pps_id(nal: bytes) -> int:
+    return _read_ue(_get_rbsp(nal), 0)
+
+
+def get_unused_parameter_set_id(config: AvcConfig) -> int:
+    """
+    Lowest id neither an SPS nor a PPS of config uses
+    """
+    return min(set(range(MAX_PARAMETER_SET_ID + 1)) - config.get_parameter_set_ids())
+
+
+###############################################################################
+
+
+def _iter_boxes(data: bytes) -> Iterator[tuple[bytes, bytes]]:
+    # (type, payload) of each box in data
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, offset + 8)
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+
+        start = offset + header_size
+        offset += size
+        yield box_type, data[start:offset]
+
+
+def _find_avcc(data: bytes) -> bytes | None:
+    for box_type, payload in _iter_boxes(data):
+        if box_type == b"avcC":
+            return payload
+        if box_type in AVCC_PARENTS:
+            fields = AVCC_PARENTS[box_type]
+            avcc = _find_avcc(payload[fields:])
+            if avcc is not None:
+                return avcc
+
+    return None
+
+
+def _replace_avcc(data: bytes, avcc: bytes) -> bytes:
+    boxes = []
+    for box_type, payload in _iter_boxes(data):
+        if box_type == b"avcC":
+            payload = avcc
+        elif box_type in AVCC_PARENTS:
+            fields = AVCC_PARENTS[box_type]
+            payload = payload[:fields] + _replace_avcc(payload[fields:], avcc)
+
+        boxes.append(struct.pack(">I4s", 8 + len(payload), box_type) + payload)
+
+    return b"".join(boxes)
+
+
+def _find_moov(path: Path) -> tuple[int, int, bool]:
+    # Offset and size of the moov box, and whether it is the last box
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        offset = 0
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            size, box_type = struct.unpack(">I4s", f.read(8))
+            if size == 1:
+                (size,) = struct.unpack(">Q", f.read(8))
+            elif size == 0:
+                size = file_size - offset
+
+            if box_type == b"moov":
+                return offset, size, offset + size == file_size
+            offset += size
+
+    raise ValueError(f"{path} has no moov box")
+
+
+def _read_moov(path: Path) -> tuple[bytes, int, bool]:
+    offset, size, is_last = _find_moov(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size), offset, is_last
+
+
+def read_avc_config(path: Path) -> AvcConfig | None:
+    """
+    The avcC of the first h264 track of an mp4 file
+
+    Returns
+    -------
+    AvcConfig | None
+        None if the file has no h264 track
+    """
+    moov, _, _ = _read_moov(path)
+    avcc = _find_avcc(moov)
+    return AvcConfig.parse(avcc) if avcc is not None else None
+
+
+def write_avc_config(path: Path, config: AvcConfig) -> None:
+    """
+    Replace the avcC of the h264 tracks of an mp4 file in place
+
+    Raises
+    ------
+    ValueError
+        If the moov box is not at the end of the file. Growing it would move
+        the media data the chunk offsets point to.
+    """
+    moov, offset, is_last = _read_moov(path)
+    if not is_last:
+        raise ValueError(f"The moov box of {path} is not at its end")
+
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(_replace_avcc(moov, config.serialize()))
+        f.truncate()
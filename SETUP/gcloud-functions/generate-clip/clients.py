@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+###############################################################################
+
+
+class LazyClient(Generic[T]):
+    """
+    A client created on first use and reused by every later invocation
+    on a warm instance.
+
+    Creation is thread-safe: concurrent first uses wait for one creation.
+    A failed creation is retried by the next use.
+
+    Parameters
+    ----------
+    factory: Callable[[], T]
+        Creates the client
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._client: T | None = None
+        self._created = False
+
+    def get(self) -> T:
+        # Reading the flag without the lock is safe once it is set
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._client = self._factory()
+                    self._created = True
+
+        return self._client  # type: ignore[return-value]
+
+    def reset(self) -> None:
+        """
+        Drop the client, the next use creates a new one
+        """
+        with self._lock:
+            self._client = None
+            self._created = False
+
+
+def warm_up(steps: Iterable[Callable[[], Any]]) -> None:
+    """
+    Run each step, creating clients and loading modules ahead of the
+    requests that need them. Failures are logged and left for the
+    requests to raise.
+    """
+    start = time.perf_counter()
+    for step in steps:
+        try:
+            step()
+        except Exception as e:
+            log.warning(f"Warm up step {step} failed. Exception: {e}")
+
+    log.info(f"Warmed up in {time.perf_counter() - start:.3f}s")
+
+
+def start_warm_up(steps: Iterable[Callable[[], Any]]) -> threading.Thread:
+    """
+    warm_up() in a daemon thread, so the instance starts serving right away
+    """
+    thread = threading.Thread(target=warm_up, args=(list(steps),), daemon=True)
+    thread.start()
+    return thread
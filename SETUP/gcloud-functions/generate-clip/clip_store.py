@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fsspec import AbstractFileSystem
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+CLIP_STORAGE = "GENERATED_CLIPS"
+
+# The bucket lifecycle rule deletes GENERATED_CLIPS/* after 3 days,
+# older clips are generated again rather than linked to shortly before
+CLIP_REUSE_MAX_AGE = timedelta(days=2)
+
+###############################################################################
+
+
+def get_clip_save_name(
+    session_id: str,
+    start_seconds: int,
+    end_seconds: int,
+    output_format: str,
+) -> str:
+    """
+    Storage path of a clip, the same for every request of the same clip.
+
+    Parameters
+    ----------
+    session_id: str
+        The session the clip is cut from
+    start_seconds: int
+        Clip start, in seconds into the session video
+    end_seconds: int
+        Clip end, in seconds into the session video
+    output_format: str
+        The requested output format
+
+    Returns
+    -------
+    str
+        The clip's path within the bucket
+    """
+    params = {
+        "session_id": session_id.strip(),
+        "start": start_seconds,
+        "end": end_seconds,
+        "format": output_format.strip().lstrip(".").lower(),
+    }
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"{CLIP_STORAGE}/{digest}"
+
+
+def get_reusable_clip_uri(
+    fs: AbstractFileSystem,
+    bucket: str,
+    save_name: str,
+    max_age: timedelta = CLIP_REUSE_MAX_AGE,
+) -> str | None:
+    """
+    gs:// URI of a clip generated earlier, if it is young enough to link to.
+
+    Returns
+    -------
+    str | None
+        None if the clip does not exist or is older than max_age
+    """
+    try:
+        info = fs.info(f"{bucket}/{save_name}")
+    except FileNotFoundError:
+        return None
+
+    created = info.get("timeCreated")
+    if created is not None:
+        age = datetime.now(timezone.utc) - datetime.strptime(
+            created, "%Y-%m-%dT%H:%M:%S.%f%z"
+        )
+        if age > max_age:
+            log.info(f"Clip {save_name} is {age} old, generating it again")
+            return None
+
+    return f"gs://{bucket}/{save_name}"
+
+
+def upload_clip(
+    fs: AbstractFileSystem,
+    bucket: str,
+    save_name: str,
+    filepath: str,
+) -> str:
+    """
+    Upload a clip, replacing a stored clip too old to link to.
+
+    Unlike file_store.functions.upload_file, this does not check whether
+    the clip exists first, get_reusable_clip_uri already did.
+
+    Returns
+    -------
+    str
+        The gs:// URI of the uploaded clip
+    """
+    fs.put_file(str(Path(filepath).resolve(strict=True)), f"{bucket}/{save_name}")
+    return f"gs://{bucket}/{save_name}"
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+###############################################################################
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="ffmpeg is not installed",
+)
+
+###############################################################################
+
+
+@pytest.fixture
+def sample_video(tmp_path: Path) -> Path:
+    """
+    Two minutes of h264 and aac, with a keyframe every two seconds
+    """
+    video = tmp_path / "session.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=120:size=640x360:rate=25",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=120",
+            "-c:v",
+            "libx264",
+            "-g",
+            "50",
+            "-sc_threshold",
+            "0",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            str(video),
+        ],
+        check=True,
+    )
+
+    return video
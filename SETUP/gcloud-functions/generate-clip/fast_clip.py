@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+import math
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+
+from avc_config import get_unused_parameter_set_id, read_avc_config, write_avc_config
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Output formats and source video codecs clips can be stream copied for
+COPYABLE_FORMATS = {"mp4"}
+COPYABLE_VIDEO_CODECS = {"h264"}
+
+# How far past the clip start the next keyframe is looked for
+MAX_GOP_SECONDS = 10
+
+# Frames a stream copy can end past its cut, as h264 decodes up to 16
+# frames ahead of the last one shown. Copies running longer are not trusted.
+MAX_REORDERED_FRAMES = 16
+# Frame duration assumed for sources without a frame rate
+DEFAULT_FRAME_SECONDS = 0.05
+
+# ffprobe profile names to the x264 profile the head is encoded with
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+}
+
+###############################################################################
+
+
+def _probe_video_stream(
+    source: str, input_options: dict
+) -> tuple[dict | None, Fraction]:
+    # The first video stream and the start time of the container,
+    # which -ss and the clip times are relative to
+    import ffmpeg
+
+    probe = ffmpeg.probe(source, select_streams="v:0", **input_options)
+    stream = probe["streams"][0] if probe["streams"] else None
+    return stream, Fraction(probe.get("format", {}).get("start_time") or 0)
+
+
+def _get_next_keyframe(
+    source: str,
+    start_seconds: float,
+    stream: dict,
+    start_time: Fraction,
+    input_options: dict,
+) -> Fraction | None:
+    import ffmpeg
+
+    # Only keyframes are decoded, and only around the clip start.
+    # Frame timestamps and read_intervals are in stream time,
+    # not relative to the container start time.
+    frames = ffmpeg.probe(
+        source,
+        select_streams="v:0",
+        skip_frame="nokey",
+        show_entries="frame=pts,best_effort_timestamp",
+        read_intervals=f"{float(start_time) + start_seconds:.6f}%+{MAX_GOP_SECONDS}",
+        **input_options,
+    ).get("frames", [])
+
+    # Exact times from the integer timestamps, the printed times are rounded
+    time_base = Fraction(stream["time_base"])
+    for frame in frames:
+        pts = frame.get("pts", frame.get("best_effort_timestamp"))
+        if pts is None:
+            continue
+
+        keyframe = pts * time_base - start_time
+        if keyframe >= start_seconds:
+            return keyframe
+
+    return None
+
+
+def _seek_time(seconds: Fraction) -> str:
+    # -ss reads microseconds, rounding up keeps the seek at or past
+    # the keyframe, and it is the last keyframe at or before the seek
+    microseconds = math.ceil(seconds * 1_000_000)
+    return f"{microseconds // 1_000_000}.{microseconds % 1_000_000:06d}"
+
+
+def _get_duration(path: str) -> float:
+    import ffmpeg
+
+    return float(ffmpeg.probe(path, select_streams="v:0")["streams"][0]["duration"])
+
+
+def stream_copy_clip(
+    source: str,
+    start_seconds: float,
+    end_seconds: float,
+    output_path: Path,
+    output_format: str,
+    input_options: dict | None = None,
+) -> Path | None:
+    """
+    Clip a video without re-encoding it where possible.
+
+    The video is stream copied from the first keyframe at or after the clip
+    start. Only the frames before that keyframe, at most one GOP, are
+    re-encoded, so the clip still starts on the requested frame.
+    Audio is always re-encoded, which is cheap next to video.
+
+    Parameters
+    ----------
+    source: str
+        Local path or URL of the session video
+    start_seconds: float
+        Clip start, in seconds into the session video
+    end_seconds: float
+        Clip end, in seconds into the session video
+    output_path: Path
+        The path to store the clip to
+    output_format: str
+        The requested output format
+    input_options: dict | None
+        ffmpeg and ffprobe options for reading source
+
+    Returns
+    -------
+    Path | None
+        The path the clip was stored to, None if the source or output format
+        can not be stream copied and the clip has to be fully re-encoded
+
+    Raises
+    ------
+    ffmpeg.Error
+        If the source could not be read or clipped
+    """
+    import ffmpeg
+
+    input_options = input_options or {}
+    if output_format.lower() not in COPYABLE_FORMATS:
+        return None
+
+    stream, start_time = _probe_video_stream(source, input_options)
+    if stream is None or stream.get("codec_name") not in COPYABLE_VIDEO_CODECS:
+        return None
+
+    frame_rate = Fraction(stream.get("avg_frame_rate") or "0/1")
+    frame_seconds = float(1 / frame_rate) if frame_rate else 0
+    # A keyframe up to half a frame before the start is the frame shown at it,
+    # timestamps rounded to the stream time base can put it just before
+    keyframe = _get_next_keyframe(
+        source, start_seconds - frame_seconds / 2, stream, start_time, input_options
+    )
+    if keyframe is None or keyframe >= end_seconds:
+        return None
+
+    head_seconds = float(keyframe - Fraction(start_seconds))
+    # A clip starting within half a frame of a keyframe is copied entirely
+    if head_seconds < frame_seconds / 2:
+        head_seconds = 0
+
+    log.info(
+        f"Stream copying {source} from {float(keyframe):.6f}s to {end_seconds}s, "
+        f"re-encoding {head_seconds:.3f}s before it"
+    )
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+        segments = []
+
+        # The copy starts on the keyframe the seek lands on, packets before
+        # the seek time are dropped rather than kept behind an edit list
+        tail = f"{tmp_dir}/tail.mp4"
+        tail_start = _seek_time(keyframe)
+        (
+            ffmpeg.input(
+                source,
+                ss=tail_start,
+                t=float(Fraction(end_seconds) - Fraction(tail_start)),
+                **input_options,
+            )
+            .output(tail, an=None, vcodec="copy", copypriorss=0)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+
+        if head_seconds:
+            # Without B-frames the head ends exactly where the tail starts.
+            # Its parameter sets get ids the source does not use, and the
+            # head's avcC holds both its own and the source's, which the
+            # concat demuxer passes on to the clip. Samples of either
+            # encoding then decode with the parameter sets of the sample
+            # entry, rather than only with ones sent in band.
+            source_config = read_avc_config(Path(tail))
+            if source_config is None:
+                return None
+
+            head = f"{tmp_dir}/head.mp4"
+            encode_options = {
+                "pix_fmt": stream.get("pix_fmt", "yuv420p"),
+                "x264-params": f"sps-id={get_unused_parameter_set_id(source_config)}",
+            }
+            if stream.get("profile") in X264_PROFILES:
+                encode_options["profile:v"] = X264_PROFILES[stream["profile"]]
+            (
+                ffmpeg.input(source, ss=start_seconds, t=head_seconds, **input_options)
+                .output(
+                    head,
+                    an=None,
+                    vcodec="libx264",
+                    preset="veryfast",
+                    crf=18,
+                    bf=0,
+                    **encode_options,
+                )
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+            write_avc_config(
+                Path(head), source_config.merge(read_avc_config(Path(head)))
+            )
+            segments.append(head)
+
+        segments.append(tail)
+
+        # Head and tail must make up the clip. Copying cuts at packets, so the
+        # tail can run a few reordered frames long. A copy started on an
+        # earlier keyframe would run a whole GOP long.
+        duration = sum(_get_duration(segment) for segment in segments)
+        frame_slack = frame_seconds or DEFAULT_FRAME_SECONDS
+        overrun = duration - (end_seconds - start_seconds)
+        if not -frame_slack <= overrun <= MAX_REORDERED_FRAMES * frame_slack:
+            log.warning(
+                f"Stream copied segments of {source} last {duration:.3f}s "
+                f"instead of {end_seconds - start_seconds}s, re-encoding instead"
+            )
+            return None
+
+        segment_list = Path(tmp_dir) / "segments.txt"
+        segment_list.write_text("".join(f"file '{path}'\n" for path in segments))
+
+        video = ffmpeg.input(str(segment_list), format="concat", safe=0)
+        audio = ffmpeg.input(source, ss=start_seconds, to=end_seconds, **input_options)
+        (
+            ffmpeg.output(
+                video["v"],
+                audio["a?"],
+                str(output_path),
+                t=end_seconds - start_seconds,
+                format=output_format,
+                vcodec="copy",
+                acodec="aac",
+                movflags="+faststart",
+            ).run(capture_stdout=True, capture_stderr=True)
+        )
+
+    return output_path
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from google.cloud import firestore
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_UNFINISHED = {JOB_QUEUED, JOB_RUNNING}
+
+# Firestore deletes job documents past their "expires" field
+# with the TTL policy set up by "just deploy-clip-jobs"
+JOB_TTL_SECONDS = 24 * 60 * 60
+
+# Firestore collection of the jobs of FirestoreJobStore
+JOB_COLLECTION = "clip_jobs"
+
+###############################################################################
+
+
+@dataclass
+class ClipJob:
+    """
+    State of an asynchronous clip request
+    """
+
+    job_id: str
+    params: dict[str, str]
+    status: str = JOB_QUEUED
+    # What a running job is doing, "clipping", "uploading", ...
+    stage: str | None = None
+    link: str | None = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class JobStore:
+    """
+    Where clip jobs are kept between submission and the last status request
+    """
+
+    def create(self, params: dict[str, str]) -> ClipJob:
+        job = ClipJob(job_id=uuid4().hex, params=params)
+        self._put(job)
+        return job
+
+    def get(self, job_id: str) -> ClipJob | None:
+        raise NotImplementedError()
+
+    def update(self, job_id: str, **fields: Any) -> ClipJob:
+        """
+        Set fields of a job
+
+        Raises
+        ------
+        KeyError
+            If there is no job with job_id
+        """
+        raise NotImplementedError()
+
+    def _put(self, job: ClipJob) -> None:
+        raise NotImplementedError()
+
+
+class MemoryJobStore(JobStore):
+    """
+    Jobs kept by the function instance, only for a single instance
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict[str, Any]] = {}
+
+    def get(self, job_id: str) -> ClipJob | None:
+        with self._lock:
+            data = self._jobs.get(job_id)
+            return ClipJob(**data) if data is not None else None
+
+    def update(self, job_id: str, **fields: Any) -> ClipJob:
+        with self._lock:
+            data = self._jobs[job_id]
+            data.update(fields, updated=time.time())
+            return ClipJob(**data)
+
+    def _put(self, job: ClipJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job.as_dict()
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Jobs kept in a SQLite database, shared by the processes of one machine
+
+    Parameters
+    ----------
+    path: str
+        Database file, or ":memory:"
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, data TEXT)"
+            )
+
+    def get(self, job_id: str) -> ClipJob | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+        return ClipJob(**json.loads(row[0])) if row is not None else None
+
+    def update(self, job_id: str, **fields: Any) -> ClipJob:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+
+            data = json.loads(row[0])
+            data.update(fields, updated=time.time())
+            self._connection.execute(
+                "UPDATE jobs SET data = ? WHERE job_id = ?", (json.dumps(data), job_id)
+            )
+
+        return ClipJob(**data)
+
+    def _put(self, job: ClipJob) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO jobs VALUES (?, ?)",
+                (job.job_id, json.dumps(job.as_dict())),
+            )
+
+
+class FirestoreJobStore(JobStore):
+    """
+    Jobs kept in Firestore, shared by every instance of the function
+
+    Parameters
+    ----------
+    client: firestore.Client
+        Client of the project's Firestore
+    """
+
+    def __init__(self, client: firestore.Client):
+        self._collection = client.collection(JOB_COLLECTION)
+
+    def get(self, job_id: str) -> ClipJob | None:
+        snapshot = self._collection.document(job_id).get()
+        if not snapshot.exists:
+            return None
+
+        data = snapshot.to_dict()
+        data.pop("expires", None)
+        return ClipJob(**data)
+
+    def update(self, job_id: str, **fields: Any) -> ClipJob:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self._collection.document(job_id).update({**fields, "updated": time.time()})
+        except NotFound:
+            raise KeyError(job_id)
+
+        return self.get(job_id)
+
+    def _put(self, job: ClipJob) -> None:
+        expires = datetime.fromtimestamp(job.created + JOB_TTL_SECONDS, timezone.utc)
+        self._collection.document(job.job_id).set({**job.as_dict(), "expires": expires})
+
+
+def get_job_store(
+    spec: str, get_firestore_client: Callable[[], firestore.Client]
+) -> JobStore:
+    """
+    JobStore for a CLIP_JOB_STORE setting
+
+    Parameters
+    ----------
+    spec: str
+        "firestore", "memory" or "sqlite:<database path>"
+    get_firestore_client: Callable[[], firestore.Client]
+        Returns the client of the Firestore store, only called for that one
+    """
+    if spec == "firestore":
+        return FirestoreJobStore(get_firestore_client())
+    if spec == "memory":
+        return MemoryJobStore()
+    if spec.startswith("sqlite:"):
+        return SQLiteJobStore(spec.removeprefix("sqlite:"))
+
+    raise ValueError(f"Unknown job store '{spec}'")
+
+
+def run_job(
+    store: JobStore,
+    job_id: str,
+    work: Callable[[Callable[[str], None]], str],
+) -> ClipJob:
+    """
+    Run a job, recording its progress and outcome in store
+
+    Parameters
+    ----------
+    store: JobStore
+        Store holding the job
+    job_id: str
+        The job to run
+    work: Callable[[Callable[[str], None]], str]
+        Does the job and returns the clip link.
+        It is passed a function reporting the stage the job is at.
+
+    Returns
+    -------
+    ClipJob
+        The finished job, done or failed
+    """
+    store.update(job_id, status=JOB_RUNNING)
+
+    def report_stage(stage: str) -> None:
+        store.update(job_id, stage=stage)
+
+    try:
+        link = work(report_stage)
+    except Exception as e:
+        log.error(f"Clip job {job_id} failed. Exception: {e!r}")
+        return store.update(
+            job_id, status=JOB_FAILED, stage=None, error=_get_error_message(e)
+        )
+
+    return store.update(job_id, status=JOB_DONE, stage=None, link=link)
+
+
+def _get_error_message(e: Exception) -> str:
+    # abort() raises werkzeug HTTPExceptions, whose repr only holds the status
+    description = getattr(e, "description", None)
+    if isinstance(description, str):
+        return description
+
+    return f"{type(e).__name__}: {e}"
+
+
+def fail_stale_job(store: JobStore, job: ClipJob, timeout: float) -> ClipJob:
+    """
+    Mark a job failed if it has not progressed in longer than the function
+    may run, as the instance running it stopped before it finished
+
+    Parameters
+    ----------
+    store: JobStore
+        Store holding the job
+    job: ClipJob
+        The job, as last read from store
+    timeout: float
+        Seconds the function may run for
+
+    Returns
+    -------
+    ClipJob
+        The job, failed if it was stale
+    """
+    if job.status not in JOB_UNFINISHED or time.time() - job.updated <= timeout:
+        return job
+
+    log.error(f"Clip job {job.job_id} stopped {job.status} at stage {job.stage}")
+    return store.update(
+        job.job_id,
+        status=JOB_FAILED,
+        stage=None,
+        error=f"The clip job stopped without finishing, while {job.status}",
+    )
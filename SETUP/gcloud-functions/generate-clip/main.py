@@ -3,25 +3,142 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import NoReturn
+from typing import TYPE_CHECKING, Callable, NoReturn
 from uuid import uuid4
 
 import functions_framework
-from flask import Request, abort, escape
+from flask import Request, Response, abort, escape, jsonify
 from werkzeug.datastructures import MultiDict
 
-from cdp_backend.file_store.functions import upload_file_and_return_link
-from cdp_backend.utils.file_utils import (
-    clip_and_reformat_video,
-    download_video_from_session_id,
+from audio_clip import clip_audio, is_audio_format
+from clients import LazyClient, start_warm_up
+from clip_store import get_clip_save_name, get_reusable_clip_uri, upload_clip
+from jobs import JobStore, fail_stale_job, get_job_store, run_job
+from fast_clip import stream_copy_clip
+from remote_source import (
+    clip_remote_video,
+    get_input_options,
+    RemoteSource,
+    get_remote_source,
+    get_session_video_uri,
 )
+from source_cache import SourceVideoCache
+
+if TYPE_CHECKING:
+    from gcsfs import GCSFileSystem
+    from google.cloud import firestore, storage
 
 ###############################################################################
 
-CLIP_STORAGE = "GENERATED_CLIPS"
 CREDENTIALS_PATH = "GOOGLE_CREDENTIALS.json"
 
+MAX_CLIP_SECONDS = 5 * 60
+
+# Ranges clipped by one generate_clips request, and how many at a time
+MAX_BATCH_RANGES = 20
+CLIP_WORKERS = int(os.environ.get("CLIP_WORKERS", 4))
+
+# Where clip_jobs keeps its jobs, "firestore", "memory" or "sqlite:<path>"
+CLIP_JOB_STORE = os.environ.get("CLIP_JOB_STORE", "firestore")
+# Seconds the function may run, the --timeout it is deployed with.
+# Jobs not updated for longer are reported failed.
+CLIP_JOB_TIMEOUT = int(os.environ.get("CLIP_JOB_TIMEOUT", 300))
+
+# Session videos are kept in /tmp, which counts against the function's memory
+SOURCE_VIDEO_DIR = "/tmp/source-videos"
+SOURCE_VIDEO_CACHE_BYTES = int(
+    os.environ.get("SOURCE_VIDEO_CACHE_BYTES", 512 * 1024 * 1024)
+)
+
+# Clip session videos over their URL, seeking with range requests,
+# instead of downloading them first
+SEEK_SOURCE_VIDEOS = os.environ.get("SEEK_SOURCE_VIDEOS", "true").lower() != "false"
+
+# Create the clients and load the clipping modules in the background
+# as soon as an instance starts, rather than in its first request
+WARM_UP_ON_START = os.environ.get("WARM_UP_ON_START", "true").lower() != "false"
+
+###############################################################################
+
+
+def _connect_firestore() -> firestore.Client:
+    # One client for the cdp_backend models, through fireo, and the job store
+    import fireo
+    from google.cloud import firestore
+
+    client = firestore.Client.from_service_account_json(CREDENTIALS_PATH)
+    fireo.connection(client=client)
+    return client
+
+
+def _create_storage_client() -> storage.Client:
+    from google.cloud import storage
+
+    return storage.Client.from_service_account_json(CREDENTIALS_PATH)
+
+
+def _create_file_system() -> GCSFileSystem:
+    from cdp_backend.file_store.functions import initialize_gcs_file_system
+
+    return initialize_gcs_file_system(CREDENTIALS_PATH)
+
+
+# Created once per instance and shared by its requests
+FIRESTORE: LazyClient[firestore.Client] = LazyClient(_connect_firestore)
+STORAGE: LazyClient[storage.Client] = LazyClient(_create_storage_client)
+FILE_SYSTEM: LazyClient[GCSFileSystem] = LazyClient(_create_file_system)
+CLIP_JOBS: LazyClient[JobStore] = LazyClient(
+    lambda: get_job_store(CLIP_JOB_STORE, FIRESTORE.get)
+)
+
+
+def _get_session_video_uri(session_id: str) -> str:
+    FIRESTORE.get()
+    return get_session_video_uri(session_id)
+
+
+def _download_session_video(session_id: str, dest: Path) -> str:
+    from cdp_backend.utils.file_utils import resource_copy
+
+    return resource_copy(_get_session_video_uri(session_id), dest)
+
+
+def _import_clip_modules() -> None:
+    import cdp_backend.utils.file_utils  # noqa: F401
+    import ffmpeg  # noqa: F401
+    import yt_dlp  # noqa: F401
+
+
+def warm_up() -> threading.Thread:
+    """
+    Create the shared clients and load the clipping modules in a
+    background thread. Requests arriving meanwhile wait for the clients
+    they need rather than creating their own.
+    """
+    return start_warm_up(
+        [
+            FIRESTORE.get,
+            STORAGE.get,
+            FILE_SYSTEM.get,
+            CLIP_JOBS.get,
+            _import_clip_modules,
+        ]
+    )
+
+
+SOURCE_VIDEOS = SourceVideoCache(
+    SOURCE_VIDEO_DIR, SOURCE_VIDEO_CACHE_BYTES, _download_session_video
+)
+
+JOB_WORKERS = ThreadPoolExecutor(max_workers=CLIP_WORKERS)
+
+if WARM_UP_ON_START:
+    warm_up()
+
 ###############################################################################
 
 
@@ -50,6 +167,229 @@ def _hhmmss_as_seconds(time_str: str) -> int | NoReturn:
         return abort(400)
 
 
+def _stream_copy(
+    session_id: str,
+    source: str,
+    start_time: str,
+    end_time: str,
+    local_clip: str,
+    output_format: str,
+    input_options: dict | None = None,
+) -> Path | None:
+    # Copy the clip rather than re-encoding it where the source allows,
+    # None if it has to be re-encoded
+    try:
+        return stream_copy_clip(
+            source=source,
+            start_seconds=_hhmmss_as_seconds(start_time),
+            end_seconds=_hhmmss_as_seconds(end_time),
+            output_path=Path(local_clip),
+            output_format=output_format,
+            input_options=input_options,
+        )
+    except Exception as e:
+        logging.warning(
+            f"Failed to stream copy the clip of session '{session_id}', "
+            f"re-encoding it instead. Exception: {e}",
+        )
+        Path(local_clip).unlink(missing_ok=True)
+        return None
+
+
+def _get_remote_source(
+    session_id: str, audio_only: bool = False
+) -> RemoteSource | None:
+    # None if the session video has to be downloaded,
+    # or is already cached locally
+    if not SEEK_SOURCE_VIDEOS or session_id in SOURCE_VIDEOS:
+        return None
+
+    try:
+        video_uri = _get_session_video_uri(session_id)
+        return get_remote_source(STORAGE.get, video_uri, audio_only)
+    except Exception as e:
+        logging.warning(
+            f"Failed to resolve the video of session '{session_id}', "
+            f"downloading it instead. Exception: {e}",
+        )
+        return None
+
+
+def _clip_remote_source(
+    session_id: str,
+    source: RemoteSource,
+    start_time: str,
+    end_time: str,
+    local_clip: str,
+    output_format: str,
+) -> Path | None:
+    # Clip without downloading the session video,
+    # None if it has to be downloaded instead
+    try:
+        if is_audio_format(output_format):
+            return clip_audio(
+                source=source.url,
+                start_time=start_time,
+                end_time=end_time,
+                output_path=Path(local_clip),
+                output_format=output_format,
+                input_options=get_input_options(source),
+            )
+
+        clip_path = _stream_copy(
+            session_id,
+            source.url,
+            start_time,
+            end_time,
+            local_clip,
+            output_format,
+            get_input_options(source),
+        )
+        if clip_path is not None:
+            return clip_path
+
+        return clip_remote_video(
+            source=source,
+            start_time=start_time,
+            end_time=end_time,
+            output_path=Path(local_clip),
+            output_format=output_format,
+        )
+    except Exception as e:
+        logging.warning(
+            f"Failed to clip the video of session '{session_id}' remotely, "
+            f"downloading it instead. Exception: {e}",
+        )
+        Path(local_clip).unlink(missing_ok=True)
+        return None
+
+
+def _clip_downloaded_source(
+    session_id: str,
+    start_time: str,
+    end_time: str,
+    local_clip: str,
+    output_format: str,
+) -> Path | NoReturn:
+    # Download the session video, or reuse the one an earlier
+    # or concurrent request downloaded
+    try:
+        local_video = SOURCE_VIDEOS.acquire(session_id)
+    except Exception as e:
+        logging.error(
+            f"Failed to download video from session id '{session_id}'. Exception: {e}",
+        )
+        return abort(400)
+
+    from cdp_backend.utils.file_utils import clip_and_reformat_video
+
+    # Clip it
+    try:
+        if is_audio_format(output_format):
+            clip_path = clip_audio(
+                source=str(local_video),
+                start_time=start_time,
+                end_time=end_time,
+                output_path=Path(local_clip),
+                output_format=output_format,
+            )
+        else:
+            clip_path = _stream_copy(
+                session_id,
+                str(local_video),
+                start_time,
+                end_time,
+                local_clip,
+                output_format,
+            ) or clip_and_reformat_video(
+                video_filepath=Path(local_video),
+                start_time=start_time,
+                end_time=end_time,
+                output_path=Path(local_clip),
+                output_format=output_format,
+            )
+    except Exception as e:
+        logging.error(
+            f"Failed to clip and reformat video "
+            f"(start: '{start_time}', end: '{end_time}', "
+            f"format: '{output_format}'). Exception: {e}",
+        )
+        Path(local_clip).unlink(missing_ok=True)
+        return abort(400)
+    finally:
+        SOURCE_VIDEOS.release(session_id)
+
+    return clip_path
+
+
+def _check_clip_range(start_time: str, end_time: str) -> tuple[int, int] | NoReturn:
+    # Check that user isn't asking for longer than 5 minutes
+    start_seconds = _hhmmss_as_seconds(start_time)
+    end_seconds = _hhmmss_as_seconds(end_time)
+    clip_duration = end_seconds - start_seconds
+    if clip_duration > MAX_CLIP_SECONDS:
+        logging.error("Requested clip duration exceeds allowed maximum.")
+        return abort(400)
+
+    return start_seconds, end_seconds
+
+
+def _generate_clip(
+    session_id: str,
+    get_source: Callable[[bool], RemoteSource | None],
+    start_time: str,
+    end_time: str,
+    output_format: str,
+    bucket_name: str,
+    report_stage: Callable[[str], None] = lambda stage: None,
+) -> str | NoReturn:
+    # Link to the clip, generated and uploaded unless an earlier request did
+    start_seconds, end_seconds = _check_clip_range(start_time, end_time)
+
+    # Identical requests share one stored clip
+    save_path = get_clip_save_name(
+        session_id, start_seconds, end_seconds, output_format
+    )
+
+    # Link to the clip an earlier request generated
+    try:
+        fs = FILE_SYSTEM.get()
+        clip_uri = get_reusable_clip_uri(fs, bucket_name, save_path)
+        if clip_uri is not None:
+            logging.info(f"Reusing clip {clip_uri}")
+            return str(fs.url(clip_uri))
+    except Exception as e:
+        logging.warning(f"Failed to look up clip '{save_path}'. Exception: {e}")
+
+    # Path to store the local clip
+    local_clip = f"/tmp/{uuid4()}"
+
+    report_stage("clipping")
+    clip_path = None
+    # Audio clips only need the audio stream, where the host serves it apart
+    source = get_source(is_audio_format(output_format))
+    if source is not None:
+        clip_path = _clip_remote_source(
+            session_id, source, start_time, end_time, local_clip, output_format
+        )
+    if clip_path is None:
+        clip_path = _clip_downloaded_source(
+            session_id, start_time, end_time, local_clip, output_format
+        )
+
+    # Upload, replacing a clip too old to link to
+    report_stage("uploading")
+    try:
+        fs = FILE_SYSTEM.get()
+        clip_uri = upload_clip(fs, bucket_name, save_path, str(clip_path))
+        return str(fs.url(clip_uri))
+    except Exception as e:
+        logging.error(f"Failed to upload and create HTTPS link. Exception: {e}")
+        return abort(400)
+    finally:
+        Path(clip_path).unlink(missing_ok=True)
+
+
 @functions_framework.http
 def generate_clip(request: Request) -> tuple[str, int, dict[str, str]] | NoReturn:
     """HTTP Cloud Function.
@@ -96,69 +436,223 @@ def generate_clip(request: Request) -> tuple[str, int, dict[str, str]] | NoRetur
     output_format = _unpack_param(request_json, request_args, "format")
     project_id = _unpack_param(request_json, request_args, "projectId")
 
-    # Check that user isn't asking for longer than 5 minutes
-    start_seconds = _hhmmss_as_seconds(start_time)
-    end_seconds = _hhmmss_as_seconds(end_time)
-    clip_duration = end_seconds - start_seconds
-    if clip_duration > (5 * 60):
-        logging.error("Requested clip duration exceeds allowed maximum.")
-        return abort(400)
+    _check_clip_range(start_time, end_time)
 
-    # Path to store the local full video
-    local_full_video = f"/tmp/{uuid4()}"
-    # Path to store the local clip
-    local_clip = f"/tmp/{uuid4()}"
+    # Format the project id to the bucket
+    bucket_name = f"{project_id}.appspot.com"
 
-    # Download the session video
-    try:
-        local_video = download_video_from_session_id(
-            credentials_file=CREDENTIALS_PATH,
-            session_id=session_id,
-            dest=local_full_video,
-        )
-    except Exception as e:
-        logging.error(
-            f"Failed to download video from session id '{session_id}'. Exception: {e}",
-        )
-        return abort(400)
+    return (
+        escape(
+            _generate_clip(
+                session_id,
+                lambda audio_only: _get_remote_source(session_id, audio_only),
+                start_time,
+                end_time,
+                output_format,
+                bucket_name,
+            )
+        ),
+        200,
+        headers,
+    )
 
-    # Clip it
-    try:
-        clip_path = clip_and_reformat_video(
-            video_filepath=Path(local_video),
-            start_time=start_time,
-            end_time=end_time,
-            output_path=Path(local_clip),
-            output_format=output_format,
-        )
-    except Exception as e:
-        logging.error(
-            f"Failed to clip and reformat video "
-            f"(start: '{start_time}', end: '{end_time}', "
-            f"format: '{output_format}'). Exception: {e}",
-        )
+
+class _BatchSource:
+    """
+    The session video of a generate_clips request, resolved once for all
+    ranges by the first one that is not stored yet. A video that has to be
+    downloaded is kept until the batch is done.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self._lock = threading.Lock()
+        # Resolved sources by whether they are audio only
+        self._sources: dict[bool, RemoteSource | None] = {}
+        self._pinned = False
+
+    def get(self, audio_only: bool = False) -> RemoteSource | None:
+        with self._lock:
+            if audio_only not in self._sources:
+                source = _get_remote_source(self.session_id, audio_only)
+                self._sources[audio_only] = source
+                if source is None and not self._pinned:
+                    try:
+                        SOURCE_VIDEOS.acquire(self.session_id)
+                        self._pinned = True
+                    except Exception as e:
+                        # Each range fails on its own download attempt
+                        logging.warning(
+                            f"Failed to download video from session id "
+                            f"'{self.session_id}'. Exception: {e}",
+                        )
+
+            return self._sources[audio_only]
+
+    def release(self) -> None:
+        with self._lock:
+            if self._pinned:
+                SOURCE_VIDEOS.release(self.session_id)
+                self._pinned = False
+
+
+@functions_framework.http
+def generate_clips(request: Request) -> tuple[Response, int, dict[str, str]] | NoReturn:
+    """HTTP Cloud Function clipping several ranges of one session.
+
+    The session video is resolved, or downloaded, once for all ranges,
+    which are clipped and uploaded by CLIP_WORKERS concurrent workers.
+
+    Parameters
+    ----------
+    request: flask.Request
+        The request object, with a JSON body holding "sessionId", "projectId"
+        and "ranges", a list of {"start": ..., "end": ..., "format": ...}.
+        <https://flask.palletsprojects.com/en/1.1.x/api/#incoming-request-data>
+
+    Returns
+    -------
+        The JSON list of links to the clips, in the order of "ranges".
+        <https://flask.palletsprojects.com/en/1.1.x/api/#flask.make_response>.
+    """
+    # Set CORS headers for the preflight request
+    if request.method == "OPTIONS":
+        # Allows POST requests from any origin with the Content-Type
+        # header and caches preflight response for an 3600s
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "POST",
+            "Access-Control-Allow-Headers": "Content-Type",
+            "Access-Control-Max-Age": "3600",
+        }
+
+        return ("", 204, headers)
+
+    # Set CORS headers for the main request
+    headers = {"Access-Control-Allow-Origin": "*"}
+
+    # Get args
+    request_json = request.get_json(silent=True)
+    request_args = request.args
+
+    # Unpack the params
+    session_id = _unpack_param(request_json, request_args, "sessionId")
+    project_id = _unpack_param(request_json, request_args, "projectId")
+    clip_ranges = request_json.get("ranges") if request_json else None
+    if (
+        not isinstance(clip_ranges, list)
+        or not clip_ranges
+        or len(clip_ranges) > MAX_BATCH_RANGES
+    ):
+        logging.error(f"Expected a list of 1 to {MAX_BATCH_RANGES} ranges")
         return abort(400)
 
+    # Every range is checked before any is clipped
+    ranges = []
+    for clip_range in clip_ranges:
+        if not isinstance(clip_range, dict):
+            logging.error(f"Range is not an object: {clip_range}")
+            return abort(400)
+
+        start_time = _unpack_param(clip_range, MultiDict(), "start")
+        end_time = _unpack_param(clip_range, MultiDict(), "end")
+        output_format = _unpack_param(clip_range, MultiDict(), "format")
+        _check_clip_range(start_time, end_time)
+        ranges.append((start_time, end_time, output_format))
+
     # Format the project id to the bucket
     bucket_name = f"{project_id}.appspot.com"
 
-    # Generate save name
-    save_path = f"{CLIP_STORAGE}/{uuid4()}"
-
-    # Generate the save name
+    batch_source = _BatchSource(session_id)
     try:
-        return (
-            escape(
-                upload_file_and_return_link(
-                    credentials_file=CREDENTIALS_PATH,
-                    bucket=bucket_name,
-                    filepath=str(clip_path),
-                    save_name=save_path,
+        with ThreadPoolExecutor(max_workers=CLIP_WORKERS) as pool:
+            links = list(
+                pool.map(
+                    lambda clip_range: _generate_clip(
+                        session_id, batch_source.get, *clip_range, bucket_name
+                    ),
+                    ranges,
                 )
-            ),
-            200,
-            headers,
-        )
-    except Exception as e:
-        logging.error(f"Failed to upload and create HTTPS link. Exception: {e}")
-        return abort(400)
+            )
+    finally:
+        batch_source.release()
+
+    return (jsonify(links), 200, headers)
+
+
+def _run_clip_job(job_id: str, params: dict[str, str]) -> None:
+    run_job(
+        CLIP_JOBS.get(),
+        job_id,
+        lambda report_stage: _generate_clip(
+            params["sessionId"],
+            lambda audio_only: _get_remote_source(params["sessionId"], audio_only),
+            params["start"],
+            params["end"],
+            params["format"],
+            f"{params['projectId']}.appspot.com",
+            report_stage,
+        ),
+    )
+
+
+@functions_framework.http
+def clip_jobs(request: Request) -> tuple[Response, int, dict[str, str]] | NoReturn:
+    """HTTP Cloud Function generating clips in the background.
+
+    A POST with the parameters of generate_clip submits a clip job and
+    returns it right away. A GET with a "jobId" returns the job's status,
+    stage and, once done, the link to the clip.
+
+    Parameters
+    ----------
+    request: flask.Request
+        The request object.
+        <https://flask.palletsprojects.com/en/1.1.x/api/#incoming-request-data>
+
+    Returns
+    -------
+        The job as JSON.
+        <https://flask.palletsprojects.com/en/1.1.x/api/#flask.make_response>.
+    """
+    # Set CORS headers for the preflight request
+    if request.method == "OPTIONS":
+        # Allows GET and POST requests from any origin with the Content-Type
+        # header and caches preflight response for an 3600s
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET, POST",
+            "Access-Control-Allow-Headers": "Content-Type",
+            "Access-Control-Max-Age": "3600",
+        }
+
+        return ("", 204, headers)
+
+    # Set CORS headers for the main request
+    headers = {"Access-Control-Allow-Origin": "*"}
+
+    # Get args
+    request_json = request.get_json(silent=True)
+    request_args = request.args
+
+    # Job status
+    if request.method == "GET":
+        job_id = _unpack_param(request_json, request_args, "jobId")
+        job = CLIP_JOBS.get().get(job_id)
+        if job is None:
+            logging.error(f"No clip job with id: '{job_id}'")
+            return abort(404)
+
+        job = fail_stale_job(CLIP_JOBS.get(), job, CLIP_JOB_TIMEOUT)
+        return (jsonify(job.as_dict()), 200, headers)
+
+    # Submit a job
+    params = {
+        param: _unpack_param(request_json, request_args, param)
+        for param in ("start", "end", "sessionId", "format", "projectId")
+    }
+    _check_clip_range(params["start"], params["end"])
+
+    job = CLIP_JOBS.get().create(params)
+    JOB_WORKERS.submit(_run_clip_job, job.job_id, params)
+    return (jsonify(job.as_dict()), 202, headers)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Signed URLs only need to outlive a single clip
+SIGNED_URL_EXPIRATION = timedelta(minutes=15)
+
+# Same format youtube_copy downloads, a single file served over https
+YOUTUBE_FORMAT = "mp4[protocol^=http]/mp4"
+# Audio only stream for audio clips
+YOUTUBE_AUDIO_FORMAT = f"bestaudio[protocol^=http]/{YOUTUBE_FORMAT}"
+
+###############################################################################
+
+
+class RemoteSource(NamedTuple):
+    """
+    A session video ffmpeg can read directly, seeking with range requests
+    """
+
+    url: str
+    headers: dict[str, str]
+
+
+def get_session_video_uri(session_id: str) -> str:
+    # The caller connects fireo to the database, once per instance
+    from cdp_backend.database import models as db_models
+
+    return db_models.Session.collection.get(session_id).video_uri
+
+
+def _get_signed_url(client: storage.Client, gs_uri: str) -> str:
+    bucket, _, name = gs_uri.removeprefix("gs://").partition("/")
+    return (
+        client.bucket(bucket)
+        .blob(name)
+        .generate_signed_url(
+            version="v4",
+            expiration=SIGNED_URL_EXPIRATION,
+            method="GET",
+        )
+    )
+
+
+def _get_youtube_dl_source(video_uri: str, audio_only: bool) -> RemoteSource:
+    from yt_dlp import YoutubeDL
+
+    ydl_opts = {
+        "format": YOUTUBE_AUDIO_FORMAT if audio_only else YOUTUBE_FORMAT,
+        "quiet": True,
+    }
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_uri, download=False)
+
+    return RemoteSource(info["url"], info.get("http_headers") or {})
+
+
+def get_remote_source(
+    get_storage_client: Callable[[], storage.Client],
+    video_uri: str,
+    audio_only: bool = False,
+) -> RemoteSource | None:
+    """
+    Resolve a session video_uri to a URL ffmpeg can seek in.
+
+    Parameters
+    ----------
+    get_storage_client: Callable[[], storage.Client]
+        Returns the client signing gs:// URIs, only called for those
+    video_uri: str
+        The video_uri of a session
+    audio_only: bool
+        Resolve to an audio only stream where the host serves one
+
+    Returns
+    -------
+    RemoteSource | None
+        None for sources that have to be downloaded first,
+        playlists and anything that is not served over gs:// or http(s)
+    """
+    if video_uri.startswith("gs://"):
+        return RemoteSource(_get_signed_url(get_storage_client(), video_uri), {})
+
+    if not video_uri.startswith(("http://", "https://")) or ".m3u8" in video_uri:
+        return None
+
+    if any(host in video_uri for host in ("youtube.com", "youtu.be", "vimeo.com")):
+        return _get_youtube_dl_source(video_uri, audio_only)
+
+    return RemoteSource(video_uri, {})
+
+
+def get_input_options(source: RemoteSource) -> dict[str, str | int]:
+    """
+    ffmpeg and ffprobe options for reading a remote source
+    """
+    options: dict[str, str | int] = {}
+    if source.url.startswith(("http://", "https://")):
+        # Range requests dropped mid clip are resumed where they stopped
+        options["reconnect"] = 1
+        options["reconnect_delay_max"] = 5
+    if source.headers:
+        options["headers"] = "".join(
+            f"{name}: {value}\r\n" for name, value in source.headers.items()
+        )
+
+    return options
+
+
+def clip_remote_video(
+    source: RemoteSource,
+    start_time: str,
+    end_time: str,
+    output_path: Path,
+    output_format: str = "mp4",
+) -> Path:
+    """
+    Clip and re-encode a remote video to a time range, the remote counterpart
+    of file_utils.clip_and_reformat_video.
+
+    Seeking happens on the input, so ffmpeg only fetches the byte ranges
+    of the container index and of the requested time range.
+
+    Returns
+    -------
+    Path
+        The path the clip was stored to.
+
+    Raises
+    ------
+    ffmpeg.Error
+        If the source could not be read or clipped
+    """
+    import ffmpeg
+
+    try:
+        (
+            ffmpeg.input(
+                source.url,
+                ss=start_time,
+                to=end_time,
+                **get_input_options(source),
+            )
+            .output(filename=str(output_path), format=output_format)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        log.error(e.stderr)
+        raise
+
+    log.info(f"Finished clipping {source.url} to {output_path}")
+    return output_path
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from uuid import uuid4
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class _Entry:
+    __slots__ = ("path", "size", "pins")
+
+    def __init__(self, path: Path, size: int, pins: int):
+        self.path = path
+        self.size = size
+        self.pins = pins
+
+
+class _Download:
+    __slots__ = ("done", "waiters", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.error: BaseException | None = None
+
+
+class SourceVideoCache:
+    """
+    Size-bounded LRU cache of session videos downloaded to a local directory.
+
+    Concurrent requests for the same session share one in-flight download.
+    A video is pinned while a request uses it and is only deleted once
+    unpinned, least recently used first, when the cache is over max_bytes.
+
+    Parameters
+    ----------
+    directory: str | Path
+        Directory the videos are downloaded to. Emptied on creation.
+    max_bytes: int
+        Total size of the unpinned videos kept for later requests
+    download: Callable[[str, Path], str | Path]
+        Downloads the video of a session_id to a destination path
+        and returns where it was actually saved
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        download: Callable[[str, Path], str | Path],
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._download = download
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._downloads: dict[str, _Download] = {}
+
+        # Files left by an earlier instance are not tracked
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._entries
+
+    def acquire(self, session_id: str) -> Path:
+        """
+        Local path of the session's video, downloading it if needed.
+        The video stays on disk until release(session_id) is called.
+
+        Raises
+        ------
+        Exception
+            Whatever the download raised, for every request sharing it
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                log.info(f"Reusing downloaded video of session '{session_id}'")
+                entry.pins += 1
+                self._entries.move_to_end(session_id)
+                return entry.path
+
+            in_flight = self._downloads.get(session_id)
+            if in_flight is not None:
+                in_flight.waiters += 1
+            else:
+                download = self._downloads[session_id] = _Download()
+
+        if in_flight is not None:
+            return self._wait(session_id, in_flight)
+
+        dest = self.directory / str(uuid4())
+        try:
+            path = Path(self._download(session_id, dest))
+            size = path.stat().st_size
+        except BaseException as e:
+            # Downloaders may add a suffix to dest
+            for partial in self.directory.glob(f"{dest.name}*"):
+                partial.unlink(missing_ok=True)
+
+            with self._lock:
+                del self._downloads[session_id]
+            download.error = e
+            download.done.set()
+            raise
+
+        with self._lock:
+            del self._downloads[session_id]
+            self._entries[session_id] = _Entry(path, size, 1 + download.waiters)
+            evicted = self._evict()
+        download.done.set()
+        self._delete(evicted)
+
+        return path
+
+    def _wait(self, session_id: str, download: _Download) -> Path:
+        log.info(f"Waiting for the in-flight download of session '{session_id}'")
+        download.done.wait()
+        if download.error is not None:
+            raise download.error
+
+        # The download pinned the entry for every waiter
+        with self._lock:
+            return self._entries[session_id].path
+
+    def release(self, session_id: str) -> None:
+        """
+        Unpin a video returned by acquire()
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                entry.pins -= 1
+            evicted = self._evict()
+        self._delete(evicted)
+
+    @contextmanager
+    def open(self, session_id: str) -> Iterator[Path]:
+        """
+        acquire() the session's video for the duration of the block
+        """
+        path = self.acquire(session_id)
+        try:
+            yield path
+        finally:
+            self.release(session_id)
+
+    def _evict(self) -> list[Path]:
+        # Called with the lock held, files are deleted after releasing it
+        total = sum(entry.size for entry in self._entries.values())
+        evicted = []
+        for session_id, entry in list(self._entries.items()):
+            if total <= self.max_bytes:
+                break
+            if entry.pins > 0:
+                continue
+
+            del self._entries[session_id]
+            total -= entry.size
+            evicted.append(entry.path)
+
+        return evicted
+
+    @staticmethod
+    def _delete(paths: list[Path]) -> None:
+        for path in paths:
+            log.info(f"Evicting cached source video {path}")
+            path.unlink(missing_ok=True)
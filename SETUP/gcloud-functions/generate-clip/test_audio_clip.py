@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from audio_clip import AUDIO_FORMATS, clip_audio, is_audio_format
+from conftest import requires_ffmpeg
+
+###############################################################################
+
+
+def test_is_audio_format() -> None:
+    assert is_audio_format("mp3")
+    assert is_audio_format("M4A")
+    assert not is_audio_format("mp4")
+    assert not is_audio_format("webm")
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("output_format", sorted(AUDIO_FORMATS))
+def test_clip_audio(sample_video: Path, tmp_path: Path, output_format: str) -> None:
+    import ffmpeg
+
+    clip = clip_audio(
+        str(sample_video),
+        "00:01:00",
+        "00:01:30",
+        tmp_path / f"clip.{output_format}",
+        output_format,
+    )
+
+    streams = ffmpeg.probe(str(clip))["streams"]
+    assert [stream["codec_type"] for stream in streams] == ["audio"]
+    duration = float(ffmpeg.probe(str(clip))["format"]["duration"])
+    assert duration == pytest.approx(30, abs=0.5)
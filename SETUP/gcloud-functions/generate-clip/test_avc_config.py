@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from avc_config import (
+    AvcConfig,
+    get_pps_id,
+    get_sps_id,
+    get_unused_parameter_set_id,
+    read_avc_config,
+    write_avc_config,
+)
+
+###############################################################################
+
+# SPS and PPS NAL units, up to their Exp-Golomb coded ids:
+# "1" is id 0, "010" id 1, "011" id 2
+SPS_0 = bytes([0x67, 0x64, 0x00, 0x1F, 0x80])
+PPS_0 = bytes([0x68, 0xC0])
+PPS_2 = bytes([0x68, 0x60])
+# An emulation prevention byte keeps level_idc 1 from reading as a start code
+SPS_1 = bytes([0x67, 0x00, 0x00, 0x03, 0x01, 0x40])
+
+###############################################################################
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mp4(config: AvcConfig, moov_last: bool = True) -> bytes:
+    avcc = _box(b"avcC", config.serialize())
+    avc1 = _box(b"avc1", b"\x01" * 78 + avcc)
+    stsd = _box(b"stsd", b"\x00" * 4 + struct.pack(">I", 1) + avc1)
+    trak = _box(
+        b"trak",
+        _box(b"tkhd", b"\x00" * 84) + _box(b"mdia", _box(b"minf", _box(b"stbl", stsd))),
+    )
+    moov = _box(b"moov", _box(b"mvhd", b"\x00" * 100) + trak)
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00")
+    mdat = _box(b"mdat", b"\xab" * 64)
+    return ftyp + (mdat + moov if moov_last else moov + mdat)
+
+
+def test_parameter_set_ids() -> None:
+    assert get_sps_id(SPS_0) == 0
+    assert get_sps_id(SPS_1) == 1
+    assert get_pps_id(PPS_0) == 0
+    assert get_pps_id(PPS_2) == 2
+
+
+def test_parse_serialize() -> None:
+    config = AvcConfig(0x64, 0x00, 0x1F, 4, [SPS_0], [PPS_0], b"\xfd\xf8\xf8\x00")
+
+    assert AvcConfig.parse(config.serialize()) == config
+    assert config.get_parameter_set_ids() == {0}
+    assert get_unused_parameter_set_id(config) == 1
+
+
+def test_merge() -> None:
+    source = AvcConfig(0x64, 0x40, 0x1F, 4, [SPS_0], [PPS_0])
+    head = AvcConfig(0x64, 0x00, 0x28, 4, [SPS_1], [PPS_2])
+
+    merged = source.merge(head)
+    assert merged.sps == [SPS_0, SPS_1]
+    assert merged.pps == [PPS_0, PPS_2]
+    assert merged.compatibility == 0x00
+    assert merged.level == 0x28
+    assert merged.get_parameter_set_ids() == {0, 1, 2}
+
+    with pytest.raises(ValueError):
+        source.merge(source)
+
+
+def test_write_avc_config(tmp_path: Path) -> None:
+    source = AvcConfig(0x64, 0x00, 0x1F, 4, [SPS_0], [PPS_0])
+    merged = source.merge(AvcConfig(0x64, 0x00, 0x1F, 4, [SPS_1], [PPS_2]))
+    path = tmp_path / "head.mp4"
+    path.write_bytes(_mp4(source))
+    assert read_avc_config(path) == source
+
+    # The moov box grows in place, everything before it is untouched
+    write_avc_config(path, merged)
+    assert read_avc_config(path) == merged
+    assert path.read_bytes() == _mp4(merged)
+
+    # Growing a moov box before the media data would move the samples
+    path.write_bytes(_mp4(source, moov_last=False))
+    with pytest.raises(ValueError):
+        write_avc_config(path, merged)
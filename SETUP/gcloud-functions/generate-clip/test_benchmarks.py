@@ -0,0 +1,173 @@
+"""
+Cold start and per request timings of the clients the clip function uses,
+against fake service account credentials and in memory storage.
+
+pytest test_benchmarks.py
+
+Nothing leaves the machine: creating the Firestore and Storage clients and
+signing URLs is local, and clips are stored in an fsspec MemoryFileSystem.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from clients import LazyClient
+from clip_store import get_clip_save_name, get_reusable_clip_uri, upload_clip
+from remote_source import get_remote_source
+
+pytest.importorskip("pytest_benchmark")
+
+###############################################################################
+
+BUCKET = "fake-project.appspot.com"
+SESSION_VIDEO = f"gs://{BUCKET}/session.mp4"
+
+###############################################################################
+
+
+@pytest.fixture(scope="module")
+def credentials_file(tmp_path_factory: pytest.TempPathFactory) -> str:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = tmp_path_factory.mktemp("credentials") / "GOOGLE_CREDENTIALS.json"
+    path.write_text(
+        json.dumps(
+            {
+                "type": "service_account",
+                "project_id": "fake-project",
+                "private_key_id": "fake",
+                "private_key": key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption(),
+                ).decode(),
+                "client_email": "clips@fake-project.iam.gserviceaccount.com",
+                "client_id": "1",
+                "token_uri": "https://oauth2.googleapis.com/token",
+            }
+        )
+    )
+    return str(path)
+
+
+@pytest.fixture
+def clip(tmp_path: Path) -> Path:
+    path = tmp_path / "clip"
+    path.write_bytes(b"\0" * 1024)
+    return path
+
+
+def _connect_firestore(credentials_file: str) -> Any:
+    import fireo
+    from google.cloud import firestore
+
+    client = firestore.Client.from_service_account_json(credentials_file)
+    fireo.connection(client=client)
+    return client
+
+
+def _create_storage_client(credentials_file: str) -> Any:
+    from google.cloud import storage
+
+    return storage.Client.from_service_account_json(credentials_file)
+
+
+def _request(
+    get_firestore: Callable[[], Any],
+    get_storage: Callable[[], Any],
+    fs: Any,
+    clip: Path,
+    start_seconds: int,
+) -> str:
+    # What a generate_clip request does besides clipping:
+    # connect the database, sign the session video, look up and upload the clip
+    get_firestore()
+    assert get_remote_source(get_storage, SESSION_VIDEO) is not None
+
+    save_name = get_clip_save_name("session", start_seconds, start_seconds + 30, "mp4")
+    if get_reusable_clip_uri(fs, BUCKET, save_name) is None:
+        upload_clip(fs, BUCKET, save_name, str(clip))
+
+    return save_name
+
+
+def test_cold_import(benchmark: Any) -> None:
+    # Modules loaded before an instance serves, cdp_backend and the
+    # Google clients are only loaded by the warm up or the first request
+    code = (
+        "import audio_clip, clients, clip_store, fast_clip, jobs, "
+        "remote_source, source_cache"
+    )
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", code],),
+        kwargs={"check": True, "cwd": Path(__file__).parent},
+        rounds=3,
+    )
+
+
+def test_cold_clients(benchmark: Any, credentials_file: str) -> None:
+    # Loading and creating every client, what warm_up() does ahead of requests
+    code = "\n".join(
+        [
+            f"credentials_file = {credentials_file!r}",
+            "import fireo",
+            "from google.cloud import firestore, storage",
+            "from cdp_backend.file_store.functions import initialize_gcs_file_system",
+            "client = firestore.Client.from_service_account_json(credentials_file)",
+            "fireo.connection(client=client)",
+            "storage.Client.from_service_account_json(credentials_file)",
+            "initialize_gcs_file_system(credentials_file)",
+        ]
+    )
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", code],),
+        kwargs={"check": True, "cwd": Path(__file__).parent},
+        rounds=3,
+    )
+
+
+def test_request_new_clients(benchmark: Any, credentials_file: str, clip: Path) -> None:
+    from fsspec.implementations.memory import MemoryFileSystem
+
+    # Every request connecting the database and creating a storage client
+    fs = MemoryFileSystem()
+    rounds = iter(range(10_000))
+    benchmark.pedantic(
+        lambda: _request(
+            lambda: _connect_firestore(credentials_file),
+            lambda: _create_storage_client(credentials_file),
+            fs,
+            clip,
+            next(rounds),
+        ),
+        rounds=20,
+        warmup_rounds=1,
+    )
+
+
+def test_request_shared_clients(
+    benchmark: Any, credentials_file: str, clip: Path
+) -> None:
+    from fsspec.implementations.memory import MemoryFileSystem
+
+    # Requests on a warm instance, sharing the clients created once
+    firestore = LazyClient(lambda: _connect_firestore(credentials_file))
+    storage = LazyClient(lambda: _create_storage_client(credentials_file))
+    fs = MemoryFileSystem()
+    rounds = iter(range(10_000))
+    benchmark.pedantic(
+        lambda: _request(firestore.get, storage.get, fs, clip, next(rounds)),
+        rounds=20,
+        warmup_rounds=1,
+    )
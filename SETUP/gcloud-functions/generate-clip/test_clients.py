@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from clients import LazyClient, start_warm_up, warm_up
+
+###############################################################################
+
+
+class CountingFactory:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self) -> object:
+        self.calls += 1
+        time.sleep(self.delay)
+        return object()
+
+
+def test_lazy_client_created_once() -> None:
+    factory = CountingFactory(delay=0.05)
+    client = LazyClient(factory)
+    assert factory.calls == 0
+
+    # Concurrent first uses wait for the one creation
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: client.get(), range(16)))
+
+    assert factory.calls == 1
+    assert all(c is clients[0] for c in clients)
+    assert client.get() is clients[0]
+
+    client.reset()
+    assert client.get() is not clients[0]
+    assert factory.calls == 2
+
+
+def test_lazy_client_retries_failed_creation() -> None:
+    attempts = []
+
+    def factory() -> str:
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise ConnectionError("unavailable")
+        return "client"
+
+    client = LazyClient(factory)
+    with pytest.raises(ConnectionError):
+        client.get()
+
+    assert client.get() == "client"
+    assert len(attempts) == 2
+
+
+def test_warm_up() -> None:
+    factory = CountingFactory()
+    client = LazyClient(factory)
+
+    def fail() -> None:
+        raise ConnectionError("unavailable")
+
+    # A failing step does not stop the others
+    warm_up([fail, client.get])
+    assert factory.calls == 1
+
+    started = threading.Event()
+    thread = start_warm_up([started.set])
+    thread.join(timeout=5)
+    assert started.is_set()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from clip_store import (
+    CLIP_STORAGE,
+    get_clip_save_name,
+    get_reusable_clip_uri,
+    upload_clip,
+)
+
+###############################################################################
+
+
+class FakeFileSystem:
+    def __init__(self, objects: dict[str, datetime]):
+        self.objects = objects
+
+    def info(self, path: str) -> dict:
+        if path not in self.objects:
+            raise FileNotFoundError(path)
+
+        created = self.objects[path].strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        return {"name": path, "timeCreated": created}
+
+
+def test_get_clip_save_name() -> None:
+    save_name = get_clip_save_name("abc", 60, 90, "mp4")
+
+    assert save_name.startswith(f"{CLIP_STORAGE}/")
+    assert get_clip_save_name(" abc ", 60, 90, ".MP4") == save_name
+    assert get_clip_save_name("abc", 60, 91, "mp4") != save_name
+    assert get_clip_save_name("abc", 60, 90, "mp3") != save_name
+    assert get_clip_save_name("abcd", 60, 90, "mp4") != save_name
+
+
+def test_get_reusable_clip_uri() -> None:
+    now = datetime.now(timezone.utc)
+    fs = FakeFileSystem(
+        {
+            "bucket/GENERATED_CLIPS/new": now - timedelta(hours=1),
+            "bucket/GENERATED_CLIPS/old": now - timedelta(days=2, hours=1),
+        }
+    )
+
+    assert (
+        get_reusable_clip_uri(fs, "bucket", "GENERATED_CLIPS/new")
+        == "gs://bucket/GENERATED_CLIPS/new"
+    )
+    assert get_reusable_clip_uri(fs, "bucket", "GENERATED_CLIPS/old") is None
+    assert get_reusable_clip_uri(fs, "bucket", "GENERATED_CLIPS/missing") is None
+
+
+def test_upload_clip(tmp_path: Path) -> None:
+    from fsspec.implementations.memory import MemoryFileSystem
+
+    clip = tmp_path / "clip"
+    clip.write_bytes(b"clip")
+    fs = MemoryFileSystem()
+
+    uri = upload_clip(fs, "bucket", "GENERATED_CLIPS/new", str(clip))
+    assert uri == "gs://bucket/GENERATED_CLIPS/new"
+    assert fs.cat("bucket/GENERATED_CLIPS/new") == b"clip"
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import fast_clip
+from avc_config import read_avc_config
+from conftest import requires_ffmpeg
+
+###############################################################################
+
+
+def test_incompatible_sources_not_copied(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(
+        fast_clip, "_probe_video_stream", lambda *args: ({"codec_name": "vp9"}, 0)
+    )
+    monkeypatch.setattr(fast_clip, "_get_next_keyframe", lambda *args: 2)
+
+    clip = tmp_path / "clip.mp4"
+    assert fast_clip.stream_copy_clip("session.webm", 1, 5, clip, "mp4") is None
+    assert fast_clip.stream_copy_clip("session.mp4", 1, 5, clip, "webm") is None
+
+
+@pytest.fixture
+def shifted_video(sample_video: Path) -> Path:
+    """
+    The sample video with a container start time, as streams recorded
+    from a live broadcast often have
+    """
+    video = sample_video.with_name("shifted.mp4")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-i",
+            str(sample_video),
+            "-c",
+            "copy",
+            "-output_ts_offset",
+            "1.234567",
+            str(video),
+        ],
+        check=True,
+    )
+
+    return video
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("source", ["sample_video", "shifted_video"])
+@pytest.mark.parametrize("start_seconds", [60, 61, 61.5, 61.9])
+def test_stream_copy_clip(
+    request: pytest.FixtureRequest,
+    tmp_path: Path,
+    source: str,
+    start_seconds: float,
+) -> None:
+    import ffmpeg
+
+    video = request.getfixturevalue(source)
+    clip = fast_clip.stream_copy_clip(
+        str(video), start_seconds, start_seconds + 10, tmp_path / "c.mp4", "mp4"
+    )
+    assert clip is not None
+
+    duration = float(ffmpeg.probe(str(clip))["format"]["duration"])
+    assert duration == pytest.approx(10, abs=0.2)
+
+    # A re-encoded head is described by the clip's sample entry
+    # next to the source's parameter sets it switches to
+    config = read_avc_config(clip)
+    assert config is not None
+    probe = ffmpeg.probe(str(video), select_streams="v:0")
+    # Keyframes are two seconds apart from the video stream start,
+    # which audio priming can put past the container start
+    first_keyframe = float(probe["streams"][0]["start_time"]) - float(
+        probe["format"]["start_time"]
+    )
+    head_seconds = (first_keyframe - start_seconds) % 2
+    copied = head_seconds < 0.02 or head_seconds > 2 - 0.02
+    assert len(config.sps) == (1 if copied else 2)
+
+    # The re-encoded head and copied tail decode without errors
+    decoded = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(clip), "-f", "null", "-"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert decoded.stderr == ""
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_TTL_SECONDS,
+    FirestoreJobStore,
+    JobStore,
+    MemoryJobStore,
+    SQLiteJobStore,
+    fail_stale_job,
+    get_job_store,
+    run_job,
+)
+
+###############################################################################
+
+PARAMS = {"sessionId": "abc", "start": "00:01:00", "end": "00:01:30"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> JobStore:
+    if request.param == "memory":
+        return MemoryJobStore()
+
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def test_job_store(store: JobStore) -> None:
+    job = store.create(PARAMS)
+    assert job.status == JOB_QUEUED
+    assert store.get(job.job_id) == job
+    assert store.get("missing") is None
+
+    updated = store.update(job.job_id, stage="clipping")
+    assert updated.stage == "clipping"
+    assert updated.params == PARAMS
+    assert store.get(job.job_id) == updated
+
+    with pytest.raises(KeyError):
+        store.update("missing", stage="clipping")
+
+
+def test_run_job(store: JobStore) -> None:
+    stages = []
+
+    def work(report_stage: Callable[[str], None]) -> str:
+        for stage in ("clipping", "uploading"):
+            report_stage(stage)
+            stages.append(store.get(job.job_id).stage)
+        return "https://storage.googleapis.com/clip"
+
+    job = store.create(PARAMS)
+    done = run_job(store, job.job_id, work)
+
+    assert stages == ["clipping", "uploading"]
+    assert done.status == JOB_DONE
+    assert done.link == "https://storage.googleapis.com/clip"
+    assert store.get(job.job_id) == done
+
+
+def test_run_failing_job(store: JobStore) -> None:
+    def work(report_stage: Callable[[str], None]) -> str:
+        report_stage("clipping")
+        raise RuntimeError("ffmpeg failed")
+
+    job = store.create(PARAMS)
+    failed = run_job(store, job.job_id, work)
+
+    assert failed.status == JOB_FAILED
+    assert failed.stage is None
+    assert failed.error == "RuntimeError: ffmpeg failed"
+
+
+def test_run_aborted_job(store: JobStore) -> None:
+    exceptions = pytest.importorskip("werkzeug.exceptions")
+
+    def work(report_stage: Callable[[str], None]) -> str:
+        raise exceptions.BadRequest()
+
+    job = store.create(PARAMS)
+    failed = run_job(store, job.job_id, work)
+
+    # The description of the abort, not "<BadRequest '400: Bad Request'>"
+    assert failed.error == exceptions.BadRequest.description
+
+
+def test_fail_stale_job(store: JobStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    job = store.create(PARAMS)
+    running = store.update(job.job_id, status=JOB_RUNNING, stage="clipping")
+    assert fail_stale_job(store, running, timeout=300) == running
+
+    # The instance stopped, the job was not updated for longer than it may run
+    later = time.time() + 301
+    monkeypatch.setattr(time, "time", lambda: later)
+    failed = fail_stale_job(store, running, timeout=300)
+
+    assert failed.status == JOB_FAILED
+    assert failed.stage is None
+    assert "running" in failed.error
+    assert store.get(job.job_id) == failed
+
+    # Finished jobs are kept as they are
+    assert fail_stale_job(store, failed, timeout=300) == failed
+
+
+class FakeDocument:
+    def __init__(self, documents: dict[str, dict[str, Any]], document_id: str):
+        self.documents = documents
+        self.id = document_id
+
+    @property
+    def exists(self) -> bool:
+        return self.id in self.documents
+
+    def get(self) -> FakeDocument:
+        return self
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self.documents[self.id])
+
+    def set(self, data: dict[str, Any]) -> None:
+        self.documents[self.id] = dict(data)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.documents: dict[str, dict[str, Any]] = {}
+
+    def collection(self, name: str) -> FakeFirestore:
+        return self
+
+    def document(self, document_id: str) -> FakeDocument:
+        return FakeDocument(self.documents, document_id)
+
+
+def test_firestore_job_expires() -> None:
+    client = FakeFirestore()
+    store = FirestoreJobStore(client)
+    job = store.create(PARAMS)
+
+    # Firestore TTL policies delete documents past a timestamp field
+    expires = client.documents[job.job_id]["expires"]
+    assert expires == datetime.fromtimestamp(
+        job.created + JOB_TTL_SECONDS, timezone.utc
+    )
+    assert store.get(job.job_id) == job
+
+
+def _no_firestore_client() -> None:
+    raise AssertionError("Only the Firestore store connects to Firestore")
+
+
+def test_sqlite_jobs_shared(tmp_path: Path) -> None:
+    database = tmp_path / "jobs.db"
+    job = get_job_store(f"sqlite:{database}", _no_firestore_client).create(PARAMS)
+
+    assert SQLiteJobStore(str(database)).get(job.job_id) == job
+    with pytest.raises(ValueError):
+        get_job_store("redis", _no_firestore_client)
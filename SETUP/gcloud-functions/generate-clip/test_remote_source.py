@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from conftest import requires_ffmpeg
+from remote_source import RemoteSource, clip_remote_video, get_remote_source
+
+###############################################################################
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler answering range requests like GCS does
+    """
+
+    bytes_sent = 0
+    max_range = 16 * 1024
+
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match is None:
+            return super().send_head()
+
+        path = Path(self.translate_path(self.path))
+        size = path.stat().st_size
+        start = int(match[1])
+        # Open ended ranges are answered in chunks, so that bytes_sent
+        # counts what the client read rather than what fit in socket buffers
+        end = min(int(match[2] or size - 1), start + self.max_range - 1, size - 1)
+
+        self.send_response(206)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        f = path.open("rb")
+        f.seek(start)
+        self.range_left = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        left = getattr(self, "range_left", None)
+        while left is None or left > 0:
+            chunk = source.read(64 * 1024 if left is None else min(left, 64 * 1024))
+            if not chunk:
+                break
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                break
+            type(self).bytes_sent += len(chunk)
+            if left is not None:
+                left -= len(chunk)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sample_video_url(sample_video: Path) -> Iterator[str]:
+    RangeRequestHandler.bytes_sent = 0
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        lambda *args: RangeRequestHandler(*args, directory=str(sample_video.parent)),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/{sample_video.name}"
+    finally:
+        server.shutdown()
+
+
+###############################################################################
+
+
+def _no_storage_client() -> None:
+    raise AssertionError("Only gs:// URIs are signed")
+
+
+def test_get_remote_source() -> None:
+    url = "https://storage.googleapis.com/bucket/session.mp4"
+    assert get_remote_source(_no_storage_client, url) == RemoteSource(url, {})
+    assert get_remote_source(_no_storage_client, "https://host/index.m3u8") is None
+    assert get_remote_source(_no_storage_client, "/tmp/session.mp4") is None
+
+
+@requires_ffmpeg
+def test_clip_remote_video(
+    sample_video: Path, sample_video_url: str, tmp_path: Path
+) -> None:
+    import ffmpeg
+
+    clip = clip_remote_video(
+        RemoteSource(sample_video_url, {}),
+        "00:01:00",
+        "00:01:05",
+        tmp_path / "clip.mp4",
+    )
+
+    duration = float(ffmpeg.probe(str(clip))["format"]["duration"])
+    assert 4 <= duration <= 7
+    # Only the ranges around the clip were fetched
+    assert RangeRequestHandler.bytes_sent < sample_video.stat().st_size / 2
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from source_cache import SourceVideoCache
+
+###############################################################################
+
+
+class FakeDownload:
+    def __init__(self, size: int = 10):
+        self.size = size
+        self.calls: list[str] = []
+        self.release = threading.Event()
+        self.release.set()
+        self.error: Exception | None = None
+
+    def __call__(self, session_id: str, dest: Path) -> Path:
+        self.calls.append(session_id)
+        self.release.wait(timeout=5)
+        if self.error is not None:
+            dest.with_suffix(".part").write_bytes(b"partial")
+            raise self.error
+
+        path = dest.with_suffix(".mp4")
+        path.write_bytes(b"x" * self.size)
+        return path
+
+
+def wait_for_waiters(cache: SourceVideoCache, session_id: str, waiters: int) -> None:
+    while True:
+        with cache._lock:
+            download = cache._downloads.get(session_id)
+            if download is not None and download.waiters == waiters:
+                return
+
+
+def test_concurrent_requests_share_download(tmp_path: Path) -> None:
+    download = FakeDownload()
+    download.release.clear()
+    cache = SourceVideoCache(tmp_path, 100, download)
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(cache.acquire, "session") for _ in range(4)]
+        wait_for_waiters(cache, "session", len(futures) - 1)
+        download.release.set()
+        paths = {future.result() for future in futures}
+
+    assert download.calls == ["session"]
+    assert len(paths) == 1
+    for _ in futures:
+        cache.release("session")
+
+    with cache.open("session") as path:
+        assert path in paths
+    assert download.calls == ["session"]
+
+
+def test_least_recently_used_evicted(tmp_path: Path) -> None:
+    cache = SourceVideoCache(tmp_path, 25, FakeDownload())
+
+    for session_id in ("a", "b", "a", "c"):
+        with cache.open(session_id):
+            pass
+
+    # "b" was used least recently
+    assert cache.size == 20
+    assert sorted(p.stat().st_size for p in tmp_path.iterdir()) == [10, 10]
+    with cache.open("a"), cache.open("c"):
+        pass
+    assert cache._download.calls == ["a", "b", "c"]
+
+
+def test_pinned_video_kept(tmp_path: Path) -> None:
+    cache = SourceVideoCache(tmp_path, 5, FakeDownload())
+
+    path = cache.acquire("a")
+    with cache.open("b") as other:
+        assert path.exists()
+    assert not other.exists()
+    assert path.exists()
+
+    cache.release("a")
+    assert not path.exists()
+    assert cache.size == 0
+
+
+def test_download_failure_raised_to_waiters(tmp_path: Path) -> None:
+    download = FakeDownload()
+    download.release.clear()
+    download.error = RuntimeError("no video")
+    cache = SourceVideoCache(tmp_path, 100, download)
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(cache.acquire, "session") for _ in range(2)]
+        wait_for_waiters(cache, "session", len(futures) - 1)
+        download.release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert list(tmp_path.iterdir()) == []
+
+    # Failures are not cached
+    download.error = None
+    with cache.open("session") as path:
+        assert path.exists()
+    assert download.calls == ["session", "session"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+MEETINGS_SOURCE = "meetings"
+YOUTUBE_CHANNEL_SOURCE = "youtube_channel"
+BOARDS_SOURCE = "boards"
+
+###############################################################################
+
+
+class CheckpointStore:
+    """
+    Per-source high-water marks persisted as one JSON file
+
+    Updates are kept in memory until save() is called,
+    so a gather that fails part way does not advance any checkpoint.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        JSON file holding the checkpoints
+    max_ids: int
+        Number of most recently seen video IDs kept per source
+    """
+
+    def __init__(self, path: Union[str, Path], max_ids: int = 1000):
+        self.path = Path(path)
+        self.max_ids = max_ids
+        self._lock = threading.Lock()
+
+        try:
+            self._checkpoints: Dict[str, Dict[str, Any]] = json.loads(
+                self.path.read_text()
+            )
+        except FileNotFoundError:
+            self._checkpoints = {}
+        except ValueError as e:
+            log.error(f"Ignoring unreadable checkpoints {self.path}: {str(e)}")
+            self._checkpoints = {}
+
+    def get(self, source: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._checkpoints.get(source, {}).get(key, default)
+
+    def set(self, source: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._checkpoints.setdefault(source, {})[key] = value
+
+    def get_modified(self, source: str) -> Optional[str]:
+        """
+        Latest modification timestamp seen for source
+        """
+        return self.get(source, "modified")
+
+    def advance_modified(self, source: str, modified: Iterable[str]) -> None:
+        """
+        Move the modification high-water mark of source forward.
+        Timestamps must be ISO formatted in the same timezone to compare.
+        """
+        latest = max(modified, default=None)
+        current = self.get_modified(source)
+        if latest is not None and (current is None or latest > current):
+            self.set(source, "modified", latest)
+
+    def get_seen_ids(self, source: str) -> List[str]:
+        """
+        Video IDs already returned for source, oldest first
+        """
+        return list(self.get(source, "seen_ids", []))
+
+    def add_seen_ids(self, source: str, video_ids: Iterable[str]) -> None:
+        """
+        Record video IDs returned for source,
+        keeping only the max_ids most recent ones
+        """
+        seen_ids = self.get_seen_ids(source)
+        for video_id in video_ids:
+            if video_id in seen_ids:
+                seen_ids.remove(video_id)
+            seen_ids.append(video_id)
+
+        seen_ids = seen_ids[-self.max_ids :]
+        self.set(source, "seen_ids", seen_ids)
+        if seen_ids:
+            self.set(source, "last_video_id", seen_ids[-1])
+
+    def save(self) -> None:
+        """
+        Atomically write the checkpoints to path
+        """
+        with self._lock:
+            data = json.dumps(self._checkpoints, indent=2)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(data)
+        os.replace(tmp_path, self.path)
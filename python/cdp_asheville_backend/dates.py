@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+import pytz
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+# "January 5, 2023", "Jan. 5 2023", "Sept 5th,2023", "February 2,2023".
+# Only month names and their abbreviations, "Decision 12, 2023" is no date.
+MONTH_NAME_DATE = re.compile(
+    r"\b(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?"
+    r"|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?"
+    r"|dec(?:ember)?)\b\.?"
+    r"\s*(?P<day>\d{1,2})(?:st|nd|rd|th)?\s*,?\s*(?P<year>\d{4})\b",
+    re.IGNORECASE,
+)
+
+# Tried in order when the label has no month name date
+FALLBACK_FORMATS: Sequence[Tuple[Pattern, str]] = (
+    # 1/5/2023
+    (re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b"), "%m/%d/%Y"),
+    # 01-05-2023
+    (re.compile(r"\b\d{1,2}-\d{1,2}-\d{4}\b"), "%m-%d-%Y"),
+    # 1/5/23
+    (re.compile(r"\b\d{1,2}/\d{1,2}/\d{2}\b"), "%m/%d/%y"),
+    # 2023-01-05
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "%Y-%m-%d"),
+    # 5 January 2023
+    (re.compile(r"\b\d{1,2}\s+[a-z]+\s+\d{4}\b", re.IGNORECASE), "%d %B %Y"),
+)
+
+# Agenda link labels seen on the boards and commissions pages,
+# used by the benchmarks
+SAMPLE_AGENDA_LABELS = (
+    "Agenda January 5, 2023",
+    "Agenda – January 12, 2023",
+    "Special Meeting Agenda February 2,2023",
+    "Presentation Schedule – March 1, 2023",
+    "Agenda – Staff Report April 3, 2023",
+    "Agenda (Updated) May 4, 2023",
+    "Updated Agenda May 18, 2023",
+    "Joint Audit Committee Meeting Agenda June 1, 2023",
+    "work session w/ Multimodal Transportation Commission Agenda July 12, 2023",
+    "Retreat Agenda August 10, 2023",
+    "Agenda  September 7,  2023",
+    "Agenda Sept. 14, 2023",
+    "Agenda 10/12/2023",
+    "Budget Work Session Agenda November 2nd, 2023",
+)
+
+###############################################################################
+
+
+class AgendaDateParser:
+    """
+    Extract meeting dates from agenda link labels
+
+    A single precompiled regex finds "Month Day, Year" anywhere in the label,
+    whatever words surround it. Labels without one are tried against
+    FALLBACK_FORMATS. Parsed and failed labels are counted per parser.
+
+    Parameters
+    ----------
+    fallback_formats: Sequence[Tuple[Pattern, str]]
+        (regex finding the date text, strptime format of the date text) pairs
+    """
+
+    def __init__(
+        self, fallback_formats: Sequence[Tuple[Pattern, str]] = FALLBACK_FORMATS
+    ):
+        self.fallback_formats = fallback_formats
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.failures: List[str] = []
+
+    def _count(self, outcome: str, label: Optional[str] = None) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+            if label is not None:
+                self.failures.append(label)
+
+    def parse(self, label: str) -> Optional[datetime]:
+        """
+        Parse the meeting date in an agenda link label
+
+        Parameters
+        ----------
+        label: str
+            Agenda link text, for example "Agenda – January 12, 2023"
+
+        Returns
+        -------
+        date: Optional[datetime]
+            Midnight UTC of the meeting date, None if no date was found
+        """
+        match = MONTH_NAME_DATE.search(label)
+        if match is not None:
+            try:
+                date = datetime(
+                    int(match.group("year")),
+                    MONTHS[match.group("month").lower()[:3]],
+                    int(match.group("day")),
+                    tzinfo=pytz.UTC,
+                )
+                self._count("fast")
+                return date
+            except ValueError:
+                pass
+
+        for pattern, date_format in self.fallback_formats:
+            match = pattern.search(label)
+            if match is None:
+                continue
+
+            try:
+                date = datetime.strptime(match.group(0), date_format).replace(
+                    tzinfo=pytz.UTC
+                )
+                self._count("fallback")
+                return date
+            except ValueError:
+                continue
+
+        self._count("failed", label)
+        log.warning(f"No meeting date found in agenda label: {label!r}")
+        return None
+
+    def summary(self) -> Dict[str, object]:
+        """
+        Counts of labels parsed by the fast path, by a fallback format
+        and not parsed, with the labels that failed
+        """
+        with self._lock:
+            return {
+                "fast": self.counts["fast"],
+                "fallback": self.counts["fallback"],
+                "failed": self.counts["failed"],
+                "failures": list(self.failures),
+            }
+
+
+###############################################################################
+# Benchmark against the replace chain this parser replaced:
+# python -m cdp_asheville_backend.dates
+
+if __name__ == "__main__":
+    import timeit
+
+    def replace_chain_parse(label: str) -> Optional[datetime]:
+        event_date_str = label.replace("Agenda", "")
+        for text in (
+            "Special Meeting",
+            "Presentation Schedule",
+            "– Staff Report",
+            " –",
+            "(Updated)",
+            "Updated",
+            "Joint Audit Committee Meeting",
+            "work session w/ Multimodal Transportation Commission",
+        ):
+            event_date_str = event_date_str.replace(text, "")
+        event_date_str = event_date_str.replace("   ", " ").replace("  ", " ")
+        event_date_str = event_date_str.strip()
+        event_date_str = event_date_str.replace(",", ", ").replace(",", "")
+        event_date_str = event_date_str.replace("  ", " ")
+        event_date_str = event_date_str.replace("Retreat", "")
+        try:
+            return datetime.strptime(event_date_str, "%B %d %Y").replace(
+                tzinfo=pytz.UTC
+            )
+        except ValueError:
+            return None
+
+    parser = AgendaDateParser()
+    number = 2000
+    for name, parse in (
+        ("replace chain", replace_chain_parse),
+        ("AgendaDateParser", parser.parse),
+    ):
+        parsed = sum(parse(label) is not None for label in SAMPLE_AGENDA_LABELS)
+        seconds = timeit.timeit(
+            lambda: [parse(label) for label in SAMPLE_AGENDA_LABELS], number=number
+        )
+        per_label = seconds / (number * len(SAMPLE_AGENDA_LABELS)) * 1e6
+        print(
+            f"{name}: {parsed}/{len(SAMPLE_AGENDA_LABELS)} labels parsed, "
+            f"{per_label:.2f} us per label"
+        )
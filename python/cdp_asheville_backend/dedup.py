@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from cdp_backend.pipeline.ingestion_models import EventIngestionModel
+
+from .urls import canonicalize_drive_link, get_video_id
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Filled in from a duplicate when the kept event does not have them
+MERGED_FIELDS = ("agenda_uri", "minutes_uri", "event_minutes_items")
+
+###############################################################################
+
+
+def get_event_key(event: EventIngestionModel) -> Optional[Hashable]:
+    """
+    Key identifying the meeting an event was gathered for
+
+    Events of the same YouTube video share a key whatever their source.
+    Events without a YouTube video are keyed by body name, session date and
+    canonical video URI, so different Drive videos of one day are all kept.
+
+    Returns
+    -------
+    key: Optional[Hashable]
+        None if the event has no session
+    """
+    if not event.sessions:
+        return None
+
+    session = event.sessions[0]
+    video_id = get_video_id(session.video_uri or "")
+    if video_id is not None:
+        return ("video", video_id)
+
+    return (
+        "body",
+        event.body.name,
+        session.session_datetime.date(),
+        canonicalize_drive_link(session.video_uri or ""),
+    )
+
+
+def merge_events(event: EventIngestionModel, duplicate: EventIngestionModel) -> None:
+    """
+    Fill MERGED_FIELDS missing from event in place with those of duplicate
+    """
+    for field in MERGED_FIELDS:
+        if getattr(event, field) is None and getattr(duplicate, field) is not None:
+            setattr(event, field, getattr(duplicate, field))
+
+
+class EventDeduplicator:
+    """
+    Incrementally drop events gathered more than once
+
+    The first event of each meeting is kept. The agenda and minutes of later
+    duplicates are merged into it in place, even if it was already handed out.
+    """
+
+    def __init__(self):
+        self._kept: Dict[Hashable, EventIngestionModel] = {}
+
+    def add(self, event: EventIngestionModel) -> Optional[EventIngestionModel]:
+        """
+        Returns
+        -------
+        event: Optional[EventIngestionModel]
+            event if it is the first of its meeting, None for duplicates
+        """
+        if event is None:
+            return None
+
+        key = get_event_key(event)
+        if key is None:
+            return event
+
+        if key in self._kept:
+            log.info(f"Merging duplicate event for {key}")
+            merge_events(self._kept[key], event)
+            return None
+
+        self._kept[key] = event
+        return event
+
+
+def deduplicate_events(
+    events: Iterable[EventIngestionModel],
+) -> List[EventIngestionModel]:
+    """
+    Drop events gathered more than once, keeping the first one of each meeting
+    and merging the agenda and minutes of the later ones into it
+
+    Parameters
+    ----------
+    events: Iterable[EventIngestionModel]
+        Events in order of preference
+
+    Returns
+    -------
+    events: List[EventIngestionModel]
+        One event per meeting, in order of first appearance
+    """
+    deduplicator = EventDeduplicator()
+    return [event for event in map(deduplicator.add, events) if event is not None]
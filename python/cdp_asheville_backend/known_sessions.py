@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Sessions ingested by earlier runs, so gathers stop returning them
+
+ManifestSessionLookup records every session a gather returns, before the
+GPU pipeline has processed it. It stands for ingested sessions only because
+the event gather workflows keep the manifest in their actions/cache
+directory, and actions/cache saves that directory only after every step of
+the run succeeded. A run whose processing fails leaves the manifest it
+restored unchanged, and its sessions are returned again by the next run.
+Keep the manifest out of any storage that is written regardless of outcome.
+
+FirestoreSessionLookup looks sessions up in the instance's Firestore session
+collection, which only holds sessions the pipeline stored.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Set, Union
+
+from cdp_backend.pipeline.ingestion_models import EventIngestionModel
+
+from .urls import get_video_id
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Firestore "in" queries accept at most this many values
+FIRESTORE_IN_LIMIT = 10
+
+###############################################################################
+
+
+def _video_key(video_uri: str) -> str:
+    # Different URL forms of the same YouTube video share a key
+    return get_video_id(video_uri) or video_uri
+
+
+class ManifestSessionLookup:
+    """
+    Video URIs of already ingested sessions kept in a local manifest file,
+    one URI per line
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        Manifest file
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        try:
+            self._video_uris = [
+                line.strip()
+                for line in self.path.read_text().splitlines()
+                if line.strip()
+            ]
+        except FileNotFoundError:
+            self._video_uris = []
+
+        self._keys = {_video_key(video_uri) for video_uri in self._video_uris}
+
+    def get_known(self, video_uris: Iterable[str]) -> Set[str]:
+        """
+        The video_uris that belong to already ingested sessions
+        """
+        with self._lock:
+            return {uri for uri in video_uris if _video_key(uri) in self._keys}
+
+    def add(self, video_uris: Iterable[str]) -> None:
+        """
+        Record video_uris as ingested
+        """
+        with self._lock:
+            for video_uri in video_uris:
+                key = _video_key(video_uri)
+                if key not in self._keys:
+                    self._keys.add(key)
+                    self._video_uris.append(video_uri)
+
+    def save(self) -> None:
+        """
+        Atomically write the manifest to path
+        """
+        with self._lock:
+            data = "".join(f"{video_uri}\n" for video_uri in self._video_uris)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(data)
+        os.replace(tmp_path, self.path)
+
+
+class MemorySessionCollection:
+    """
+    Local stand-in for the Firestore session collection,
+    answering the video_uri "in" queries of FirestoreSessionLookup
+
+    Parameters
+    ----------
+    video_uris: Iterable[str]
+        Video URIs of the stored sessions
+    """
+
+    class _Session:
+        def __init__(self, video_uri: str):
+            self.video_uri = video_uri
+
+    class _Query:
+        def __init__(self, sessions: List[Any]):
+            self._sessions = sessions
+
+        def fetch(self) -> Iterator[Any]:
+            return iter(self._sessions)
+
+    def __init__(self, video_uris: Iterable[str] = ()):
+        self.video_uris = list(video_uris)
+        # Values of every query, in order
+        self.queries: List[List[str]] = []
+
+    def filter(self, field: str, op: str, values: List[str]) -> "_Query":
+        if field != "video_uri" or op != "in":
+            raise ValueError(f"Unsupported query: {field} {op}")
+        if len(values) > FIRESTORE_IN_LIMIT:
+            raise ValueError(
+                f"'in' queries take at most {FIRESTORE_IN_LIMIT} values, "
+                f"got {len(values)}"
+            )
+
+        self.queries.append(list(values))
+        return self._Query(
+            [self._Session(uri) for uri in self.video_uris if uri in values]
+        )
+
+
+class FirestoreSessionLookup:
+    """
+    Video URIs of already ingested sessions looked up
+    in the instance's Firestore session collection
+
+    Sessions are matched on their exact video_uri,
+    as the pipeline stores it.
+
+    Parameters
+    ----------
+    credentials_file: Optional[Union[str, Path]]
+        Google Service Account credentials JSON file
+    collection: Optional[Any]
+        Session collection to query instead of the instance's,
+        for example a MemorySessionCollection
+    """
+
+    def __init__(
+        self,
+        credentials_file: Optional[Union[str, Path]] = None,
+        collection: Optional[Any] = None,
+    ):
+        if collection is None:
+            import fireo
+            from cdp_backend.database import models as db_models
+
+            fireo.connection(from_file=str(credentials_file))
+            collection = db_models.Session.collection
+
+        self.collection = collection
+
+    def get_known(self, video_uris: Iterable[str]) -> Set[str]:
+        video_uris = list(dict.fromkeys(video_uris))
+        known = set()
+        for i in range(0, len(video_uris), FIRESTORE_IN_LIMIT):
+            chunk = video_uris[i : i + FIRESTORE_IN_LIMIT]
+            for session in self.collection.filter("video_uri", "in", chunk).fetch():
+                known.add(session.video_uri)
+
+        return known
+
+    def add(self, video_uris: Iterable[str]) -> None:
+        # Sessions are added to Firestore by the event gather pipeline
+        pass
+
+    def save(self) -> None:
+        pass
+
+
+def drop_known_sessions(
+    events: Iterable[EventIngestionModel],
+    lookup: Union[ManifestSessionLookup, FirestoreSessionLookup],
+) -> List[EventIngestionModel]:
+    """
+    Drop events whose sessions were all already ingested
+
+    Parameters
+    ----------
+    events: Iterable[EventIngestionModel]
+        Gathered events
+    lookup: Union[ManifestSessionLookup, FirestoreSessionLookup]
+        Already ingested sessions
+
+    Returns
+    -------
+    events: List[EventIngestionModel]
+        Events with at least one session not ingested yet
+    """
+    events = [event for event in events if event is not None]
+    known = lookup.get_known(
+        session.video_uri for event in events for session in event.sessions
+    )
+
+    new_events = []
+    for event in events:
+        if event.sessions and all(
+            session.video_uri in known for session in event.sessions
+        ):
+            log.info(f"Skipping already ingested {event.sessions[0].video_uri}")
+            continue
+
+        new_events.append(event)
+
+    return new_events
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+METRIC_PREFIX = "cdp_asheville"
+
+# Slowest URLs listed per request kind in the summary
+SLOWEST_URLS = 10
+
+###############################################################################
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Timings:
+    """
+    Count, total and maximum of a series of durations
+    """
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "max_seconds": round(self.max, 6),
+        }
+
+
+class GatherMetrics:
+    """
+    Thread-safe timings and counters of a gather
+
+    Spans time named stages, latencies time individual requests by kind
+    ("fetch", "extract", ...) and counters count everything else:
+    cache hits and misses, bytes downloaded, events per source.
+
+    Parameters
+    ----------
+    clock: Callable[[], float]
+        Monotonic time source in seconds
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self.counters: Counter = Counter()
+        self._spans: Dict[str, _Timings] = {}
+        self._latencies: Dict[str, _Timings] = {}
+        # (seconds, url) min-heaps of the slowest requests of each kind
+        self._slowest: Dict[str, List[Tuple[float, str]]] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Time the block as one run of the stage name, even if it raises
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            seconds = self._clock() - start
+            with self._lock:
+                self._spans.setdefault(name, _Timings()).add(seconds)
+            log.info(f"{name} took {seconds:.3f}s")
+
+    def observe(self, kind: str, url: str, seconds: float) -> None:
+        """
+        Record the latency of a request of kind to url
+        """
+        with self._lock:
+            self._latencies.setdefault(kind, _Timings()).add(seconds)
+            slowest = self._slowest.setdefault(kind, [])
+            if len(slowest) < SLOWEST_URLS:
+                heapq.heappush(slowest, (seconds, url))
+            elif seconds > slowest[0][0]:
+                heapq.heapreplace(slowest, (seconds, url))
+
+    @contextmanager
+    def timed(self, kind: str, url: str) -> Iterator[None]:
+        """
+        observe() the time the block takes, even if it raises
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(kind, url, self._clock() - start)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        JSON serializable snapshot of every span, latency and counter
+        """
+        with self._lock:
+            return {
+                "elapsed_seconds": round(self._clock() - self._started, 6),
+                "spans": {
+                    name: timings.as_dict() for name, timings in self._spans.items()
+                },
+                "latencies": {
+                    kind: {
+                        **timings.as_dict(),
+                        "slowest": [
+                            {"url": url, "seconds": round(seconds, 6)}
+                            for seconds, url in sorted(
+                                self._slowest[kind], reverse=True
+                            )
+                        ],
+                    }
+                    for kind, timings in self._latencies.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), sort_keys=True)
+
+    def to_openmetrics(self) -> str:
+        """
+        Spans and latencies as summaries and counters as counters
+        in the OpenMetrics text format
+        """
+        summary = self.summary()
+        lines = []
+
+        for metric, label, series in (
+            ("span_seconds", "span", summary["spans"]),
+            ("request_seconds", "kind", summary["latencies"]),
+        ):
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines.append(f"# TYPE {name} summary")
+            lines.append(f"# UNIT {name} seconds")
+            for key, timings in sorted(series.items()):
+                labels = f'{{{label}="{_label_value(key)}"}}'
+                lines.append(f"{name}_count{labels} {timings['count']}")
+                lines.append(f"{name}_sum{labels} {timings['total_seconds']}")
+
+        for counter, value in sorted(summary["counters"].items()):
+            name = f"{METRIC_PREFIX}_{_metric_name(counter)}"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}_total {value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import logging
+from typing import Optional, Sequence, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Elements each kind of page is read for.
+# The board name h2.entry-title and meeting table tbody of a board page
+BOARD_PAGE_ELEMENTS = ("h2", "tbody")
+# The board tables of the boards and commissions page
+BOARDS_INDEX_ELEMENTS = ("tbody",)
+# The embedded video of a publicinput.com meeting page
+PUBLIC_INPUT_ELEMENTS = ("iframe",)
+
+# lxml is optional, html.parser is always available
+LIGHTWEIGHT_FEATURES = (
+    "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+)
+
+###############################################################################
+
+
+def parse_html(
+    markup: Union[str, bytes],
+    elements: Optional[Sequence[str]] = None,
+    lightweight: bool = False,
+) -> BeautifulSoup:
+    """
+    Parse a web page
+
+    Parameters
+    ----------
+    markup: Union[str, bytes]
+        Page content
+    elements: Optional[Sequence[str]]
+        Names of the elements the page is read for.
+        In lightweight mode only these elements and their descendants are
+        built, everything else in the page is skipped.
+        Default builds the whole page.
+    lightweight: bool
+        Parse with lxml when installed and only build elements.
+        False builds the full html.parser tree of the page.
+
+    Returns
+    -------
+    soup: BeautifulSoup
+        Parsed page
+    """
+    if not lightweight:
+        return BeautifulSoup(markup, "html.parser")
+
+    parse_only = SoupStrainer(list(elements)) if elements else None
+    return BeautifulSoup(markup, LIGHTWEIGHT_FEATURES, parse_only=parse_only)
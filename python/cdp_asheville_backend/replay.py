@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
+
+from .metrics import GatherMetrics
+from .scraper import AshevilleScraper
+from .throttle import RequestScheduler
+from .video_metadata import VideoMetadataResolver, slim_info
+from .web import HttpSession, MemoryResponseStore
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+HTTP_FIXTURES = "http"
+YOUTUBE_DL_FIXTURES = "youtube_dl"
+
+# Response headers the scraper reads, the rest is not recorded
+RECORDED_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "X-WP-Total",
+    "X-WP-TotalPages",
+)
+
+###############################################################################
+
+
+class FixtureNotFound(requests.RequestException):
+    pass
+
+
+def get_request_key(url: str, params: Optional[dict] = None) -> str:
+    """
+    Fixture key of a request, independent of the order of params
+    """
+    if not params:
+        return url
+
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class FixtureCorpus:
+    """
+    Recorded responses kept as one JSON file per request in a directory
+
+    Parameters
+    ----------
+    directory: Union[str, Path]
+        Directory holding an http and a youtube_dl fixture directory
+        and the recorded time range
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def _path(self, kind: str, key: str) -> Path:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / kind / f"{name}.json"
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(kind, key).read_text())
+        except FileNotFoundError:
+            return None
+
+    def put(self, kind: str, key: str, fixture: Dict[str, Any]) -> None:
+        path = self._path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"key": key, **fixture}, indent=1))
+        os.replace(tmp_path, path)
+
+    def save_range(self, start_date_time: datetime, end_date_time: datetime) -> None:
+        """
+        Record the time range the corpus was gathered for
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / "range.json").write_text(
+            json.dumps(
+                {
+                    "start": start_date_time.isoformat(),
+                    "end": end_date_time.isoformat(),
+                }
+            )
+        )
+
+    def load_range(self) -> Tuple[datetime, datetime]:
+        """
+        The time range the corpus was gathered for,
+        the only one get_events() can be replayed for
+        """
+        data = json.loads((self.directory / "range.json").read_text())
+        return (
+            datetime.fromisoformat(data["start"]),
+            datetime.fromisoformat(data["end"]),
+        )
+
+
+###############################################################################
+# HTTP
+
+
+class RecordingSession(HttpSession):
+    """
+    HttpSession that records every response it receives into a corpus
+
+    Conditional request headers are not sent,
+    so that full bodies are recorded instead of 304s.
+    """
+
+    def __init__(self, corpus: FixtureCorpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        resp = super().get(url, params)
+
+        fixture: Dict[str, Any] = {
+            "status": resp.status_code,
+            "headers": {
+                name: resp.headers[name]
+                for name in RECORDED_HEADERS
+                if name in resp.headers
+            },
+        }
+        try:
+            fixture["body"] = resp.content.decode("utf-8")
+        except UnicodeDecodeError:
+            fixture["body_base64"] = base64.b64encode(resp.content).decode("ascii")
+
+        self.corpus.put(HTTP_FIXTURES, get_request_key(url, params), fixture)
+        return resp
+
+
+class ReplaySession(HttpSession):
+    """
+    HttpSession serving the responses of a corpus, without network access
+
+    Raises
+    ------
+    FixtureNotFound
+        From get() and fetch() for requests that were not recorded
+    """
+
+    def __init__(self, corpus: FixtureCorpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def send(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        key = get_request_key(url, params)
+        fixture = self.corpus.get(HTTP_FIXTURES, key)
+        if fixture is None:
+            raise FixtureNotFound(f"No recorded response for {key}")
+
+        resp = requests.Response()
+        resp.url = key
+        resp.status_code = fixture["status"]
+        resp.headers = CaseInsensitiveDict(fixture["headers"])
+        if "body" in fixture:
+            resp._content = fixture["body"].encode("utf-8")
+            resp.encoding = "utf-8"
+        else:
+            resp._content = base64.b64decode(fixture["body_base64"])
+
+        return resp
+
+
+###############################################################################
+# yt-dlp
+
+
+def _get_youtube_dl_key(url: str, ydl_opts: dict) -> str:
+    # A flat listing and a fully resolved one of the same URL differ
+    if ydl_opts.get("extract_flat"):
+        return get_request_key(url, {"extract_flat": ydl_opts["extract_flat"]})
+
+    return url
+
+
+def _slim_recorded_info(info: dict) -> dict:
+    # Formats, thumbnails and the like make up most of an info dict
+    # and are never read by the scraper
+    if info.get("entries") is None:
+        return slim_info(info)
+
+    return {
+        "entries": [slim_info(entry) for entry in info["entries"] if entry is not None]
+    }
+
+
+class RecordingYoutubeDL:
+    """
+    YoutubeDL-like extractor recording the info dicts of another one,
+    reduced to INFO_FIELDS
+    """
+
+    def __init__(self, corpus: FixtureCorpus, ydl: Any, ydl_opts: dict):
+        self.corpus = corpus
+        self.ydl = ydl
+        self.ydl_opts = ydl_opts
+
+    def extract_info(self, url: str, download: bool = False) -> Optional[dict]:
+        info = self.ydl.extract_info(url, download=download)
+        if info is not None:
+            info = _slim_recorded_info(info)
+            self.corpus.put(
+                YOUTUBE_DL_FIXTURES,
+                _get_youtube_dl_key(url, self.ydl_opts),
+                {"info": info},
+            )
+
+        return info
+
+    def close(self) -> None:
+        self.ydl.close()
+
+    def __enter__(self) -> "RecordingYoutubeDL":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ReplayYoutubeDL:
+    """
+    YoutubeDL-like extractor serving the info dicts of a corpus
+
+    The entries of a recorded listing still go through the match_filter
+    of ydl_opts, so filters that differ from the recording's apply.
+    """
+
+    def __init__(self, corpus: FixtureCorpus, ydl_opts: dict):
+        self.corpus = corpus
+        self.ydl_opts = ydl_opts
+
+    def extract_info(self, url: str, download: bool = False) -> Optional[dict]:
+        key = _get_youtube_dl_key(url, self.ydl_opts)
+        fixture = self.corpus.get(YOUTUBE_DL_FIXTURES, key)
+        if fixture is None:
+            if self.ydl_opts.get("ignoreerrors"):
+                return None
+            raise DownloadError(f"ERROR: No recorded info for {key}")
+
+        info = fixture["info"]
+        match_filter = self.ydl_opts.get("match_filter")
+        if match_filter is not None and info.get("entries") is not None:
+            info = {
+                "entries": [
+                    entry
+                    for entry in info["entries"]
+                    if match_filter(entry, incomplete=False) is None
+                ]
+            }
+
+        return info
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ReplayYoutubeDL":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def recording_ydl_factory(
+    corpus: FixtureCorpus, ydl_factory: Callable[[dict], Any] = YoutubeDL
+) -> Callable[[dict], RecordingYoutubeDL]:
+    """
+    VideoMetadataResolver ydl_factory recording what ydl_factory extracts
+    """
+
+    def factory(ydl_opts: dict) -> RecordingYoutubeDL:
+        return RecordingYoutubeDL(corpus, ydl_factory(ydl_opts), ydl_opts)
+
+    return factory
+
+
+def replay_ydl_factory(corpus: FixtureCorpus) -> Callable[[dict], ReplayYoutubeDL]:
+    """
+    VideoMetadataResolver ydl_factory serving the info dicts of corpus
+    """
+
+    def factory(ydl_opts: dict) -> ReplayYoutubeDL:
+        return ReplayYoutubeDL(corpus, ydl_opts)
+
+    return factory
+
+
+###############################################################################
+
+
+def get_recording_scraper(corpus: FixtureCorpus, **kwargs) -> AshevilleScraper:
+    """
+    AshevilleScraper recording every web response and yt-dlp info dict
+    into corpus. Nothing is served from the scraper's caches.
+    kwargs are passed to AshevilleScraper.
+    """
+    scheduler = kwargs.pop("scheduler", None) or RequestScheduler()
+    metrics = kwargs.pop("metrics", None) or GatherMetrics()
+    max_workers = kwargs.get("max_workers", 8)
+    return AshevilleScraper(
+        session=RecordingSession(corpus, scheduler=scheduler, metrics=metrics),
+        video_resolver=VideoMetadataResolver(
+            max_workers=max_workers,
+            ydl_factory=recording_ydl_factory(corpus),
+            scheduler=scheduler,
+            metrics=metrics,
+        ),
+        response_store=MemoryResponseStore(),
+        scheduler=scheduler,
+        metrics=metrics,
+        **kwargs,
+    )
+
+
+def get_replay_scraper(corpus: FixtureCorpus, **kwargs) -> AshevilleScraper:
+    """
+    AshevilleScraper serving every web response and yt-dlp info dict
+    from corpus, without network access, rate limits or caches.
+    kwargs are passed to AshevilleScraper.
+    """
+    scheduler = RequestScheduler(rate=None, max_attempts=1)
+    metrics = kwargs.pop("metrics", None) or GatherMetrics()
+    max_workers = kwargs.get("max_workers", 8)
+    return AshevilleScraper(
+        session=ReplaySession(corpus, scheduler=scheduler, metrics=metrics),
+        video_resolver=VideoMetadataResolver(
+            max_workers=max_workers,
+            ydl_factory=replay_ydl_factory(corpus),
+            scheduler=scheduler,
+            metrics=metrics,
+        ),
+        response_store=MemoryResponseStore(),
+        scheduler=scheduler,
+        metrics=metrics,
+        **kwargs,
+    )
+
+
+###############################################################################
+# Record a corpus for a time range:
+# python -m cdp_asheville_backend.replay corpus/ 2023-05-01 2023-06-01
+
+if __name__ == "__main__":
+    import argparse
+
+    import pytz
+
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("directory", type=Path)
+    arg_parser.add_argument("start", type=datetime.fromisoformat)
+    arg_parser.add_argument("end", type=datetime.fromisoformat)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    corpus = FixtureCorpus(args.directory)
+    start = pytz.UTC.localize(args.start)
+    end = pytz.UTC.localize(args.end)
+    events = get_recording_scraper(corpus).get_events(start, end)
+    corpus.save_range(start, end)
+    print(f"Recorded {len(events)} events into {args.directory}")
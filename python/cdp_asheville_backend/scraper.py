@@ -10,8 +10,12 @@ from datetime import datetime
 
 ###############################################################################
 import logging
-import json
-from yt_dlp import YoutubeDL, DateRange
+import os
+import queue
+from pathlib import Path
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from yt_dlp import DateRange
 
 from cdp_scrapers.scraper_utils import (
     IngestionModelScraper,
@@ -21,6 +25,32 @@ from cdp_scrapers.scraper_utils import (
 )
 
 
+from .checkpoints import (
+    BOARDS_SOURCE,
+    MEETINGS_SOURCE,
+    YOUTUBE_CHANNEL_SOURCE,
+    CheckpointStore,
+)
+from .dates import AgendaDateParser
+from .dedup import EventDeduplicator
+from .known_sessions import (
+    FirestoreSessionLookup,
+    ManifestSessionLookup,
+    drop_known_sessions,
+)
+from .metrics import GatherMetrics
+from .parsing import (
+    BOARD_PAGE_ELEMENTS,
+    BOARDS_INDEX_ELEMENTS,
+    PUBLIC_INPUT_ELEMENTS,
+    parse_html,
+)
+from .throttle import RequestScheduler, get_youtube_dl_retry
+from .utils import get_cache_dir
+from .urls import canonicalize_drive_link, get_video_id, parse_youtube_url
+from .video_metadata import VideoMetadataCache, VideoMetadataResolver
+from .web import DiskResponseStore, HttpSession
+
 from cdp_backend.pipeline.ingestion_models import (
     Body,
     EventIngestionModel,
@@ -37,11 +67,59 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+MEETINGS_ENDPOINT = "https://www.ashevillenc.gov/wp-json/wp/v2/meetings/"
+
+# Timezone of the City of Asheville site and its meeting times
+SITE_TIMEZONE = "America/New_York"
+
+BOARDS_AND_COMMISSIONS_URL = (
+    "https://www.ashevillenc.gov/department/city-clerk/boards-and-commissions/"
+)
+
+# Only the fields read by get_council_meeting_events
+MEETING_FIELDS = (
+    "id",
+    "modified",
+    "modified_gmt",
+    "acf.meeting_videos",
+    "acf.meeting_agenda",
+    "acf.meeting_agenda_briefing",
+    "acf.meeting_minutes",
+)
+
+MEETINGS_PER_PAGE = 100
+
+# When a video is found by several sources,
+# the event of the first source listed here is kept
+SOURCE_PRIORITY = (YOUTUBE_CHANNEL_SOURCE, MEETINGS_SOURCE)
+
+# Set to "true" to make get_events() gather incrementally
+INCREMENTAL_ENV = "CDP_ASHEVILLE_INCREMENTAL"
+
+# Set to "manifest" or "firestore" to make get_events()
+# drop sessions that were already ingested
+KNOWN_SESSIONS_ENV = "CDP_ASHEVILLE_KNOWN_SESSIONS"
+
+# Set to a file path to make get_events() write its metrics there
+# in the OpenMetrics text format
+METRICS_FILE_ENV = "CDP_ASHEVILLE_METRICS_FILE"
+
+###############################################################################
+
 # from typing import Any, List, NamedTuple, Optional, Union
-from typing import List, NamedTuple, Optional, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from bs4 import BeautifulSoup
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
 
 class WebPageSoup(NamedTuple):
@@ -49,14 +127,35 @@ class WebPageSoup(NamedTuple):
     soup: Optional[BeautifulSoup] = None
 
 
-def load_web_page(url: Union[str, Request]) -> WebPageSoup:
+class BoardMeeting(NamedTuple):
+    board_name: str
+    agenda_uri: Optional[str]
+    video_url: str
+
+
+def load_web_page(
+    url: str,
+    store=None,
+    session: Optional[HttpSession] = None,
+    elements: Optional[Sequence[str]] = None,
+    lightweight: bool = False,
+) -> WebPageSoup:
     """
     Load web page at url and return content soupified
 
     Parameters
     ----------
-    url: str | urllib.request.Request
+    url: str
         Web page to load
+    store: Optional[Union[MemoryResponseStore, DiskResponseStore]]
+        Response cache used to revalidate the page instead of downloading it
+    session: Optional[HttpSession]
+        Session to load the page with. Default creates a new one.
+    elements: Optional[Sequence[str]]
+        Names of the elements the page is read for, see parse_html()
+    lightweight: bool
+        Only build elements, with lxml when installed.
+        Default builds the full html.parser tree of the page.
 
     Returns
     -------
@@ -64,48 +163,252 @@ def load_web_page(url: Union[str, Request]) -> WebPageSoup:
         WebPageSoup.status = False if web page at url could not be loaded
 
     """
+    session = session or HttpSession()
     try:
-        user_agent_string = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) "
-        user_agent_string += "AppleWebKit/537.36 (KHTML, like Gecko) "
-        user_agent_string += "Chrome/35.0.1916.47 Safari/537.36"
-        req = Request(
-            url,
-            data=None,
-            headers={"User-Agent": user_agent_string},
+        return WebPageSoup(
+            True, parse_html(session.fetch(url, store), elements, lightweight)
         )
-        with urlopen(req) as resp:
-            return WebPageSoup(True, BeautifulSoup(resp.read(), "html.parser"))
-    except URLError or HTTPError as e:
+    except requests.RequestException as e:
         log.error(f"Failed to open {url}: {str(e)}")
 
     return WebPageSoup(False)
 
 
+def get_youtube_search_url(start_date_time: datetime, end_date_time: datetime) -> str:
+    """
+    Search of the City of Asheville channel for videos in the time range
+    """
+    # url = "https://www.youtube.com/@CityofAsheville/streams"
+    url = (
+        "https://www.youtube.com/@CityofAsheville/search?query=before%3A"
+        + end_date_time.strftime("%Y-%m-%d")
+    )
+    url += "%20%2Bafter%3A" + start_date_time.strftime("%Y-%m-%d")
+    # url += "%20%2Blive"
+    return url
+
+
+def get_meetings_params(
+    start_date_time: datetime, end_date_time: datetime
+) -> Dict[str, Union[str, int]]:
+    """
+    Query of the meetings REST endpoint for meetings modified in the time range
+
+    WordPress compares modified_after and modified_before with the site-local
+    post_modified, so the range is sent in SITE_TIMEZONE.
+    Naive datetimes are taken as UTC.
+    """
+
+    def site_local(date_time: datetime) -> str:
+        if date_time.tzinfo is None:
+            date_time = pytz.UTC.localize(date_time)
+
+        return (
+            date_time.astimezone(pytz.timezone(SITE_TIMEZONE))
+            .replace(tzinfo=None)
+            .isoformat()
+        )
+
+    return {
+        "modified_after": site_local(start_date_time),
+        "modified_before": site_local(end_date_time),
+        "per_page": MEETINGS_PER_PAGE,
+        "_fields": ",".join(MEETING_FIELDS),
+    }
+
+
 ###############################################################################
 
 
 class AshevilleScraper(IngestionModelScraper):
-    def __init__(self):
-        super().__init__(timezone="America/New_York")
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_requests_per_host: int = 4,
+        video_resolver: Optional[VideoMetadataResolver] = None,
+        response_store=None,
+        session: Optional[HttpSession] = None,
+        youtube_flat_listing: bool = True,
+        incremental: bool = False,
+        checkpoints: Optional[CheckpointStore] = None,
+        known_sessions: Optional[
+            Union[ManifestSessionLookup, FirestoreSessionLookup]
+        ] = None,
+        lightweight_parsing: bool = True,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[GatherMetrics] = None,
+        metrics_file: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_workers: int
+            Number of threads used to fetch board pages concurrently.
+            1 fetches them serially.
+        max_requests_per_host: int
+            Maximum number of connections kept open to any single host
+        video_resolver: Optional[VideoMetadataResolver]
+            Shared yt-dlp metadata resolver.
+            Default creates one with max_workers extractors
+            backed by a VideoMetadataCache in get_cache_dir().
+        response_store: Optional[Union[MemoryResponseStore, DiskResponseStore]]
+            Cache used to revalidate web pages with conditional requests.
+            Default is a DiskResponseStore in get_cache_dir().
+        session: Optional[HttpSession]
+            Keep-alive session every web request goes through.
+            Default creates one limited to max_requests_per_host connections.
+        youtube_flat_listing: bool
+            List the YouTube channel search without resolving its entries,
+            then only resolve the entries that pass a cheap pre-filter.
+            False fully resolves every search result.
+        incremental: bool
+            Only gather what changed since the checkpoints of the last gather
+        checkpoints: Optional[CheckpointStore]
+            Per-source checkpoints used in incremental mode.
+            Default is checkpoints.json in get_cache_dir().
+        known_sessions: Optional[
+            Union[ManifestSessionLookup, FirestoreSessionLookup]
+        ]
+            Already ingested sessions, dropped from the gathered events.
+            Default keeps every event.
+        lightweight_parsing: bool
+            Default parsing mode of load_web_page().
+            True only builds the elements each page is read for.
+        scheduler: Optional[RequestScheduler]
+            Per-host rate limiter and retry policy shared by web requests
+            and yt-dlp extractions.
+            Default creates one with default limits.
+        metrics: Optional[GatherMetrics]
+            Stage timings, request latencies and counters of the gather,
+            shared by the default session and video resolver.
+            Default creates one.
+        metrics_file: Optional[Union[str, Path]]
+            File the metrics are written to in the OpenMetrics text format
+            at the end of get_events(). Default only logs them as JSON.
+        """
+        super().__init__(timezone=SITE_TIMEZONE)
+        self.max_workers = max(1, max_workers)
+        self.scheduler = scheduler or RequestScheduler()
+        self.metrics = metrics or GatherMetrics()
+        self.metrics_file = metrics_file
+        self.session = session or HttpSession(
+            max_connections_per_host=max_requests_per_host,
+            scheduler=self.scheduler,
+            metrics=self.metrics,
+        )
+        self.video_resolver = video_resolver or VideoMetadataResolver(
+            max_workers=self.max_workers,
+            cache=VideoMetadataCache(get_cache_dir() / "video-metadata.sqlite"),
+            scheduler=self.scheduler,
+            metrics=self.metrics,
+        )
+        self.response_store = response_store or DiskResponseStore(
+            get_cache_dir() / "http"
+        )
+        self.youtube_flat_listing = youtube_flat_listing
+        self.lightweight_parsing = lightweight_parsing
+        self.agenda_date_parser = AgendaDateParser()
+        self.known_sessions = known_sessions
+        self.checkpoints = None
+        if incremental:
+            self.checkpoints = checkpoints or CheckpointStore(
+                get_cache_dir() / "checkpoints.json"
+            )
+
+    def load_web_page(
+        self,
+        url: str,
+        elements: Optional[Sequence[str]] = None,
+        lightweight: Optional[bool] = None,
+    ) -> WebPageSoup:
+        """
+        load_web_page() through the shared session and response cache.
+        lightweight defaults to self.lightweight_parsing.
+        """
+        if lightweight is None:
+            lightweight = self.lightweight_parsing
+
+        return load_web_page(
+            url, self.response_store, self.session, elements, lightweight
+        )
 
     def process_drive_link(self, input: str) -> str:
         # https://drive.google.com/file/d/1CgJk-55n1ujfYc8-F1U-Rw7YwUdtdZ4P/view
         # https://drive.google.com/uc?export=download&id=1CgJk-55n1ujfYc8-F1U-Rw7YwUdtdZ4P
-        return (
-            input.replace("?usp=sharing", "")
-            .replace("/view", "")
-            .replace("file/d/", "uc?export=download&id=")
+        return canonicalize_drive_link(input)
+
+    def get_session_from_video_info(
+        self, info: Optional[dict], video_uri: str, session_index: int = 0
+    ) -> Optional[Session]:
+        """
+        Create Session for a video from its yt-dlp metadata
+
+        Parameters
+        ----------
+        info: Optional[dict]
+            yt-dlp info dict for the video
+        video_uri: str
+            Processed video URL
+        session_index: int
+            Index of the session in its event
+
+        Returns
+        -------
+        session: Optional[Session]
+            None if the video has no release timestamp
+        """
+        if info is None or info.get("release_timestamp") is None:
+            return None
+
+        event_date = datetime.fromtimestamp(
+            info["release_timestamp"], pytz.timezone("UTC")
         )
 
-    def get_council_meeting_events(self, item: dict) -> Optional[List[Session]]:
+        # Alternative Approach
+        # event_date_string = info["upload_date"]
+        # parse date in format 20230518
+        # event_date = datetime.strptime(
+        # event_date_string, "%Y%m%d"
+        # ).replace(tzinfo=pytz.UTC)
+
+        return self.get_none_if_empty(
+            Session(
+                session_datetime=self.localize_datetime(event_date),
+                session_index=session_index,
+                video_uri=video_uri,
+                caption_uri=None,
+            )
+        )
+
+    def get_council_meeting_video_urls(self, item: dict) -> List[str]:
+        """
+        Processed video URLs of every meeting video in a meetings REST item
+        """
+        if not item.get("acf") or item["acf"].get("meeting_videos") is None:
+            return []
+
+        return [
+            self.process_youtube_url(video["video_url"])
+            for video in item["acf"]["meeting_videos"]
+            if video["video_url"] is not None
+        ]
+
+    def get_council_meeting_events(
+        self,
+        item: dict,
+        video_info: Optional[Dict[str, Optional[dict]]] = None,
+    ) -> Optional[List[Session]]:
         """
         Parse meeting video URIs from event_page,
         return Session for each video found.
 
         Parameters
         ----------
-        event_page: BeautifulSoup
-            Web page for the meeting loaded as a bs4 object
+        item: dict
+            Meeting item from the meetings REST endpoint
+        video_info: Optional[Dict[str, Optional[dict]]]
+            Already resolved processed video URL -> yt-dlp info.
+            Default resolves the item's videos.
 
         Returns
         -------
@@ -121,14 +424,18 @@ class AshevilleScraper(IngestionModelScraper):
         # <iframe src="https://www.youtube.com/...">
         events = []
 
-        if item["acf"] is None:
+        if not item.get("acf"):
             return events
 
-        if item["acf"]["meeting_videos"] is None:
+        if item["acf"].get("meeting_videos") is None:
             return events
 
+        if video_info is None:
+            video_info = self.video_resolver.resolve(
+                self.get_council_meeting_video_urls(item)
+            )
+
         for video in item["acf"]["meeting_videos"]:
-            sessions: List[Session] = []
             session_index = 0
 
             if video["video_url"] is not None:
@@ -136,109 +443,84 @@ class AshevilleScraper(IngestionModelScraper):
                 video_label = video["video_label"]
 
                 try:
-                    ydl_opts = {}
-                    with YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(processed_video_url, download=False)
-
-                        if info["release_timestamp"] is not None:
-                            event_release_timestamp = info["release_timestamp"]
-                            event_date = datetime.fromtimestamp(
-                                event_release_timestamp, pytz.timezone("UTC")
-                            )
-
-                            # Alternative Approach
-                            # event_date_string = info["upload_date"]
-                            # parse date in format 20230518
-                            # event_date = datetime.strptime(
-                            # event_date_string, "%Y%m%d"
-                            # ).replace(tzinfo=pytz.UTC)
-
-                            sessions.append(
-                                self.get_none_if_empty(
-                                    Session(
-                                        session_datetime=self.localize_datetime(
-                                            event_date
-                                        ),
-                                        session_index=session_index,
-                                        video_uri=processed_video_url,
-                                        caption_uri=None,
-                                    )
-                                )
-                            )
+                    session = self.get_session_from_video_info(
+                        video_info.get(processed_video_url),
+                        processed_video_url,
+                        session_index,
+                    )
 
-                            body_name = "Asheville City Council: "
-                            body_name += video_label
+                    if session is not None:
+                        body_name = "Asheville City Council: "
+                        body_name += video_label
 
-                            agenda_url = None
-                            minutes_url = item["acf"]["meeting_minutes"]
+                        agenda_url = None
+                        minutes_url = item["acf"].get("meeting_minutes")
 
-                            if video_label == "City Council Meeting":
-                                agenda_url = item["acf"]["meeting_agenda"]
-                            elif video_label == "Agenda Briefing":
-                                agenda_url = item["acf"]["meeting_agenda_briefing"]
+                        if video_label == "City Council Meeting":
+                            agenda_url = item["acf"].get("meeting_agenda")
+                        elif video_label == "Agenda Briefing":
+                            agenda_url = item["acf"].get("meeting_agenda_briefing")
 
-                            if agenda_url is not None:
-                                agenda_url = self.process_drive_link(agenda_url)
+                        if agenda_url is not None:
+                            agenda_url = self.process_drive_link(agenda_url)
 
-                            if minutes_url is not None:
-                                minutes_url = self.process_drive_link(minutes_url)
+                        if minutes_url is not None:
+                            minutes_url = self.process_drive_link(minutes_url)
 
-                            events.append(
-                                self.get_none_if_empty(
-                                    EventIngestionModel(
-                                        body=Body(name=body_name),
-                                        agenda_uri=agenda_url,
-                                        minutes_uri=minutes_url,
-                                        # event_minutes_items=self.get_event_minutes(event_page.soup),
-                                        sessions=sessions,
-                                    )
+                        events.append(
+                            self.get_none_if_empty(
+                                EventIngestionModel(
+                                    body=Body(name=body_name),
+                                    agenda_uri=agenda_url,
+                                    minutes_uri=minutes_url,
+                                    # event_minutes_items=self.get_event_minutes(event_page.soup),
+                                    sessions=[session],
                                 )
                             )
+                        )
 
-                            # session_index += 1
+                        # session_index += 1
 
                 except BaseException as e:
                     log.error(f"Failed to open {processed_video_url}: {str(e)}")
 
         return reduced_list(events)
 
-    def process_youtube_url(self, input: str) -> str:
-        input = input.replace(
-            "https://youtube.com/live/", "https://www.youtube.com/watch?v="
-        )
+    def process_youtube_url(self, input: str) -> Optional[str]:
+        # https://youtu.be/9giQGUCV9d0
+        # https://www.youtube.com/embed/9giQGUCV9d0?modestbranding=1&hd=1&vq=hd720
+        # https://www.youtube.com/watch?v=9giQGUCV9d0
+        video = parse_youtube_url(input)
 
-        input = input.replace(
-            "https://www.youtube.com/live/", "https://www.youtube.com/watch?v="
-        )
-
-        input = input.replace("https://youtu.be/", "https://www.youtube.com/watch?v=")
-
-        # https://www.youtube.com/embed/9giQGUCV9d0?modestbranding=1&hd=1&vq=hd720&rel=0&playsinline=1
-        input = input.replace("?modestbranding=1&hd=1&vq=hd720&rel=0&playsinline=1", "")
-        input = input.replace(
-            "https://www.youtube.com/embed/", "https://www.youtube.com/watch?v="
-        )
-
-        input = input.replace("?feature=share", "")
-
-        # Cut any text after & symbol
-        input = input.split("&")[0]
-
-        if input == "https://www.youtube.com/user/CityofAsheville/featured":
+        if video is None:
             return None
 
-        if "youtube.com" in input:
-            return input
-        else:
-            return None
+        return video.canonical_url
 
-    def get_events_for_board(
+    def find_board_meetings(
         self,
         board_page: BeautifulSoup,
         start_date_time: datetime,
         end_date_time: datetime,
-    ) -> Optional[List[EventIngestionModel]]:
-        events: List[EventIngestionModel] = []
+    ) -> Optional[List[BoardMeeting]]:
+        """
+        Find meetings with a video in a board's meeting table
+
+        Parameters
+        ----------
+        board_page: BeautifulSoup
+            Web page for the board loaded as a bs4 object
+        start_date_time: datetime
+            Only meetings after this are returned
+        end_date_time: datetime
+            Only meetings before this are returned
+
+        Returns
+        -------
+        meetings: Optional[List[BoardMeeting]]
+            None if board_page has no board name or meeting table
+        """
+        meetings: List[BoardMeeting] = []
 
         if board_page is None:
             return
@@ -269,7 +551,7 @@ class AshevilleScraper(IngestionModelScraper):
             # meeting_docs_td = meeting_row_tds[1]
             meeting_video_td = meeting_row_tds[2]
 
-            event_date_str = None
+            agenda_label = None
             agenda_uri = None
 
             if meeting_video_td is not None:
@@ -278,54 +560,28 @@ class AshevilleScraper(IngestionModelScraper):
             if meeting_agenda_td is not None:
                 meeting_agenda_link = meeting_agenda_td.find("a")
                 if meeting_agenda_link is not None:
-                    event_date_str = meeting_agenda_link.text.replace("Agenda", "")
-                    event_date_str = event_date_str.replace("Special Meeting", "")
-                    event_date_str = event_date_str.replace("Presentation Schedule", "")
-                    event_date_str = event_date_str.replace("– Staff Report", "")
-                    event_date_str = event_date_str.replace(" –", "")
-                    event_date_str = event_date_str.replace("(Updated)", "")
-                    event_date_str = event_date_str.replace("Updated", "")
-                    event_date_str = event_date_str.replace(
-                        "Joint Audit Committee Meeting", ""
-                    )
-                    event_date_str = event_date_str.replace(
-                        "work session w/ Multimodal Transportation Commission", ""
-                    )
-                    event_date_str = event_date_str.replace("   ", " ")
-                    event_date_str = event_date_str.replace("  ", " ")
-                    event_date_str = event_date_str.strip()
+                    agenda_label = meeting_agenda_link.text
                     meeting_agenda_url = meeting_agenda_link["href"]
                     agenda_uri = self.process_drive_link(meeting_agenda_url)
                     # print(meeting_agenda_url)
 
-            if event_date_str is None or meeting_video_link is None:
+            if agenda_label is None or meeting_video_link is None:
                 continue
 
-            event_date_str = event_date_str.replace(",", ", ").replace(",", "")
-            event_date_str = event_date_str.replace("  ", " ")
-            event_date_str = event_date_str.replace("Retreat", "")
-
-            try:
-                event_date = datetime.strptime(event_date_str, "%B %d %Y").replace(
-                    tzinfo=pytz.UTC
-                )
+            # Failures are counted and logged by the parser
+            event_date = self.agenda_date_parser.parse(agenda_label)
 
-            except ValueError:
-                print("Exception")
-                print(event_date_str)
+            if event_date is None:
                 continue
 
             if not (start_date_time < event_date < end_date_time):
                 continue
 
-            sessions: List[Session] = []
-            session_index = 0
-
             video_uri = meeting_video_link["href"]
 
             # video_uri contains("publicinput.com")
             if "publicinput.com" in video_uri:
-                public_input_page = load_web_page(video_uri)
+                public_input_page = self.load_web_page(video_uri, PUBLIC_INPUT_ELEMENTS)
                 if public_input_page is not None:
                     video_iframe = public_input_page.soup.find("iframe")
                     if video_iframe is not None:
@@ -334,49 +590,80 @@ class AshevilleScraper(IngestionModelScraper):
             processed_video_url = self.process_youtube_url(video_uri)
 
             if processed_video_url is not None:
-                print("Processed video URL: " + processed_video_url)
+                log.debug(f"Processed video URL: {processed_video_url}")
+                meetings.append(
+                    BoardMeeting(board_name, agenda_uri, processed_video_url)
+                )
 
-                try:
-                    ydl_opts = {}
-                    with YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(processed_video_url, download=False)
-
-                        if info["release_timestamp"] is not None:
-                            event_release_timestamp = info["release_timestamp"]
-                            event_date = datetime.fromtimestamp(
-                                event_release_timestamp, pytz.timezone("UTC")
-                            )
+        return meetings
 
-                            sessions.append(
-                                self.get_none_if_empty(
-                                    Session(
-                                        session_datetime=self.localize_datetime(
-                                            event_date
-                                        ),
-                                        session_index=session_index,
-                                        video_uri=processed_video_url,
-                                        caption_uri=None,
-                                    )
-                                )
-                            )
+    def get_board_meeting_events(
+        self,
+        meetings: List[BoardMeeting],
+        video_info: Dict[str, Optional[dict]],
+    ) -> List[EventIngestionModel]:
+        """
+        Create EventIngestionModel for each board meeting with a released video
 
-                            events.append(
-                                self.get_none_if_empty(
-                                    EventIngestionModel(
-                                        agenda_uri=agenda_uri,
-                                        body=Body(name=board_name),
-                                        # event_minutes_items=self.get_event_minutes(event_page.soup),
-                                        # minutes_uri=None,
-                                        sessions=sessions,
-                                    )
-                                )
+        Parameters
+        ----------
+        meetings: List[BoardMeeting]
+            Meetings found with find_board_meetings()
+        video_info: Dict[str, Optional[dict]]
+            Processed video URL -> yt-dlp info
+
+        Returns
+        -------
+        events: List[EventIngestionModel]
+            One event per meeting, in meetings order
+        """
+        events: List[EventIngestionModel] = []
+
+        for meeting in meetings:
+            session_index = 0
+
+            try:
+                session = self.get_session_from_video_info(
+                    video_info.get(meeting.video_url),
+                    meeting.video_url,
+                    session_index,
+                )
+
+                if session is not None:
+                    events.append(
+                        self.get_none_if_empty(
+                            EventIngestionModel(
+                                agenda_uri=meeting.agenda_uri,
+                                body=Body(name=meeting.board_name),
+                                # event_minutes_items=self.get_event_minutes(event_page.soup),
+                                # minutes_uri=None,
+                                sessions=[session],
                             )
+                        )
+                    )
 
-                except BaseException as e:
-                    log.error(f"Failed to open {processed_video_url}: {str(e)}")
+            except BaseException as e:
+                log.error(f"Failed to open {meeting.video_url}: {str(e)}")
 
         return reduced_list(events)
 
+    def get_events_for_board(
+        self,
+        board_page: BeautifulSoup,
+        start_date_time: datetime,
+        end_date_time: datetime,
+    ) -> Optional[List[EventIngestionModel]]:
+        meetings = self.find_board_meetings(board_page, start_date_time, end_date_time)
+
+        if meetings is None:
+            return
+
+        video_info = self.video_resolver.resolve(
+            meeting.video_url for meeting in meetings
+        )
+
+        return self.get_board_meeting_events(meetings, video_info)
+
     def get_boards(
         self,
         event_page: BeautifulSoup,
@@ -399,8 +686,6 @@ class AshevilleScraper(IngestionModelScraper):
         """
 
         # Get all months between start and end date
-        events = []
-
         board_tables = event_page.find_all("tbody")
 
         board_table = board_tables[1]
@@ -408,20 +693,67 @@ class AshevilleScraper(IngestionModelScraper):
         board_rows = board_table.find_all("tr")
         # board_rows = [board_table.find('tr')]
 
+        board_urls = []
         for board_row in board_rows:
             board_link = board_row.find("td").find("a")
             if board_link is not None:
-                board_page = load_web_page(board_link["href"])
+                board_urls.append(board_link["href"])
 
-                # print(board_link["href"])
+        def load_board_meetings(board_url: str) -> Optional[List[BoardMeeting]]:
+            board_page = self.load_web_page(board_url, BOARD_PAGE_ELEMENTS)
 
-                if board_page is not None:
-                    new_events = self.get_events_for_board(
-                        board_page.soup, start_date_time, end_date_time
-                    )
+            if board_page is not None:
+                return self.find_board_meetings(
+                    board_page.soup, start_date_time, end_date_time
+                )
 
-                    if new_events is not None:
-                        events += new_events
+            return None
+
+        # map() yields results in board_urls order,
+        # so the result matches the serial path
+        with self.metrics.span("boards.pages"):
+            if self.max_workers > 1 and len(board_urls) > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    board_meetings = list(executor.map(load_board_meetings, board_urls))
+            else:
+                board_meetings = [load_board_meetings(url) for url in board_urls]
+
+        meetings: List[BoardMeeting] = []
+        for new_meetings in board_meetings:
+            if new_meetings is not None:
+                meetings += new_meetings
+
+        if self.checkpoints is not None:
+            seen_ids = set(self.checkpoints.get_seen_ids(BOARDS_SOURCE))
+            meetings = [
+                meeting
+                for meeting in meetings
+                if get_video_id(meeting.video_url) not in seen_ids
+            ]
+
+        # Resolve every board's videos in one parallel batch
+        with self.metrics.span("boards.resolve"):
+            video_info = self.video_resolver.resolve(
+                meeting.video_url for meeting in meetings
+            )
+
+        events = self.get_board_meeting_events(meetings, video_info)
+
+        date_summary = self.agenda_date_parser.summary()
+        for outcome in ("fast", "fallback", "failed"):
+            self.metrics.increment(f"agenda_dates_{outcome}", date_summary[outcome])
+        if date_summary["failed"]:
+            log.warning(f"Agenda dates not found: {date_summary}")
+
+        if self.checkpoints is not None:
+            self.checkpoints.add_seen_ids(
+                BOARDS_SOURCE,
+                (
+                    get_video_id(event.sessions[0].video_uri)
+                    for event in events
+                    if event is not None
+                ),
+            )
 
         return events
 
@@ -444,8 +776,8 @@ class AshevilleScraper(IngestionModelScraper):
         """
         # try to load https://www.portland.gov/council/agenda/yyyy/m/d
 
-        event_page = load_web_page(
-            "https://www.ashevillenc.gov/department/city-clerk/boards-and-commissions/"
+        event_page = self.load_web_page(
+            BOARDS_AND_COMMISSIONS_URL, BOARDS_INDEX_ELEMENTS
         )
 
         if not event_page.status:
@@ -453,6 +785,7 @@ class AshevilleScraper(IngestionModelScraper):
 
         return self.get_boards(event_page.soup, start_date_time, end_date_time)
 
+    @staticmethod
     def filter_upcoming_events(info, *, incomplete):
         """Download only videos longer than a minute (or with unknown duration)"""
         live_status = info.get("live_status")
@@ -464,48 +797,175 @@ class AshevilleScraper(IngestionModelScraper):
         self,
         start_date_time: datetime,
         end_date_time: datetime,
-    ) -> Optional[List[EventIngestionModel]]:
-        print("Load YouTube Channel")
+    ) -> dict:
+        return {
+            "entries": list(
+                self.iter_youtube_channel_videos(start_date_time, end_date_time)
+            )
+        }
 
-        # url = "https://www.youtube.com/@CityofAsheville/streams"
-        url = (
-            "https://www.youtube.com/@CityofAsheville/search?query=before%3A"
-            + end_date_time.strftime("%Y-%m-%d")
-        )
-        url += "%20%2Bafter%3A" + start_date_time.strftime("%Y-%m-%d")
-        # url += "%20%2Blive"
+    def iter_youtube_channel_videos(
+        self,
+        start_date_time: datetime,
+        end_date_time: datetime,
+    ) -> Iterator[dict]:
+        """
+        yt-dlp info of the channel's videos in the time range,
+        yielded as each one is resolved
+        """
+        log.info("Load YouTube Channel")
+
+        url = get_youtube_search_url(start_date_time, end_date_time)
 
         # Create DateRange with start and end date in format YYYYMMDD
         daterange = DateRange(
             start_date_time.strftime("%Y%m%d"), end_date_time.strftime("%Y%m%d")
         )
 
+        seen_ids = set()
+        if self.checkpoints is not None:
+            seen_ids = set(self.checkpoints.get_seen_ids(YOUTUBE_CHANNEL_SOURCE))
+
+        def match_filter(info, *, incomplete):
+            # Rejecting known videos while the search results are still
+            # incomplete skips their full extraction
+            if info.get("id") in seen_ids:
+                return "The video was already gathered"
+            return self.filter_upcoming_events(info, incomplete=incomplete)
+
+        if self.youtube_flat_listing:
+            yield from self.iter_youtube_search_entries(url, daterange, match_filter)
+            return
+
         ydl_opts = {
-            "match_filter": self.filter_upcoming_events,
+            "match_filter": match_filter,
             "daterange": daterange,
             "ignoreerrors": True
             # 'date_before' : end_date_time,
             # 'date_after' : start_date_time,
         }
 
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        with self.video_resolver.ydl_factory(ydl_opts) as ydl:
+            info = self.scheduler.call(
+                url,
+                lambda: ydl.extract_info(url, download=False),
+                get_youtube_dl_retry,
+            )
             # print("Found Video")
             # print(info)
-            return info
+            yield from (info or {}).get("entries") or []
+
+    def get_youtube_search_entries(
+        self,
+        url: str,
+        daterange: DateRange,
+        match_filter: Callable[..., Optional[str]],
+    ) -> dict:
+        """
+        iter_youtube_search_entries() as {"entries": [info, ...]}
+        like a fully resolved search
+        """
+        return {
+            "entries": list(
+                self.iter_youtube_search_entries(url, daterange, match_filter)
+            )
+        }
+
+    def iter_youtube_search_entries(
+        self,
+        url: str,
+        daterange: DateRange,
+        match_filter: Callable[..., Optional[str]],
+    ) -> Iterator[dict]:
+        """
+        List a YouTube search without resolving its entries,
+        then resolve only the entries that pass a pre-filter, in parallel
+
+        Parameters
+        ----------
+        url: str
+            YouTube search URL
+        daterange: DateRange
+            Only videos uploaded in this range are returned
+        match_filter: Callable[..., Optional[str]]
+            yt-dlp style match filter, returns a reason to reject the video
+
+        Returns
+        -------
+        entries: Iterator[dict]
+            info of each entry, in listing order,
+            yielded as soon as it and the entries before it are resolved
+        """
+        # Listing errors are raised so the scheduler can retry them
+        ydl_opts = {"extract_flat": "in_playlist"}
+        with self.video_resolver.ydl_factory(ydl_opts) as ydl:
+            try:
+                with self.metrics.span("youtube_channel.listing"):
+                    listing = self.scheduler.call(
+                        url,
+                        lambda: ydl.extract_info(url, download=False),
+                        get_youtube_dl_retry,
+                    )
+            except Exception as e:
+                log.error(f"Failed to list {url}: {str(e)}")
+                listing = None
+
+        listing = listing or {}
+
+        candidate_urls = []
+        for entry in listing.get("entries") or []:
+            # Flat entries only carry the ID, title and sometimes a date
+            if entry is None or entry.get("id") is None:
+                continue
+
+            if match_filter(entry, incomplete=True) is not None:
+                continue
+
+            upload_date = entry.get("upload_date")
+            timestamp = entry.get("release_timestamp") or entry.get("timestamp")
+            if upload_date is None and timestamp is not None:
+                upload_date = datetime.fromtimestamp(timestamp, pytz.UTC).strftime(
+                    "%Y%m%d"
+                )
+
+            if upload_date is not None and upload_date not in daterange:
+                continue
+
+            candidate_urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+
+        # Entries are handed out as they resolve, so the span also covers
+        # the time spent on them while the rest are still resolving
+        with self.metrics.span("youtube_channel.resolve"):
+            for video_url, info in self.video_resolver.iter_resolve(candidate_urls):
+                if info is None:
+                    continue
+
+                upload_date = info.get("upload_date")
+                if upload_date is not None and upload_date not in daterange:
+                    continue
+
+                if match_filter(info, incomplete=False) is not None:
+                    continue
+
+                yield {**info, "original_url": video_url}
 
     def get_board_events_from_youtube(
         self,
         start_date_time: datetime,
         end_date_time: datetime,
     ) -> Optional[List[EventIngestionModel]]:
-        events = []
+        return list(self.iter_board_events_from_youtube(start_date_time, end_date_time))
 
-        youtube_data = self.get_events_from_youtube_channel(
-            start_date_time, end_date_time
-        )
-
-        for video in youtube_data["entries"]:
+    def iter_board_events_from_youtube(
+        self,
+        start_date_time: datetime,
+        end_date_time: datetime,
+    ) -> Iterator[EventIngestionModel]:
+        """
+        Events of the channel's videos with a release timestamp,
+        yielded as each video is resolved
+        """
+        for video in self.iter_youtube_channel_videos(start_date_time, end_date_time):
             sessions: List[Session] = []
             session_index = 0
 
@@ -542,19 +1002,165 @@ class AshevilleScraper(IngestionModelScraper):
                     )
                 )
 
-                events.append(
-                    self.get_none_if_empty(
-                        EventIngestionModel(
-                            # agenda_uri=agenda_uri,
-                            body=Body(name=board_name),
-                            # event_minutes_items=self.get_event_minutes(event_page.soup),
-                            # minutes_uri=None,
-                            sessions=sessions,
-                        )
+                if self.checkpoints is not None:
+                    self.checkpoints.add_seen_ids(YOUTUBE_CHANNEL_SOURCE, [video["id"]])
+
+                yield self.get_none_if_empty(
+                    EventIngestionModel(
+                        # agenda_uri=agenda_uri,
+                        body=Body(name=board_name),
+                        # event_minutes_items=self.get_event_minutes(event_page.soup),
+                        # minutes_uri=None,
+                        sessions=sessions,
                     )
                 )
 
-        return events
+    def iter_council_meeting_pages(
+        self, start_date_time: datetime, end_date_time: datetime
+    ) -> Iterator[Optional[List[dict]]]:
+        """
+        Read every page of meetings modified in the time range
+        from the meetings REST endpoint
+
+        The first page tells how many pages there are (X-WP-TotalPages),
+        the rest are then fetched concurrently.
+
+        Parameters
+        ----------
+        start_date_time: datetime
+            Meetings modified after this are read
+        end_date_time: datetime
+            Meetings modified before this are read
+
+        Returns
+        -------
+        pages: Iterator[Optional[List[dict]]]
+            Meeting items of each page, in page order,
+            with only MEETING_FIELDS. None for a page that failed to load.
+        """
+        params = get_meetings_params(start_date_time, end_date_time)
+
+        def load_page(
+            page: int,
+        ) -> Tuple[Optional[requests.Response], Optional[List[dict]]]:
+            try:
+                resp = self.session.get(MEETINGS_ENDPOINT, {**params, "page": page})
+                return resp, resp.json() or []
+            except (requests.RequestException, ValueError) as e:
+                log.error(f"Failed to open {MEETINGS_ENDPOINT} page {page}: {str(e)}")
+
+            return None, None
+
+        log.info(f"Get Council Meeting Materials: {MEETINGS_ENDPOINT}")
+
+        resp, items = load_page(1)
+        yield items
+
+        if resp is None:
+            return
+
+        total_pages = int(resp.headers.get("X-WP-TotalPages", 1))
+        if total_pages < 2:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(load_page, page) for page in range(2, total_pages + 1)
+            ]
+
+            # Each page is yielded as soon as it and the pages before it
+            # have arrived, keeping the page order deterministic
+            for future in futures:
+                yield future.result()[1]
+
+    def iter_council_meeting_events(
+        self, start_date_time: datetime, end_date_time: datetime
+    ) -> Iterator[EventIngestionModel]:
+        """
+        Events of the meetings REST endpoint, yielded page by page
+        as soon as each page's videos are resolved
+
+        Parameters
+        ----------
+        start_date_time: datetime
+            Meetings modified after this are read
+        end_date_time: datetime
+            Meetings modified before this are read
+
+        Returns
+        -------
+        events: Iterator[EventIngestionModel]
+            Event for each meeting video with a release timestamp
+
+        Notes
+        -----
+        In incremental mode the checkpoint only moves past meetings whose
+        every video became an event. It stops before the first meeting with a
+        video that failed to resolve or has no release timestamp yet, so that
+        meeting is read again by the next gather, and does not move at all
+        when a page failed to load.
+        """
+        if self.checkpoints is not None:
+            modified = self.checkpoints.get_modified(MEETINGS_SOURCE)
+            if modified is not None:
+                start_date_time = max(
+                    start_date_time,
+                    datetime.fromisoformat(modified).replace(tzinfo=pytz.UTC),
+                )
+
+        # modified_gmt of the meetings whose events were all built, and not
+        built: List[str] = []
+        not_built: List[str] = []
+        failed_pages = 0
+
+        for data in self.iter_council_meeting_pages(start_date_time, end_date_time):
+            if data is None:
+                failed_pages += 1
+                continue
+
+            # Resolve every meeting's videos on the page in one parallel batch
+            with self.metrics.span("meetings.resolve"):
+                video_info = self.video_resolver.resolve(
+                    url
+                    for item in data
+                    for url in self.get_council_meeting_video_urls(item)
+                )
+
+            for item in data:
+                council_events = self.get_council_meeting_events(item, video_info)
+                if council_events is not None:
+                    yield from council_events
+
+                if item.get("modified_gmt"):
+                    videos = [
+                        url
+                        for url in self.get_council_meeting_video_urls(item)
+                        if url is not None
+                    ]
+                    if len(council_events or []) < len(videos):
+                        not_built.append(item["modified_gmt"])
+                    else:
+                        built.append(item["modified_gmt"])
+
+        if self.checkpoints is None:
+            return
+
+        if failed_pages:
+            log.warning(
+                f"{failed_pages} page(s) of {MEETINGS_ENDPOINT} failed to load, "
+                f"not advancing the {MEETINGS_SOURCE} checkpoint"
+            )
+            return
+
+        first_not_built = min(not_built, default=None)
+        self.checkpoints.advance_modified(
+            MEETINGS_SOURCE,
+            (
+                modified
+                for modified in built
+                if first_not_built is None or modified < first_not_built
+            ),
+        )
 
     def load_council_meeting_materials_rest(
         self, start_date_time: datetime, end_date_time: datetime
@@ -573,43 +1179,177 @@ class AshevilleScraper(IngestionModelScraper):
             None if there was no meeting on event_time
             or information for the meeting did not meet minimal CDP requirements.
         """
+        return list(self.iter_council_meeting_events(start_date_time, end_date_time))
 
-        # Load JSON from REST ENDPOINT
-        # https://www.ashevillenc.gov/wp-json/wp/v2/meetings/
-        city_council_mettings_endpoint = (
-            "https://www.ashevillenc.gov/wp-json/wp/v2/meetings/"
-        )
+    def iter_source_events(
+        self, start_date_time: datetime, end_date_time: datetime
+    ) -> Iterator[Tuple[str, EventIngestionModel]]:
+        """
+        Run every source concurrently and yield their events as they are built
 
-        city_council_mettings_endpoint_url = city_council_mettings_endpoint
-        city_council_mettings_endpoint_url += (
-            "?modified_after=" + start_date_time.isoformat()
-        )
-        city_council_mettings_endpoint_url += (
-            "&modified_before=" + end_date_time.isoformat()
-        )
-        city_council_mettings_endpoint_url = city_council_mettings_endpoint_url.replace(
-            "+00:00", ""
+        Parameters
+        ----------
+        start_date_time: datetime
+            Datetime to start event gather from
+        end_date_time: datetime
+            Datetime to end event gather at
+
+        Returns
+        -------
+        source_events: Iterator[Tuple[str, EventIngestionModel]]
+            (source name, event) pairs. Each source's events keep their order,
+            sources are interleaved as they produce events.
+
+        Raises
+        ------
+        BaseException
+            The first error raised by a source, once the other sources finish
+        """
+        sources: Dict[str, Callable[[], Iterable[EventIngestionModel]]] = {
+            # board_events = self.load_board_and_commission_page(start, end)
+            YOUTUBE_CHANNEL_SOURCE: lambda: self.iter_board_events_from_youtube(
+                start_date_time, end_date_time
+            ),
+            MEETINGS_SOURCE: lambda: self.iter_council_meeting_events(
+                start_date_time, end_date_time
+            ),
+            # Future - Pull events from other sources
+        }
+
+        finished = object()
+        results: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+
+        def run_source(source: str) -> None:
+            try:
+                with self.metrics.span(f"source.{source}"):
+                    for event in sources[source]() or []:
+                        if event is not None:
+                            self.metrics.increment(f"events_{source}")
+                            results.put((source, event))
+            except BaseException as e:
+                results.put((source, e))
+            finally:
+                results.put((source, finished))
+
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            for source in sources:
+                executor.submit(run_source, source)
+
+            running = len(sources)
+            while running:
+                source, result = results.get()
+                if result is finished:
+                    running -= 1
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    yield source, result
+
+    def drop_known_sessions(
+        self, events: List[EventIngestionModel]
+    ) -> List[EventIngestionModel]:
+        """
+        Drop sessions processed by earlier gathers
+        so they never reach the GPU pipeline again
+        """
+        if self.known_sessions is None:
+            return events
+
+        gathered = len(events)
+        events = drop_known_sessions(events, self.known_sessions)
+        self.metrics.increment("events_known_dropped", gathered - len(events))
+        self.known_sessions.add(
+            session.video_uri for event in events for session in event.sessions
         )
+        return events
 
-        print("Get Council Meeting Materials: " + city_council_mettings_endpoint_url)
+    def save_checkpoints(self) -> None:
+        """
+        Persist checkpoints and known sessions,
+        only called once every source succeeded
+        """
+        if self.checkpoints is not None:
+            self.checkpoints.save()
+        if self.known_sessions is not None:
+            self.known_sessions.save()
 
-        events = []
-        try:
-            with urlopen(city_council_mettings_endpoint_url) as resp:
-                response = resp.read()
-                # data = response.json()
-                data = json.loads(response.decode("utf-8"))
+    def report_metrics(self) -> None:
+        """
+        Log the gather's metrics as a JSON summary
+        and write them to metrics_file when set
+        """
+        log.info(f"Gather metrics: {self.metrics.to_json()}")
+
+        if self.metrics_file is not None:
+            path = Path(self.metrics_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(self.metrics.to_openmetrics())
+            os.replace(tmp_path, path)
+
+    def iter_new_events(
+        self, source_events: Iterable[Tuple[str, EventIngestionModel]]
+    ) -> Iterator[EventIngestionModel]:
+        """
+        The gather pipeline shared by iter_events() and get_events():
+        drop duplicate and already ingested events in the order given,
+        then persist checkpoints and known sessions once every event is read
+
+        Parameters
+        ----------
+        source_events: Iterable[Tuple[str, EventIngestionModel]]
+            (source name, event) pairs, in order of preference
 
-                if data is not None:
-                    for item in data:
-                        council_events = self.get_council_meeting_events(item)
-                        if council_events is not None:
-                            events += council_events
+        Returns
+        -------
+        events: Iterator[EventIngestionModel]
+            The first event of each meeting. The agenda and minutes of later
+            duplicates are merged into it in place, after it was yielded.
+        """
+        deduplicator = EventDeduplicator()
+        for _, event in source_events:
+            event = deduplicator.add(event)
+            if event is None:
+                self.metrics.increment("events_duplicates")
+            else:
+                yield from self.drop_known_sessions([event])
 
-        except URLError or HTTPError as e:
-            log.error(f"Failed to open {city_council_mettings_endpoint}: {str(e)}")
+        self.save_checkpoints()
 
-        return events
+    def iter_events(
+        self,
+        from_dt: datetime,
+        to_dt: datetime,
+    ) -> Iterator[EventIngestionModel]:
+        """
+        Yield every event for the provided timespan as soon as it is built.
+
+        Parameters
+        ----------
+        from_dt: datetime
+            Datetime to start event gather from.
+        to_dt: datetime
+            Datetime to end event gather at.
+
+        Returns
+        -------
+        events: Iterator[EventIngestionModel]
+            All events gathered that occured in the provided time range.
+
+        Notes
+        -----
+        Sources run concurrently, so when a video is found by several sources
+        the first event built is yielded, whichever source it came from.
+        The agenda and minutes of later duplicates are merged into it in place,
+        after it was yielded. get_events() runs the same pipeline on the
+        events of all sources ordered by SOURCE_PRIORITY instead, so its
+        events are complete when returned and prefer the YouTube source.
+        """
+        start_date = from_dt.replace(tzinfo=pytz.UTC)
+        end_date = to_dt.replace(tzinfo=pytz.UTC)
+
+        yield from self.iter_new_events(self.iter_source_events(start_date, end_date))
+        self.report_metrics()
 
     def get_events(
         self,
@@ -644,15 +1384,17 @@ class AshevilleScraper(IngestionModelScraper):
 
         end_date = to_dt.replace(tzinfo=pytz.UTC)
 
-        # Your implementation here
-        # board_events = self.load_board_and_commission_page(start_date, end_date)
-        board_events = self.get_board_events_from_youtube(start_date, end_date)
-        events = self.load_council_meeting_materials_rest(start_date, end_date)
-
-        if board_events is not None:
-            events += board_events
+        with self.metrics.span("get_events"):
+            # A council video is often found both on the channel and through
+            # the REST endpoint. Keep the YouTube event, with the REST agenda
+            # and minutes merged in, so each video is processed once.
+            source_events = sorted(
+                self.iter_source_events(start_date, end_date),
+                key=lambda source_event: SOURCE_PRIORITY.index(source_event[0]),
+            )
+            events = list(self.iter_new_events(source_events))
 
-        # Future - Pull events from other sources
+        self.report_metrics()
 
         # print(events)
         return events
@@ -684,10 +1426,40 @@ def get_events(
     to ignore the from_dt and to_dt parameters.
     However, they are useful for manually kicking off pipelines
     from GitHub Actions UI.
+
+    Pass incremental=True, or set CDP_ASHEVILLE_INCREMENTAL=true,
+    to only gather what changed since the last incremental gather.
+
+    Set CDP_ASHEVILLE_METRICS_FILE to a path to write the gather's timings
+    and counters there in the OpenMetrics text format.
+
+    Set CDP_ASHEVILLE_KNOWN_SESSIONS=manifest to drop sessions returned by
+    earlier gathers, or CDP_ASHEVILLE_KNOWN_SESSIONS=firestore to drop
+    sessions already in the instance's database. The manifest, kept in the
+    cache directory, records returned sessions, not ingested ones. It only
+    skips ingested sessions because the workflows' actions/cache saves that
+    directory after successful runs alone, see known_sessions.
     """
 
+    incremental = kwargs.pop(
+        "incremental", os.environ.get(INCREMENTAL_ENV, "").lower() == "true"
+    )
+
+    known_sessions = None
+    known_sessions_mode = os.environ.get(KNOWN_SESSIONS_ENV, "").lower()
+    if known_sessions_mode == "manifest":
+        known_sessions = ManifestSessionLookup(get_cache_dir() / "known-sessions.txt")
+    elif known_sessions_mode == "firestore":
+        known_sessions = FirestoreSessionLookup(
+            os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "google-creds.json")
+        )
+
     # Your implementation here
-    scraper = AshevilleScraper()
+    scraper = AshevilleScraper(
+        incremental=incremental,
+        known_sessions=known_sessions,
+        metrics_file=os.environ.get(METRICS_FILE_ENV) or None,
+    )
     return scraper.get_events(from_dt, to_dt)
 
 
@@ -707,6 +1479,8 @@ if __name__ == "__main__":
     # start_date_time = datetime(2021, 9, 26)
     # end_date_time = datetime(2021, 9, 29)
 
+    logging.basicConfig(level=logging.INFO)
+
     scraper = AshevilleScraper()
 
     asheville_events = scraper.get_events(start_date_time, end_date_time)
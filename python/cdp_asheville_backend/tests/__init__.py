@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+"""Unit test package for cdp_asheville_backend."""
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+import pytz
+
+from cdp_asheville_backend.parsing import parse_html
+from cdp_asheville_backend.replay import (
+    HTTP_FIXTURES,
+    YOUTUBE_DL_FIXTURES,
+    FixtureCorpus,
+    get_request_key,
+)
+from cdp_asheville_backend.scraper import (
+    BOARDS_AND_COMMISSIONS_URL,
+    MEETINGS_ENDPOINT,
+    get_meetings_params,
+    get_youtube_search_url,
+)
+
+###############################################################################
+
+# Replay a corpus recorded with python -m cdp_asheville_backend.replay
+# instead of the synthetic one
+CORPUS_ENV = "CDP_ASHEVILLE_CORPUS"
+
+START = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+END = datetime(2023, 3, 1, tzinfo=pytz.UTC)
+
+N_BOARDS = 6
+N_BOARD_MEETINGS = 8
+N_COUNCIL_PAGES = 2
+N_COUNCIL_MEETINGS = 10
+N_CHANNEL_ONLY_VIDEOS = 12
+
+###############################################################################
+
+
+def board_video_id(board: int, meeting: int) -> str:
+    return f"b{board:02d}m{meeting:02d}xxxxx"
+
+
+def council_video_id(item: int, video: int) -> str:
+    return f"c{item:03d}v{video}xxxxx"
+
+
+def channel_video_id(video: int) -> str:
+    return f"y{video:03d}xxxxxxx"
+
+
+def meeting_date(index: int) -> datetime:
+    return START + timedelta(days=3 + 5 * index, hours=17)
+
+
+def _put_page(
+    corpus: FixtureCorpus, url: str, body: str, params: dict = None, **headers
+) -> None:
+    corpus.put(
+        HTTP_FIXTURES,
+        get_request_key(url, params),
+        {"status": 200, "headers": headers, "body": body},
+    )
+
+
+def _put_info(corpus: FixtureCorpus, video_id: str, title: str, date: datetime):
+    corpus.put(
+        YOUTUBE_DL_FIXTURES,
+        f"https://www.youtube.com/watch?v={video_id}",
+        {
+            "info": {
+                "id": video_id,
+                "title": title,
+                "release_timestamp": int(date.timestamp()),
+                "upload_date": date.strftime("%Y%m%d"),
+                "live_status": "was_live",
+            }
+        },
+    )
+
+
+def build_synthetic_corpus(directory: Path) -> FixtureCorpus:
+    """
+    Small corpus shaped like the City of Asheville sites and channel:
+    board pages with a publicinput.com video, two pages of council meetings
+    whose videos are also on the channel, and channel-only videos
+    """
+    corpus = FixtureCorpus(directory)
+    corpus.save_range(START, END)
+
+    # Boards and commissions page, the board links are in its second table
+    board_rows = "".join(
+        f'<tr><td><a href="https://www.ashevillenc.gov/board/{board}/">'
+        f"Board {board}</a></td><td>Monthly</td></tr>"
+        for board in range(N_BOARDS)
+    )
+    _put_page(
+        corpus,
+        BOARDS_AND_COMMISSIONS_URL,
+        "<html><body><nav>Menu</nav><table><tbody><tr><td>Intro</td></tr>"
+        f"</tbody></table><table><tbody>{board_rows}</tbody></table>"
+        "</body></html>",
+        **{"Content-Type": "text/html; charset=UTF-8"},
+    )
+
+    for board in range(N_BOARDS):
+        meeting_rows = []
+        for meeting in range(N_BOARD_MEETINGS):
+            date = meeting_date(meeting)
+            video_id = board_video_id(board, meeting)
+            video_url = f"https://youtu.be/{video_id}?si=share"
+            if meeting == 0:
+                video_url = f"https://publicinput.com/board-{board}"
+                _put_page(
+                    corpus,
+                    video_url,
+                    "<html><body><p>Watch</p><iframe "
+                    f'src="https://www.youtube.com/embed/{video_id}"></iframe>'
+                    "</body></html>",
+                )
+
+            meeting_rows.append(
+                "<tr>"
+                f'<td><a href="https://drive.google.com/file/d/agenda{board}'
+                f'{meeting}/view">Agenda – {date:%B} {date.day}, {date.year}</a></td>'
+                "<td>Minutes</td>"
+                f'<td><a href="{video_url}">Video</a></td>'
+                "</tr>"
+            )
+            _put_info(corpus, video_id, f"Board {board} – Meeting", date)
+
+        _put_page(
+            corpus,
+            f"https://www.ashevillenc.gov/board/{board}/",
+            "<html><head><script>var x = 1;</script></head><body>"
+            f"<nav>{'<a href=/>Link</a>' * 50}</nav>"
+            f'<h2 class="entry-title">Board {board}</h2>'
+            f"<table><tbody>{''.join(meeting_rows)}</tbody></table>"
+            "</body></html>",
+        )
+
+    # Council meetings REST endpoint
+    params = get_meetings_params(START, END)
+    channel_entries = []
+    for page in range(1, N_COUNCIL_PAGES + 1):
+        items = []
+        for meeting in range(N_COUNCIL_MEETINGS):
+            item = page * 100 + meeting
+            date = meeting_date(meeting)
+            videos = []
+            for video, label in enumerate(("City Council Meeting", "Agenda Briefing")):
+                video_id = council_video_id(item, video)
+                videos.append(
+                    {
+                        "video_url": f"https://www.youtube.com/watch?v={video_id}",
+                        "video_label": label,
+                    }
+                )
+                _put_info(corpus, video_id, f"City Council – {label}", date)
+                channel_entries.append(
+                    {"id": video_id, "title": f"City Council – {label}"}
+                )
+
+            items.append(
+                {
+                    "id": item,
+                    "modified": date.isoformat(),
+                    "modified_gmt": date.isoformat(),
+                    "acf": {
+                        "meeting_videos": videos,
+                        "meeting_agenda": f"https://drive.google.com/file/d/a{item}"
+                        "/view?usp=sharing",
+                        "meeting_agenda_briefing": None,
+                        "meeting_minutes": None,
+                    },
+                }
+            )
+
+        _put_page(
+            corpus,
+            MEETINGS_ENDPOINT,
+            json.dumps(items),
+            {**params, "page": page},
+            **{
+                "Content-Type": "application/json",
+                "X-WP-TotalPages": str(N_COUNCIL_PAGES),
+            },
+        )
+
+    # Channel search, listing the council videos and channel-only ones
+    for video in range(N_CHANNEL_ONLY_VIDEOS):
+        video_id = channel_video_id(video)
+        _put_info(
+            corpus, video_id, "Planning Commission – Meeting", meeting_date(video)
+        )
+        channel_entries.append({"id": video_id, "title": "Planning Commission"})
+
+    corpus.put(
+        YOUTUBE_DL_FIXTURES,
+        get_request_key(
+            get_youtube_search_url(START, END), {"extract_flat": "in_playlist"}
+        ),
+        {"info": {"entries": channel_entries}},
+    )
+
+    return corpus
+
+
+###############################################################################
+
+
+@pytest.fixture(scope="session")
+def synthetic_corpus(tmp_path_factory) -> FixtureCorpus:
+    return build_synthetic_corpus(tmp_path_factory.mktemp("corpus"))
+
+
+@pytest.fixture(scope="session")
+def replay_corpus(synthetic_corpus) -> FixtureCorpus:
+    """
+    The corpus recorded in CDP_ASHEVILLE_CORPUS, the synthetic one by default
+    """
+    if os.environ.get(CORPUS_ENV):
+        return FixtureCorpus(os.environ[CORPUS_ENV])
+
+    return synthetic_corpus
+
+
+@pytest.fixture(scope="session")
+def replay_range(replay_corpus) -> Tuple[datetime, datetime]:
+    return replay_corpus.load_range()
+
+
+@pytest.fixture(scope="session")
+def board_pages(replay_corpus) -> List[Tuple[str, str]]:
+    """
+    (URL, markup) of the boards and commissions page, then of every board page
+    """
+
+    def get_markup(url: str) -> str:
+        return replay_corpus.get(HTTP_FIXTURES, get_request_key(url))["body"]
+
+    index = get_markup(BOARDS_AND_COMMISSIONS_URL)
+    board_table = parse_html(index).find_all("tbody")[1]
+    board_urls = [
+        row.find("td").find("a")["href"]
+        for row in board_table.find_all("tr")
+        if row.find("td").find("a") is not None
+    ]
+    return [(BOARDS_AND_COMMISSIONS_URL, index)] + [
+        (url, get_markup(url)) for url in board_urls
+    ]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+End to end and per stage timings of the scraper against a replayed corpus.
+
+pytest cdp_asheville_backend/tests/test_benchmarks.py
+CDP_ASHEVILLE_CORPUS=corpus/ pytest cdp_asheville_backend/tests/test_benchmarks.py
+
+Peak traced allocations of each benchmark are reported in its extra_info.
+"""
+
+import tracemalloc
+from typing import Any, Callable
+
+import pytest
+
+from cdp_asheville_backend.dates import SAMPLE_AGENDA_LABELS, AgendaDateParser
+from cdp_asheville_backend.dedup import deduplicate_events
+from cdp_asheville_backend.parsing import (
+    BOARD_PAGE_ELEMENTS,
+    BOARDS_INDEX_ELEMENTS,
+    parse_html,
+)
+from cdp_asheville_backend.replay import get_replay_scraper
+
+pytest.importorskip("pytest_benchmark")
+
+###############################################################################
+
+
+def run_benchmark(benchmark, setup: Callable[[], Any], stage: Callable[[Any], Any]):
+    """
+    Benchmark stage on a fresh setup() every round, so no round is served
+    from what an earlier one resolved, and record its peak allocations
+    """
+    tracemalloc.start()
+    try:
+        stage(setup())
+        _, peak = tracemalloc.get_traced_memory()
+        benchmark.extra_info["peak_allocated_bytes"] = peak
+    finally:
+        tracemalloc.stop()
+
+    return benchmark.pedantic(
+        stage, setup=lambda: ((setup(),), {}), rounds=10, warmup_rounds=1
+    )
+
+
+def test_get_events(benchmark, replay_corpus, replay_range):
+    events = run_benchmark(
+        benchmark,
+        lambda: get_replay_scraper(replay_corpus),
+        lambda scraper: scraper.get_events(*replay_range),
+    )
+    assert events
+
+
+def test_youtube_channel(benchmark, replay_corpus, replay_range):
+    events = run_benchmark(
+        benchmark,
+        lambda: get_replay_scraper(replay_corpus),
+        lambda scraper: scraper.get_board_events_from_youtube(*replay_range),
+    )
+    assert events
+
+
+def test_council_meetings(benchmark, replay_corpus, replay_range):
+    events = run_benchmark(
+        benchmark,
+        lambda: get_replay_scraper(replay_corpus),
+        lambda scraper: scraper.load_council_meeting_materials_rest(*replay_range),
+    )
+    assert events
+
+
+def test_board_pages(benchmark, replay_corpus, replay_range):
+    run_benchmark(
+        benchmark,
+        lambda: get_replay_scraper(replay_corpus),
+        lambda scraper: scraper.load_board_and_commission_page(*replay_range),
+    )
+
+
+@pytest.mark.parametrize("lightweight", [False, True], ids=["full", "lightweight"])
+def test_parse_board_pages(benchmark, board_pages, lightweight):
+    # Only the parse of the saved pages, without requests or video lookups.
+    # tracemalloc only sees Python allocations, not libxml2's own buffers.
+    elements = [BOARDS_INDEX_ELEMENTS] + [BOARD_PAGE_ELEMENTS] * (len(board_pages) - 1)
+
+    soups = run_benchmark(
+        benchmark,
+        lambda: board_pages,
+        lambda pages: [
+            parse_html(markup, page_elements, lightweight)
+            for (_, markup), page_elements in zip(pages, elements)
+        ],
+    )
+    assert all(soup.find("tbody") is not None for soup in soups)
+
+
+def test_deduplicate_events(benchmark, replay_corpus, replay_range):
+    scraper = get_replay_scraper(replay_corpus)
+    events = [event for _, event in scraper.iter_source_events(*replay_range)]
+
+    kept = run_benchmark(benchmark, lambda: events, deduplicate_events)
+    assert len(kept) <= len(events)
+
+
+def test_agenda_dates(benchmark):
+    parser = AgendaDateParser()
+    dates = benchmark(lambda: [parser.parse(label) for label in SAMPLE_AGENDA_LABELS])
+
+    assert all(date is not None for date in dates)
+    assert parser.summary()["failed"] == 0
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from datetime import datetime, timedelta
+
+from cdp_asheville_backend.checkpoints import MEETINGS_SOURCE, CheckpointStore
+from cdp_asheville_backend.replay import (
+    HTTP_FIXTURES,
+    YOUTUBE_DL_FIXTURES,
+    FixtureCorpus,
+    get_replay_scraper,
+    get_request_key,
+)
+from cdp_asheville_backend.scraper import MEETINGS_ENDPOINT, get_meetings_params
+
+from .conftest import END, START, council_video_id, meeting_date
+
+###############################################################################
+
+
+def put_meetings_page(corpus, page, items, total_pages):
+    corpus.put(
+        HTTP_FIXTURES,
+        get_request_key(
+            MEETINGS_ENDPOINT, {**get_meetings_params(START, END), "page": page}
+        ),
+        {
+            "status": 200,
+            "headers": {
+                "Content-Type": "application/json",
+                "X-WP-TotalPages": str(total_pages),
+            },
+            "body": json.dumps(items),
+        },
+    )
+
+
+def meeting_item(corpus, item, release_timestamp=True):
+    """
+    Meeting with one video modified item days after START,
+    whose video has no release timestamp yet unless release_timestamp
+    """
+    video_id = council_video_id(item, 0)
+    date = meeting_date(item)
+    corpus.put(
+        YOUTUBE_DL_FIXTURES,
+        f"https://www.youtube.com/watch?v={video_id}",
+        {
+            "info": {
+                "id": video_id,
+                "title": "City Council – City Council Meeting",
+                "release_timestamp": (
+                    int(date.timestamp()) if release_timestamp else None
+                ),
+                "live_status": "was_live" if release_timestamp else "is_live",
+            }
+        },
+    )
+
+    modified = (START + timedelta(days=item)).replace(tzinfo=None)
+    return {
+        "id": item,
+        "modified": modified.isoformat(),
+        "modified_gmt": modified.isoformat(),
+        "acf": {
+            "meeting_videos": [
+                {
+                    "video_url": f"https://www.youtube.com/watch?v={video_id}",
+                    "video_label": "City Council Meeting",
+                }
+            ],
+            "meeting_agenda": None,
+            "meeting_agenda_briefing": None,
+            "meeting_minutes": None,
+        },
+    }
+
+
+def get_meeting_events(corpus, checkpoints):
+    scraper = get_replay_scraper(corpus, incremental=True, checkpoints=checkpoints)
+    return list(scraper.iter_council_meeting_events(START, END))
+
+
+def test_meetings_params_site_local():
+    params = get_meetings_params(START, datetime(2023, 7, 1, 12))
+
+    # EST in winter, EDT in summer, naive datetimes are UTC
+    assert params["modified_after"] == "2022-12-31T19:00:00"
+    assert params["modified_before"] == "2023-07-01T08:00:00"
+
+
+def test_checkpoint_stops_before_unreleased_video(tmp_path):
+    corpus = FixtureCorpus(tmp_path / "corpus")
+    items = [
+        meeting_item(corpus, 1),
+        meeting_item(corpus, 2, release_timestamp=False),
+        meeting_item(corpus, 3),
+    ]
+    put_meetings_page(corpus, 1, items, total_pages=1)
+    checkpoints = CheckpointStore(tmp_path / "checkpoints.json")
+
+    events = get_meeting_events(corpus, checkpoints)
+
+    # The meeting modified after the unreleased one is ingested,
+    # the mark does not pass the unreleased one
+    assert len(events) == 2
+    assert checkpoints.get_modified(MEETINGS_SOURCE) == items[0]["modified_gmt"]
+
+
+def test_checkpoint_kept_when_page_fails(tmp_path):
+    corpus = FixtureCorpus(tmp_path / "corpus")
+    # Page 2 was not recorded, so it fails to load
+    put_meetings_page(
+        corpus, 1, [meeting_item(corpus, 1), meeting_item(corpus, 2)], total_pages=2
+    )
+    checkpoints = CheckpointStore(tmp_path / "checkpoints.json")
+
+    events = get_meeting_events(corpus, checkpoints)
+
+    assert len(events) == 2
+    assert checkpoints.get_modified(MEETINGS_SOURCE) is None
+
+
+def test_checkpoint_advances(tmp_path):
+    corpus = FixtureCorpus(tmp_path / "corpus")
+    items = [meeting_item(corpus, 1), meeting_item(corpus, 2)]
+    put_meetings_page(corpus, 1, items, total_pages=1)
+    checkpoints = CheckpointStore(tmp_path / "checkpoints.json")
+
+    assert len(get_meeting_events(corpus, checkpoints)) == 2
+    assert checkpoints.get_modified(MEETINGS_SOURCE) == items[1]["modified_gmt"]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+import pytz
+
+from cdp_asheville_backend.dates import SAMPLE_AGENDA_LABELS, AgendaDateParser
+
+###############################################################################
+
+
+def test_sample_labels():
+    parser = AgendaDateParser()
+    dates = [parser.parse(label) for label in SAMPLE_AGENDA_LABELS]
+
+    assert all(date is not None for date in dates)
+    assert dates[0] == datetime(2023, 1, 5, tzinfo=pytz.UTC)
+    assert dates[11] == datetime(2023, 9, 14, tzinfo=pytz.UTC)
+    # "Agenda 10/12/2023" has no month name
+    assert dates[12] == datetime(2023, 10, 12, tzinfo=pytz.UTC)
+    assert parser.summary() == {
+        "fast": len(SAMPLE_AGENDA_LABELS) - 1,
+        "fallback": 1,
+        "failed": 0,
+        "failures": [],
+    }
+
+
+@pytest.mark.parametrize(
+    "label, expected",
+    [
+        ("Agenda Jan. 5 2023", datetime(2023, 1, 5)),
+        ("Agenda Sept 5th,2023", datetime(2023, 9, 5)),
+        ("Agenda Sep. 5, 2023", datetime(2023, 9, 5)),
+        ("Agenda DECEMBER 12, 2023", datetime(2023, 12, 12)),
+        ("Agenda June 1, 2023", datetime(2023, 6, 1)),
+    ],
+)
+def test_month_name_dates(label, expected):
+    parser = AgendaDateParser()
+
+    assert parser.parse(label) == expected.replace(tzinfo=pytz.UTC)
+    assert parser.summary()["fast"] == 1
+
+
+@pytest.mark.parametrize(
+    "label, expected",
+    [
+        ("Agenda 1/5/2023", datetime(2023, 1, 5)),
+        ("Agenda 01-05-2023", datetime(2023, 1, 5)),
+        ("Agenda 1/5/23", datetime(2023, 1, 5)),
+        ("Agenda 2023-01-05", datetime(2023, 1, 5)),
+        ("Agenda 5 January 2023", datetime(2023, 1, 5)),
+    ],
+)
+def test_fallback_formats(label, expected):
+    parser = AgendaDateParser()
+
+    assert parser.parse(label) == expected.replace(tzinfo=pytz.UTC)
+    assert parser.summary()["fallback"] == 1
+
+
+@pytest.mark.parametrize(
+    "label",
+    [
+        # Words starting like a month are not one
+        "Decision 12, 2023 Agenda",
+        "Mayor 5 2023 proclamation",
+        "Novel 3, 2024",
+        # No such day
+        "Agenda February 30, 2023",
+        "Agenda",
+    ],
+)
+def test_no_date(label):
+    parser = AgendaDateParser()
+
+    assert parser.parse(label) is None
+    assert parser.summary() == {
+        "fast": 0,
+        "fallback": 0,
+        "failed": 1,
+        "failures": [label],
+    }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytz
+from cdp_backend.pipeline.ingestion_models import Body, EventIngestionModel, Session
+
+from cdp_asheville_backend.dedup import (
+    MERGED_FIELDS,
+    EventDeduplicator,
+    deduplicate_events,
+    get_event_key,
+    merge_events,
+)
+
+###############################################################################
+
+VIDEO_ID = "9giQGUCV9d0"
+WATCH_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+DRIVE_VIEW_URL = "https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+DRIVE_URL = "https://drive.google.com/uc?export=download&id={file_id}"
+
+
+def make_event(video_uri, body_name="City Council", hour=17, **fields):
+    return EventIngestionModel(
+        body=Body(name=body_name),
+        sessions=[
+            Session(
+                session_datetime=datetime(2023, 1, 5, hour, tzinfo=pytz.UTC),
+                video_uri=video_uri,
+                session_index=0,
+            )
+        ],
+        **fields,
+    )
+
+
+###############################################################################
+
+
+def test_youtube_key():
+    # Every URL form of a video shares a key, whatever the body and time
+    keys = {
+        get_event_key(make_event(WATCH_URL)),
+        get_event_key(make_event(f"https://youtu.be/{VIDEO_ID}?si=share", hour=9)),
+        get_event_key(
+            make_event(f"https://www.youtube.com/embed/{VIDEO_ID}", "Planning Board")
+        ),
+    }
+    assert keys == {("video", VIDEO_ID)}
+
+
+def test_drive_key():
+    # Links to the same Drive file share a key
+    assert get_event_key(
+        make_event(DRIVE_VIEW_URL.format(file_id="abc-123"))
+    ) == get_event_key(make_event(DRIVE_URL.format(file_id="abc-123"), hour=9))
+
+    # Two videos of the same body on the same day do not
+    assert get_event_key(make_event(DRIVE_URL.format(file_id="abc-123"))) != (
+        get_event_key(make_event(DRIVE_URL.format(file_id="def-456")))
+    )
+
+    # Nor do videos of two bodies
+    assert get_event_key(make_event(DRIVE_URL.format(file_id="abc-123"))) != (
+        get_event_key(make_event(DRIVE_URL.format(file_id="abc-123"), "Planning Board"))
+    )
+
+
+def test_no_session_key():
+    event = make_event(WATCH_URL)
+    event.sessions = []
+
+    assert get_event_key(event) is None
+
+
+def test_merge_events_fills_missing_fields():
+    event = make_event(WATCH_URL, agenda_uri="kept-agenda.pdf")
+    duplicate = make_event(
+        WATCH_URL, agenda_uri="other-agenda.pdf", minutes_uri="minutes.pdf"
+    )
+
+    merge_events(event, duplicate)
+
+    # Values of the kept event are never overwritten
+    assert event.agenda_uri == "kept-agenda.pdf"
+    assert event.minutes_uri == "minutes.pdf"
+    assert event.event_minutes_items is None
+    assert set(MERGED_FIELDS) == {"agenda_uri", "minutes_uri", "event_minutes_items"}
+
+
+def test_merge_events_only_merged_fields():
+    event = make_event(WATCH_URL)
+    duplicate = make_event(f"https://youtu.be/{VIDEO_ID}", "Planning Board")
+
+    merge_events(event, duplicate)
+
+    assert event.body.name == "City Council"
+    assert event.sessions[0].video_uri == WATCH_URL
+
+
+def test_deduplicator_keeps_first_event():
+    deduplicator = EventDeduplicator()
+    first = make_event(WATCH_URL)
+    duplicate = make_event(f"https://youtu.be/{VIDEO_ID}", agenda_uri="agenda.pdf")
+
+    assert deduplicator.add(first) is first
+    assert deduplicator.add(duplicate) is None
+    assert deduplicator.add(None) is None
+
+    # Merged in place into the event already handed out
+    assert first.agenda_uri == "agenda.pdf"
+    assert first.sessions[0].video_uri == WATCH_URL
+
+
+def test_deduplicate_events():
+    youtube = make_event(WATCH_URL)
+    drive = make_event(DRIVE_URL.format(file_id="abc-123"))
+    other_drive = make_event(DRIVE_URL.format(file_id="def-456"))
+    no_sessions = make_event(WATCH_URL)
+    no_sessions.sessions = []
+
+    # One event per meeting, in order of first appearance,
+    # events without a session are always kept
+    assert deduplicate_events(
+        [
+            youtube,
+            drive,
+            make_event(f"https://youtu.be/{VIDEO_ID}"),
+            no_sessions,
+            make_event(DRIVE_VIEW_URL.format(file_id="abc-123")),
+            other_drive,
+            no_sessions,
+        ]
+    ) == [youtube, drive, no_sessions, other_drive, no_sessions]
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from datetime import datetime
+
+import pytest
+import pytz
+from cdp_backend.pipeline.ingestion_models import Body, EventIngestionModel, Session
+
+from cdp_asheville_backend.replay import get_replay_scraper
+
+from .conftest import END, START
+
+###############################################################################
+
+# Longest a fake source waits on the test before giving up
+WAIT_SECONDS = 5
+
+
+def make_event(body_name, video_uri, agenda_uri=None):
+    return EventIngestionModel(
+        body=Body(name=body_name),
+        sessions=[
+            Session(
+                session_datetime=datetime(2023, 1, 5, 17, tzinfo=pytz.UTC),
+                video_uri=video_uri,
+                session_index=0,
+            )
+        ],
+        agenda_uri=agenda_uri,
+    )
+
+
+def video_uri(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def set_sources(monkeypatch, scraper, youtube, meetings):
+    monkeypatch.setattr(
+        scraper, "iter_board_events_from_youtube", lambda start, end: youtube()
+    )
+    monkeypatch.setattr(
+        scraper, "iter_council_meeting_events", lambda start, end: meetings()
+    )
+
+
+###############################################################################
+
+
+def test_youtube_events_streamed(replay_corpus, replay_range):
+    scraper = get_replay_scraper(replay_corpus)
+    expected = get_replay_scraper(replay_corpus).get_board_events_from_youtube(
+        *replay_range
+    )
+
+    # Every video but the first waits for the test
+    gate = threading.Event()
+    extracted = []
+    extract = scraper.video_resolver.extract
+
+    def gated_extract(url):
+        if url != expected[0].sessions[0].video_uri:
+            gate.wait(WAIT_SECONDS)
+        info = extract(url)
+        extracted.append(url)
+        return info
+
+    scraper.video_resolver.extract = gated_extract
+
+    # The first event arrives while the other videos are still resolving
+    events = scraper.iter_board_events_from_youtube(*replay_range)
+    first = next(events)
+    assert len(extracted) == 1
+
+    gate.set()
+    assert [first, *events] == expected
+
+
+def test_iter_events_streams_in_source_order(monkeypatch, replay_corpus):
+    scraper = get_replay_scraper(replay_corpus)
+    gate = threading.Event()
+
+    def youtube():
+        yield make_event("Board", video_uri("y0000000001"))
+        yield make_event("Board", video_uri("y0000000002"))
+        gate.wait(WAIT_SECONDS)
+        yield make_event("Board", video_uri("y0000000003"))
+
+    def meetings():
+        for video in range(1, 4):
+            yield make_event("City Council", video_uri(f"m000000000{video}"))
+
+    set_sources(monkeypatch, scraper, youtube, meetings)
+
+    # The events of the running sources are handed out before the slow one ends
+    events = scraper.iter_events(START, END)
+    gathered = [next(events) for _ in range(5)]
+    assert not gate.is_set()
+
+    gate.set()
+    gathered += list(events)
+
+    video_ids = [event.sessions[0].video_uri[-11:] for event in gathered]
+    assert [v for v in video_ids if v.startswith("y")] == [
+        "y0000000001",
+        "y0000000002",
+        "y0000000003",
+    ]
+    assert [v for v in video_ids if v.startswith("m")] == [
+        "m0000000001",
+        "m0000000002",
+        "m0000000003",
+    ]
+
+
+def test_iter_events_deduplicates(monkeypatch, replay_corpus):
+    # The meetings event of the video is built first
+    built = threading.Event()
+
+    def youtube():
+        built.wait(WAIT_SECONDS)
+        yield make_event("City Council", "https://youtu.be/c0000000001?si=share")
+
+    def meetings():
+        yield make_event(
+            "City Council", video_uri("c0000000001"), agenda_uri="agenda.pdf"
+        )
+        built.set()
+        yield make_event("City Council", video_uri("c0000000002"))
+
+    scraper = get_replay_scraper(replay_corpus)
+    set_sources(monkeypatch, scraper, youtube, meetings)
+    events = list(scraper.iter_events(START, END))
+
+    # The first event built is kept
+    assert len(events) == 2
+    assert events[0].sessions[0].video_uri == video_uri("c0000000001")
+    assert scraper.metrics.counters["events_duplicates"] == 1
+
+    # get_events() prefers the YouTube event, completed with the agenda
+    built.clear()
+    scraper = get_replay_scraper(replay_corpus)
+    set_sources(monkeypatch, scraper, youtube, meetings)
+    events = scraper.get_events(START, END)
+
+    assert len(events) == 2
+    assert events[0].sessions[0].video_uri.startswith("https://youtu.be/")
+    assert events[0].agenda_uri == "agenda.pdf"
+
+
+def test_iter_events_source_error(monkeypatch, replay_corpus):
+    scraper = get_replay_scraper(replay_corpus)
+    gate = threading.Event()
+    youtube_finished = threading.Event()
+    saved = []
+    monkeypatch.setattr(scraper, "save_checkpoints", lambda: saved.append(None))
+
+    def youtube():
+        try:
+            yield make_event("Board", video_uri("y0000000001"))
+            gate.wait(WAIT_SECONDS)
+            yield make_event("Board", video_uri("y0000000002"))
+        finally:
+            youtube_finished.set()
+
+    def meetings():
+        yield make_event("City Council", video_uri("m0000000001"))
+        raise RuntimeError("meetings endpoint failed")
+
+    set_sources(monkeypatch, scraper, youtube, meetings)
+
+    gathered = []
+    timer = threading.Timer(0.2, gate.set)
+    timer.start()
+    try:
+        with pytest.raises(RuntimeError, match="meetings endpoint failed"):
+            for event in scraper.iter_events(START, END):
+                gathered.append(event)
+    finally:
+        timer.cancel()
+        gate.set()
+
+    # The error is raised once the running source finished,
+    # and nothing is saved for a failed gather
+    assert youtube_finished.is_set()
+    assert video_uri("m0000000001") in [e.sessions[0].video_uri for e in gathered]
+    assert saved == []
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+import pytz
+from cdp_backend.pipeline.ingestion_models import Body, EventIngestionModel, Session
+
+from cdp_asheville_backend import known_sessions
+from cdp_asheville_backend.known_sessions import (
+    FIRESTORE_IN_LIMIT,
+    FirestoreSessionLookup,
+    ManifestSessionLookup,
+    MemorySessionCollection,
+    _video_key,
+    drop_known_sessions,
+)
+
+###############################################################################
+
+VIDEO_ID = "9giQGUCV9d0"
+WATCH_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+DRIVE_URL = "https://drive.google.com/uc?export=download&id=abc-123"
+
+
+def make_event(*video_uris):
+    date = datetime(2023, 1, 5, 17, tzinfo=pytz.UTC)
+    return EventIngestionModel(
+        body=Body(name="City Council"),
+        sessions=[
+            Session(session_datetime=date, video_uri=video_uri, session_index=index)
+            for index, video_uri in enumerate(video_uris)
+        ],
+    )
+
+
+def video_uri(index):
+    return f"https://www.youtube.com/watch?v=v{index:010d}"
+
+
+###############################################################################
+
+
+def test_video_key():
+    # Every URL form of a YouTube video shares its id as key
+    assert _video_key(WATCH_URL) == VIDEO_ID
+    assert _video_key(f"https://youtu.be/{VIDEO_ID}?si=share") == VIDEO_ID
+    assert _video_key(f"https://www.youtube.com/embed/{VIDEO_ID}") == VIDEO_ID
+    # Other videos are keyed by their URI
+    assert _video_key(DRIVE_URL) == DRIVE_URL
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / "cache" / "known-sessions.txt"
+    lookup = ManifestSessionLookup(path)
+    assert lookup.get_known([WATCH_URL]) == set()
+
+    lookup.add([WATCH_URL, f"https://youtu.be/{VIDEO_ID}", DRIVE_URL])
+    lookup.save()
+
+    # The second URL form of the video is not recorded again
+    assert path.read_text() == f"{WATCH_URL}\n{DRIVE_URL}\n"
+    assert list(path.parent.iterdir()) == [path]
+
+    reloaded = ManifestSessionLookup(path)
+    embed_url = f"https://www.youtube.com/embed/{VIDEO_ID}"
+    assert reloaded.get_known([embed_url, DRIVE_URL, video_uri(1)]) == {
+        embed_url,
+        DRIVE_URL,
+    }
+
+
+def test_manifest_save_replaces_atomically(tmp_path, monkeypatch):
+    path = tmp_path / "known-sessions.txt"
+    path.write_text(f"{WATCH_URL}\n")
+    lookup = ManifestSessionLookup(path)
+    lookup.add([DRIVE_URL])
+
+    # The new manifest is written aside and swapped in whole
+    replaced = []
+
+    def replace(src, dst):
+        assert path.read_text() == f"{WATCH_URL}\n"
+        assert src.read_text() == f"{WATCH_URL}\n{DRIVE_URL}\n"
+        replaced.append((src, dst))
+
+    monkeypatch.setattr(known_sessions.os, "replace", replace)
+    lookup.save()
+
+    assert replaced == [(path.with_suffix(".tmp"), path)]
+
+
+def test_firestore_lookup_chunks_queries():
+    stored = [video_uri(index) for index in range(0, 25, 2)]
+    collection = MemorySessionCollection(stored)
+    lookup = FirestoreSessionLookup(collection=collection)
+
+    queried = [video_uri(index) for index in range(25)]
+    # Duplicates are only queried once
+    assert lookup.get_known(queried + queried[:3]) == set(stored)
+
+    assert [len(values) for values in collection.queries] == [10, 10, 5]
+    assert sum(collection.queries, []) == queried
+    assert all(len(values) <= FIRESTORE_IN_LIMIT for values in collection.queries)
+
+
+def test_memory_collection_rejects_long_in_queries():
+    with pytest.raises(ValueError):
+        MemorySessionCollection().filter(
+            "video_uri", "in", [video_uri(i) for i in range(FIRESTORE_IN_LIMIT + 1)]
+        )
+
+
+@pytest.mark.parametrize("use_firestore", [False, True])
+def test_drop_known_sessions(tmp_path, use_firestore):
+    known = [video_uri(1), video_uri(2), video_uri(3)]
+    if use_firestore:
+        lookup = FirestoreSessionLookup(collection=MemorySessionCollection(known))
+    else:
+        lookup = ManifestSessionLookup(tmp_path / "known-sessions.txt")
+        lookup.add(known)
+
+    all_known = make_event(video_uri(1), video_uri(2))
+    partly_known = make_event(video_uri(3), video_uri(4))
+    new = make_event(video_uri(5))
+    no_sessions = make_event()
+
+    # Only events whose every session is known are dropped
+    assert drop_known_sessions(
+        [all_known, None, partly_known, new, no_sessions], lookup
+    ) == [partly_known, new, no_sessions]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from cdp_asheville_backend.metrics import GatherMetrics
+from cdp_asheville_backend.replay import get_replay_scraper
+
+from .conftest import END, START
+
+###############################################################################
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_metrics_summary_and_openmetrics():
+    clock = FakeClock()
+    metrics = GatherMetrics(clock=clock)
+
+    with pytest.raises(ValueError):
+        with metrics.span("source.meetings"):
+            clock.now += 2
+            raise ValueError()
+
+    for seconds, url in ((1, "https://a/1"), (3, "https://a/2")):
+        with metrics.timed("fetch", url):
+            clock.now += seconds
+    metrics.increment("http_bytes_downloaded", 100)
+
+    summary = json.loads(metrics.to_json())
+    assert summary["spans"]["source.meetings"]["total_seconds"] == 2
+    assert summary["latencies"]["fetch"]["count"] == 2
+    assert summary["latencies"]["fetch"]["slowest"][0]["url"] == "https://a/2"
+    assert summary["counters"] == {"http_bytes_downloaded": 100}
+
+    text = metrics.to_openmetrics()
+    assert 'cdp_asheville_span_seconds_sum{span="source.meetings"} 2' in text
+    assert 'cdp_asheville_request_seconds_count{kind="fetch"} 2' in text
+    assert "cdp_asheville_http_bytes_downloaded_total 100" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_get_events_writes_metrics(synthetic_corpus, tmp_path):
+    scraper = get_replay_scraper(synthetic_corpus, metrics_file=tmp_path / "m.txt")
+    events = scraper.get_events(START, END)
+
+    counters = scraper.metrics.summary()["counters"]
+    assert counters["events_duplicates"] == (
+        counters["events_youtube_channel"] + counters["events_meetings"] - len(events)
+    )
+    assert counters["http_requests"] > 0
+    assert "cdp_asheville_span_seconds_count" in (tmp_path / "m.txt").read_text()
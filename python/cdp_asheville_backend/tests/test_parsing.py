@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cdp_asheville_backend.parsing import BOARD_PAGE_ELEMENTS, parse_html
+from cdp_asheville_backend.replay import get_replay_scraper
+
+###############################################################################
+
+
+def test_find_board_meetings_same_in_both_modes(
+    replay_corpus, replay_range, board_pages
+):
+    full_scraper = get_replay_scraper(replay_corpus, lightweight_parsing=False)
+    lightweight_scraper = get_replay_scraper(replay_corpus, lightweight_parsing=True)
+    found = 0
+    for url, markup in board_pages[1:]:
+        full = full_scraper.find_board_meetings(parse_html(markup), *replay_range)
+        lightweight = lightweight_scraper.find_board_meetings(
+            parse_html(markup, BOARD_PAGE_ELEMENTS, lightweight=True), *replay_range
+        )
+
+        assert lightweight == full, url
+        found += len(full or [])
+
+    assert found
+
+
+def test_get_boards_same_in_both_modes(replay_corpus, replay_range):
+    events = {
+        lightweight: get_replay_scraper(
+            replay_corpus, lightweight_parsing=lightweight
+        ).load_board_and_commission_page(*replay_range)
+        for lightweight in (False, True)
+    }
+
+    assert events[False]
+    assert events[True] == events[False]
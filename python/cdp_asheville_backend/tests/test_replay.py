@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cdp_asheville_backend.replay import (
+    FixtureCorpus,
+    FixtureNotFound,
+    RecordingSession,
+    ReplaySession,
+    get_replay_scraper,
+    recording_ydl_factory,
+    replay_ydl_factory,
+)
+from cdp_asheville_backend.scraper import load_web_page
+from cdp_asheville_backend.throttle import RequestScheduler
+from cdp_asheville_backend.urls import get_video_id
+
+from .conftest import (
+    END,
+    N_BOARD_MEETINGS,
+    N_BOARDS,
+    N_CHANNEL_ONLY_VIDEOS,
+    N_COUNCIL_MEETINGS,
+    N_COUNCIL_PAGES,
+    START,
+    board_video_id,
+    council_video_id,
+)
+
+###############################################################################
+
+
+def test_replay_get_events(synthetic_corpus):
+    events = get_replay_scraper(synthetic_corpus).get_events(START, END)
+
+    video_ids = [get_video_id(event.sessions[0].video_uri) for event in events]
+    assert len(video_ids) == len(set(video_ids))
+    assert len(events) == (
+        N_COUNCIL_PAGES * N_COUNCIL_MEETINGS * 2 + N_CHANNEL_ONLY_VIDEOS
+    )
+
+    # Council videos are found on the channel and through the REST endpoint,
+    # the channel event is kept with the REST agenda merged in
+    council_event = next(
+        event
+        for event in events
+        if get_video_id(event.sessions[0].video_uri) == council_video_id(100, 0)
+    )
+    assert council_event.body.name == "City Council"
+    assert council_event.agenda_uri.endswith("id=a100")
+
+
+def test_replay_board_pages(synthetic_corpus):
+    scraper = get_replay_scraper(synthetic_corpus)
+    events = scraper.load_board_and_commission_page(START, END)
+
+    video_ids = {get_video_id(event.sessions[0].video_uri) for event in events}
+    assert len(events) == N_BOARDS * N_BOARD_MEETINGS
+    # The first meeting of each board links to a publicinput.com page
+    assert board_video_id(0, 0) in video_ids
+    assert scraper.agenda_date_parser.summary()["failed"] == 0
+
+
+def test_replay_missing_fixture(tmp_path):
+    session = ReplaySession(FixtureCorpus(tmp_path))
+
+    with pytest.raises(FixtureNotFound):
+        session.get("https://example.com/missing")
+    assert not load_web_page("https://example.com/missing", session=session).status
+
+    ydl = replay_ydl_factory(FixtureCorpus(tmp_path))({"ignoreerrors": True})
+    assert ydl.extract_info("https://www.youtube.com/watch?v=missingxxxx") is None
+
+
+def test_record_then_replay(tmp_path):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = f"<html><body>{self.path}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("X-WP-TotalPages", "3")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    class FakeYoutubeDL:
+        def __init__(self, ydl_opts):
+            pass
+
+        def extract_info(self, url, download=False):
+            return {"id": "abcdefghijk", "title": "Meeting", "formats": [{}] * 50}
+
+        def close(self):
+            pass
+
+    corpus = FixtureCorpus(tmp_path)
+    try:
+        recorded = RecordingSession(corpus, scheduler=RequestScheduler(rate=None)).get(
+            url, {"page": 2, "per_page": 10}
+        )
+        recorded_info = recording_ydl_factory(corpus, FakeYoutubeDL)({}).extract_info(
+            "https://www.youtube.com/watch?v=abcdefghijk"
+        )
+    finally:
+        server.shutdown()
+
+    replayed = ReplaySession(corpus).get(url, {"per_page": 10, "page": 2})
+    assert replayed.content == recorded.content
+    assert replayed.headers["X-WP-TotalPages"] == "3"
+
+    replayed_info = replay_ydl_factory(corpus)({}).extract_info(
+        "https://www.youtube.com/watch?v=abcdefghijk"
+    )
+    assert replayed_info == recorded_info
+    assert "formats" not in replayed_info
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError as YoutubeDLHTTPError
+from yt_dlp.networking.exceptions import TransportError
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from cdp_asheville_backend.throttle import (
+    RequestScheduler,
+    Retry,
+    TokenBucket,
+    get_http_retry,
+    get_youtube_dl_retry,
+    parse_retry_after,
+)
+
+###############################################################################
+
+URL = "https://www.ashevillenc.gov/wp-json/wp/v2/meetings"
+
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when slept on
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=response)
+
+
+def youtube_dl_error(status, retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    error = YoutubeDLHTTPError(
+        Response(io.BytesIO(), "https://www.youtube.com/", headers, status=status)
+    )
+    # yt-dlp reports extraction failures as a DownloadError wrapping the cause
+    try:
+        raise error
+    except YoutubeDLHTTPError:
+        return DownloadError(f"HTTP Error {status}", exc_info=sys.exc_info())
+
+
+def failing(errors, result="ok"):
+    """
+    Request raising errors in turn, then returning result
+    """
+    calls = []
+
+    def request():
+        calls.append(None)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return request, calls
+
+
+###############################################################################
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("-5") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+
+
+def test_parse_retry_after_http_date():
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+    assert parse_retry_after(format_datetime(later, usegmt=True)) == pytest.approx(
+        120, abs=2
+    )
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_get_http_retry():
+    assert get_http_retry(http_error(503, "7")) == Retry(True, 7)
+    assert get_http_retry(http_error(502)) == Retry(False, None)
+    assert get_http_retry(requests.ConnectionError()) == Retry()
+    assert get_http_retry(requests.Timeout()) == Retry()
+    assert get_http_retry(http_error(404)) is None
+    assert get_http_retry(ValueError()) is None
+
+
+def test_get_youtube_dl_retry():
+    assert get_youtube_dl_retry(youtube_dl_error(429, "3")) == Retry(True, 3)
+    assert (
+        get_youtube_dl_retry(
+            ExtractorError("Unable to download webpage", cause=TransportError())
+        )
+        == Retry()
+    )
+    assert get_youtube_dl_retry(youtube_dl_error(404)) is None
+    assert get_youtube_dl_retry(DownloadError("Video unavailable")) is None
+
+
+def test_token_bucket_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    # The burst is sent right away, then one request every 1 / rate seconds
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+    # Refilled by rate tokens a second, the reserved ones are paid back first
+    clock.now = 1
+    assert bucket.reserve() == 0.5
+
+    # Never more than burst tokens
+    clock.now = 100
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.5]
+
+
+def test_token_bucket_throttle():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, min_rate=0.5, clock=clock)
+
+    # Nothing is sent for the delay, then at half the rate
+    bucket.throttle(3)
+    assert bucket.rate == 1
+    assert bucket.reserve() == 3 + 1
+
+    for _ in range(5):
+        bucket.throttle(0)
+    assert bucket.rate == 0.5
+
+    bucket.recover()
+    assert bucket.rate == pytest.approx(0.7)
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 2
+
+
+def test_retry_after_seconds():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=None, sleep=clock.sleep, clock=clock)
+    request, calls = failing([http_error(503, "2")])
+
+    assert scheduler.call(URL, request) == "ok"
+    assert len(calls) == 2
+    assert clock.sleeps == [2]
+
+
+def test_retry_after_http_date():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=None, sleep=clock.sleep, clock=clock)
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    request, calls = failing([http_error(429, format_datetime(later, usegmt=True))])
+
+    assert scheduler.call(URL, request) == "ok"
+    assert clock.sleeps == [pytest.approx(30, abs=2)]
+
+
+def test_throttled_host_slows_down():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=1, burst=1, sleep=clock.sleep, clock=clock)
+    request, calls = failing([http_error(429, "5")])
+
+    # The retry waits the Retry-After, then a token at the halved rate
+    assert scheduler.call(URL, request) == "ok"
+    assert clock.sleeps == [5 + 2]
+
+    bucket = scheduler.get_bucket(URL)
+    assert bucket is scheduler.get_bucket(URL.upper())
+    assert bucket.rate == pytest.approx(0.6)
+
+
+def test_retry_after_past_max_delay():
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        rate=None, max_delay=60, sleep=clock.sleep, clock=clock
+    )
+    request, calls = failing([http_error(503, "120")])
+
+    with pytest.raises(requests.HTTPError):
+        scheduler.call(URL, request)
+    assert len(calls) == 1
+    assert clock.sleeps == []
+
+
+def test_max_attempts():
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        rate=None, max_attempts=3, backoff_base=1, sleep=clock.sleep, clock=clock
+    )
+    request, calls = failing([requests.ConnectionError()] * 5)
+
+    with pytest.raises(requests.ConnectionError):
+        scheduler.call(URL, request)
+
+    # Jittered backoff under 1s, then under 2s
+    assert len(calls) == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1
+    assert 0 <= clock.sleeps[1] <= 2
+
+
+@pytest.mark.parametrize("error", [http_error(404), http_error(403), ValueError()])
+def test_not_retried(error):
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=None, sleep=clock.sleep, clock=clock)
+    request, calls = failing([error])
+
+    with pytest.raises(type(error)):
+        scheduler.call(URL, request)
+    assert len(calls) == 1
+    assert clock.sleeps == []
+
+
+def test_youtube_dl_throttling_retried():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=None, sleep=clock.sleep, clock=clock)
+    request, calls = failing([youtube_dl_error(429, "4")], result={"id": "video"})
+
+    info = scheduler.call(
+        "https://www.youtube.com/watch?v=9giQGUCV9d0",
+        request,
+        get_retry=get_youtube_dl_retry,
+    )
+    assert info == {"id": "video"}
+    assert len(calls) == 2
+    assert clock.sleeps == [4]
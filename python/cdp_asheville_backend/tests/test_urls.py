@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from cdp_asheville_backend.urls import (
+    canonicalize_drive_link,
+    get_video_id,
+    parse_youtube_url,
+)
+
+###############################################################################
+
+VIDEO_ID = "9giQGUCV9d0"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        f"https://youtube.com/watch?feature=share&v={VIDEO_ID}&t=42",
+        f"https://m.youtube.com/watch?v={VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}?si=share",
+        f"https://www.youtube.com/embed/{VIDEO_ID}?modestbranding=1&hd=1&vq=hd720",
+        f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}",
+        f"https://www.youtube.com/live/{VIDEO_ID}?feature=share",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}",
+        f" https://www.youtube.com/v/{VIDEO_ID} ",
+    ],
+)
+def test_parse_youtube_url(url):
+    video = parse_youtube_url(url)
+
+    assert video.video_id == VIDEO_ID
+    assert video.canonical_url == f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.youtube.com/embed/live_stream?channel=UC123",
+        "https://www.youtube.com/embed/videoseries?list=PL123",
+        "https://www.youtube.com/@CityofAsheville/streams",
+        f"https://www.youtube.com/watch?v={VIDEO_ID}x",
+        f"https://vimeo.com/{VIDEO_ID}",
+        "https://publicinput.com/board-1",
+    ],
+)
+def test_parse_youtube_url_not_a_video(url):
+    assert parse_youtube_url(url) is None
+    assert get_video_id(url) is None
+
+
+def test_canonicalize_drive_link():
+    download_url = "https://drive.google.com/uc?export=download&id=abc-123"
+
+    assert (
+        canonicalize_drive_link("https://drive.google.com/file/d/abc-123/view")
+        == download_url
+    )
+    assert (
+        canonicalize_drive_link("https://drive.google.com/open?id=abc-123")
+        == download_url
+    )
+    assert (
+        canonicalize_drive_link("https://example.com/agenda.pdf?usp=sharing")
+        == "https://example.com/agenda.pdf"
+    )
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from yt_dlp.networking.exceptions import HTTPError as YoutubeDLHTTPError
+from yt_dlp.networking.exceptions import TransportError
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+###############################################################################
+
+# Statuses worth retrying. 429 and 503 also mean the host asks us to slow down.
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+THROTTLE_STATUSES = frozenset((429, 503))
+
+###############################################################################
+
+
+class Retry(NamedTuple):
+    # The host asked us to slow down, not just failed
+    throttled: bool = False
+    # Seconds the host asked us to wait
+    retry_after: Optional[float] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header in seconds or HTTP-date form,
+    None if value is missing or unreadable
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def _status_retry(status: int, retry_after: Optional[str]) -> Optional[Retry]:
+    if status not in RETRY_STATUSES:
+        return None
+
+    return Retry(status in THROTTLE_STATUSES, parse_retry_after(retry_after))
+
+
+def get_http_retry(e: BaseException) -> Optional[Retry]:
+    """
+    How to retry a failed requests call, None if it should not be retried
+    """
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return _status_retry(
+            e.response.status_code, e.response.headers.get("Retry-After")
+        )
+
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return Retry()
+
+    return None
+
+
+def _iter_causes(e: Optional[BaseException]) -> Iterator[BaseException]:
+    # yt-dlp wraps the HTTP error in DownloadError.exc_info
+    # and ExtractorError.cause
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        yield e
+        exc_info = getattr(e, "exc_info", None)
+        e = (
+            getattr(e, "cause", None)
+            or (exc_info[1] if exc_info else None)
+            or e.__cause__
+            or e.__context__
+        )
+
+
+def get_youtube_dl_retry(e: BaseException) -> Optional[Retry]:
+    """
+    How to retry a failed yt-dlp extraction, None if it should not be retried
+    """
+    for cause in _iter_causes(e):
+        if isinstance(cause, YoutubeDLHTTPError):
+            return _status_retry(
+                cause.status, cause.response.headers.get("Retry-After")
+            )
+
+        if isinstance(cause, TransportError):
+            return Retry()
+
+    return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that slows down when its host throttles us
+
+    Parameters
+    ----------
+    rate: float
+        Tokens added per second, the sustained request rate
+    burst: int
+        Tokens the bucket holds, the requests that can be sent at once
+    min_rate: float
+        Rate is never lowered below this by throttle()
+    clock: Callable[[], float]
+        Monotonic time source in seconds
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """
+        Take a token
+
+        Returns
+        -------
+        delay: float
+            Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = self._clock()
+            if now > self._updated:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+            self._tokens -= 1
+            return (self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def throttle(self, delay: float) -> None:
+        """
+        Send nothing for delay seconds and halve the rate
+        """
+        with self._lock:
+            self._updated = max(self._updated, self._clock() + delay)
+            self._tokens = min(self._tokens, 0.0)
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        """
+        Raise a throttled rate back towards max_rate after a success
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class RequestScheduler:
+    """
+    Per-host rate limiting and retries shared by every outbound request,
+    plain HTTP and yt-dlp alike
+
+    Each host gets a TokenBucket. Transient failures are retried after a
+    jittered exponential backoff, or after the host's Retry-After.
+    Throttling responses pause and slow down every request to that host.
+
+    Parameters
+    ----------
+    rate: Optional[float]
+        Requests per second sent to any single host.
+        None sends requests as they come, only retrying failures.
+    burst: int
+        Requests sent to a host at once before rate applies
+    max_attempts: int
+        Attempts per request, 1 disables retries
+    backoff_base: float
+        Seconds the backoff of the first retry is drawn under.
+        It doubles with every attempt.
+    max_delay: float
+        Longest wait before a retry. A request whose host asks for a longer
+        Retry-After fails instead.
+    sleep: Callable[[float], None]
+        Waits the given seconds
+    clock: Callable[[], float]
+        Monotonic time source of the hosts' TokenBuckets
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 5,
+        burst: int = 5,
+        max_attempts: int = 4,
+        backoff_base: float = 1,
+        max_delay: float = 60,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get_bucket(self, url: str) -> Optional[TokenBucket]:
+        """
+        TokenBucket of url's host, None without rate limiting
+        """
+        if self.rate is None:
+            return None
+
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(
+                    self.rate, self.burst, clock=self._clock
+                )
+            return self._buckets[host]
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full jitter backoff before retry number attempt (0-based)
+        """
+        return random.uniform(0, min(self.max_delay, self.backoff_base * 2**attempt))
+
+    def call(
+        self,
+        url: str,
+        request: Callable[[], T],
+        get_retry: Callable[[BaseException], Optional[Retry]] = get_http_retry,
+    ) -> T:
+        """
+        Send request to url's host once the host's limit allows it,
+        retrying transient failures
+
+        Parameters
+        ----------
+        url: str
+            URL request loads, used to pick the host's TokenBucket
+        request: Callable[[], T]
+            Sends the request
+        get_retry: Callable[[BaseException], Optional[Retry]]
+            How to retry an exception of request, None to raise it.
+            get_youtube_dl_retry for yt-dlp calls.
+
+        Returns
+        -------
+        result: T
+            What request returned
+
+        Raises
+        ------
+        Exception
+            What the last attempt of request raised
+        """
+        bucket = self.get_bucket(url)
+        attempt = 0
+        while True:
+            delay = bucket.reserve() if bucket is not None else 0
+            if delay > 0:
+                self._sleep(delay)
+
+            try:
+                result = request()
+            except Exception as e:
+                retry = get_retry(e)
+                attempt += 1
+                if retry is None or attempt >= self.max_attempts:
+                    raise
+
+                delay = retry.retry_after
+                if delay is None:
+                    delay = self.backoff(attempt - 1)
+                elif delay > self.max_delay:
+                    raise
+
+                log.warning(
+                    f"Retrying {url} in {delay:.1f}s "
+                    f"(attempt {attempt} of {self.max_attempts}): {str(e)}"
+                )
+                if retry.throttled and bucket is not None:
+                    # Held back by the next reserve(),
+                    # along with every other request to the host
+                    bucket.throttle(delay)
+                else:
+                    self._sleep(delay)
+                continue
+
+            if bucket is not None:
+                bucket.recover()
+            return result
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+###############################################################################
+
+# youtube.com/watch?v=ID, youtu.be/ID, youtube.com/embed|live|shorts|v/ID,
+# on www., m., music. or youtube-nocookie.com, with any trailing query
+# (share tokens like ?si=, &t=, ?feature=share, embed player options).
+# embed/videoseries?list= and embed/live_stream?channel= are 11 characters
+# long too, but are a playlist and a channel's live stream, not a video.
+YOUTUBE_URL = re.compile(
+    r"^(?:https?:)?(?://)?(?:(?:www|m|music)\.)?"
+    r"(?:youtube\.com|youtube-nocookie\.com|youtu\.be)/"
+    r"(?:watch\?(?:[^#]*&)?v=|embed/|live/|shorts/|v/)?"
+    r"(?!videoseries|live_stream)([\w-]{11})(?![\w-])",
+    re.IGNORECASE,
+)
+
+# drive.google.com/file/d/ID/view, drive.google.com/open?id=ID,
+# drive.google.com/uc?export=download&id=ID
+DRIVE_URL = re.compile(
+    r"^https?://drive\.google\.com/"
+    r"(?:file/d/|open\?(?:[^#]*&)?id=|uc\?(?:[^#]*&)?id=)"
+    r"([\w-]+)",
+    re.IGNORECASE,
+)
+
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
+DRIVE_DOWNLOAD_URL = "https://drive.google.com/uc?export=download&id={file_id}"
+
+###############################################################################
+
+
+class YouTubeVideo(NamedTuple):
+    video_id: str
+    canonical_url: str
+
+
+@lru_cache(maxsize=4096)
+def parse_youtube_url(url: str) -> Optional[YouTubeVideo]:
+    """
+    Parse any form of YouTube video URL
+
+    Parameters
+    ----------
+    url: str
+        URL to parse
+
+    Returns
+    -------
+    video: Optional[YouTubeVideo]
+        Video ID and https://www.youtube.com/watch?v= URL,
+        None if url is not a YouTube video URL
+    """
+    match = YOUTUBE_URL.match(url.strip())
+    if match is None:
+        return None
+
+    video_id = match.group(1)
+    return YouTubeVideo(video_id, YOUTUBE_WATCH_URL.format(video_id=video_id))
+
+
+def get_video_id(url: str) -> Optional[str]:
+    """
+    YouTube video ID in url, None if url is not a YouTube video URL
+    """
+    video = parse_youtube_url(url)
+    return video.video_id if video is not None else None
+
+
+@lru_cache(maxsize=4096)
+def canonicalize_drive_link(url: str) -> str:
+    """
+    Direct download URL for a Google Drive file link
+
+    Parameters
+    ----------
+    url: str
+        Link to canonicalize
+
+    Returns
+    -------
+    url: str
+        https://drive.google.com/uc?export=download&id= URL for Drive file
+        links, other links with only the ?usp=sharing suffix removed
+    """
+    url = url.strip()
+    match = DRIVE_URL.match(url)
+    if match is None:
+        return url.replace("?usp=sharing", "")
+
+    return DRIVE_DOWNLOAD_URL.format(file_id=match.group(1))
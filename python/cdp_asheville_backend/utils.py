@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+
+###############################################################################
+
+CACHE_DIR_ENV = "CDP_ASHEVILLE_CACHE_DIR"
+
+###############################################################################
+
+
+def get_cache_dir() -> Path:
+    """
+    Directory for state persisted between gathers
+
+    Returns
+    -------
+    cache_dir: Path
+        $CDP_ASHEVILLE_CACHE_DIR if set, ~/.cache/cdp-asheville otherwise.
+        Created if it does not exist.
+    """
+    cache_dir = Path(
+        os.environ.get(CACHE_DIR_ENV) or Path.home() / ".cache" / "cdp-asheville"
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from yt_dlp import YoutubeDL
+
+from .metrics import GatherMetrics
+from .throttle import RequestScheduler, get_youtube_dl_retry
+from .urls import get_video_id
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Only these fields are kept from yt-dlp info dicts,
+# the rest (formats, thumbnails, ...) is large and unused
+INFO_FIELDS = (
+    "id",
+    "title",
+    "original_url",
+    "webpage_url",
+    "release_timestamp",
+    "timestamp",
+    "upload_date",
+    "live_status",
+    "is_live",
+    "was_live",
+    "duration",
+)
+
+# Live, upcoming and just finished streams can still change
+UNSETTLED_LIVE_STATUSES = ("is_live", "is_upcoming", "post_live")
+
+###############################################################################
+
+
+def slim_info(info: dict) -> dict:
+    """
+    Copy of a yt-dlp info dict with only INFO_FIELDS
+    """
+    return {field: info.get(field) for field in INFO_FIELDS}
+
+
+class VideoMetadataCache:
+    """
+    Persistent SQLite cache of video metadata keyed by video ID
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        SQLite database file
+    ttl: float
+        Seconds metadata of finished videos is kept
+    live_ttl: float
+        Seconds metadata of live, upcoming or just finished streams is kept
+    max_entries: int
+        Least recently used entries above this count are evicted
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: float = 90 * 24 * 3600,
+        live_ttl: float = 3600,
+        max_entries: int = 10000,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.live_ttl = live_ttl
+        self.max_entries = max_entries
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS video_metadata ("
+                "video_id TEXT PRIMARY KEY, "
+                "info TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS video_metadata_accessed_at "
+                "ON video_metadata (accessed_at)"
+            )
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """
+        Cached metadata for video_id, None if missing or expired
+        """
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT info, expires_at FROM video_metadata WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            info, expires_at = row
+            if expires_at <= now:
+                self._db.execute(
+                    "DELETE FROM video_metadata WHERE video_id = ?", (video_id,)
+                )
+                return None
+
+            self._db.execute(
+                "UPDATE video_metadata SET accessed_at = ? WHERE video_id = ?",
+                (now, video_id),
+            )
+            return json.loads(info)
+
+    def put(self, video_id: str, info: dict) -> None:
+        """
+        Store metadata for video_id with a TTL based on its live status
+        """
+        now = time.time()
+        if info.get("is_live") or info.get("live_status") in UNSETTLED_LIVE_STATUSES:
+            ttl = self.live_ttl
+        else:
+            ttl = self.ttl
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO video_metadata "
+                "(video_id, info, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (video_id, json.dumps(slim_info(info)), now + ttl, now),
+            )
+            self._db.execute(
+                "DELETE FROM video_metadata WHERE video_id IN ("
+                "SELECT video_id FROM video_metadata "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class VideoMetadataResolver:
+    """
+    Resolve yt-dlp metadata for many video URLs through a shared pool of
+    reused YoutubeDL extractors.
+
+    Every video is extracted at most once per resolver, whatever the form of
+    its URL, so the same video referenced by several sources costs one
+    extraction.
+    With a cache, videos extracted by earlier gathers are not extracted again.
+
+    Parameters
+    ----------
+    max_workers: int
+        Number of videos extracted in parallel,
+        which is also the maximum number of YoutubeDL instances created
+    ydl_opts: Optional[dict]
+        Options passed to every YoutubeDL instance
+    ydl_factory: Callable[[dict], YoutubeDL]
+        Creates a YoutubeDL-like extractor from ydl_opts
+    cache: Optional[VideoMetadataCache]
+        Persistent metadata cache consulted before extracting
+    scheduler: Optional[RequestScheduler]
+        Per-host rate limiter and retry policy every extraction goes through.
+        Default creates one with default limits.
+    metrics: Optional[GatherMetrics]
+        Records extraction latencies and metadata cache hits.
+        Default creates one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        ydl_opts: Optional[dict] = None,
+        ydl_factory: Callable[[dict], Any] = YoutubeDL,
+        cache: Optional[VideoMetadataCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[GatherMetrics] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.ydl_opts = ydl_opts or {}
+        self.ydl_factory = ydl_factory
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.metrics = metrics or GatherMetrics()
+
+        self._lock = threading.Lock()
+        self._extractors: List[Any] = []
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._resolved: Dict[str, Optional[dict]] = {}
+
+    @contextmanager
+    def extractor(self) -> Iterator[Any]:
+        """
+        Borrow a YoutubeDL instance from the pool for the duration of the block
+        """
+        try:
+            ydl = self._idle.get_nowait()
+        except queue.Empty:
+            ydl = self.ydl_factory(dict(self.ydl_opts))
+            with self._lock:
+                self._extractors.append(ydl)
+
+        try:
+            yield ydl
+        finally:
+            self._idle.put(ydl)
+
+    def extract(self, url: str) -> Optional[dict]:
+        """
+        Extract metadata for a single video without downloading it
+
+        Returns
+        -------
+        info: Optional[dict]
+            yt-dlp info dict reduced to INFO_FIELDS, None if extraction failed
+        """
+        video_id = get_video_id(url)
+
+        if self.cache is not None and video_id is not None:
+            info = self.cache.get(video_id)
+            if info is not None:
+                self.metrics.increment("video_metadata_cache_hits")
+                return info
+
+            self.metrics.increment("video_metadata_cache_misses")
+
+        try:
+            with self.extractor() as ydl, self.metrics.timed("extract", url):
+                info = self.scheduler.call(
+                    url,
+                    lambda: ydl.extract_info(url, download=False),
+                    get_youtube_dl_retry,
+                )
+                info = slim_info(info)
+        except BaseException as e:
+            log.error(f"Failed to open {url}: {str(e)}")
+            self.metrics.increment("video_extract_failures")
+            return None
+
+        if self.cache is not None and video_id is not None:
+            self.cache.put(video_id, info)
+
+        return info
+
+    def resolve(self, urls: Iterable[Optional[str]]) -> Dict[str, Optional[dict]]:
+        """
+        Deduplicate urls and extract the ones not seen before in parallel
+
+        Parameters
+        ----------
+        urls: Iterable[Optional[str]]
+            Processed video URLs, None entries are ignored
+
+        Returns
+        -------
+        video_info: Dict[str, Optional[dict]]
+            url -> yt-dlp info dict, None for videos that failed to extract
+        """
+        return dict(self.iter_resolve(urls))
+
+    def iter_resolve(
+        self, urls: Iterable[Optional[str]]
+    ) -> Iterator[Tuple[str, Optional[dict]]]:
+        """
+        resolve() yielding each url as soon as it and the urls before it
+        are extracted, rather than once all of them are
+
+        Parameters
+        ----------
+        urls: Iterable[Optional[str]]
+            Processed video URLs, None entries are ignored
+
+        Returns
+        -------
+        video_info: Iterator[Tuple[str, Optional[dict]]]
+            (url, yt-dlp info dict) in urls order without duplicates,
+            None for videos that failed to extract
+        """
+        requested = [url for url in dict.fromkeys(urls) if url is not None]
+
+        # Key by video ID so different URLs of one video are extracted once
+        keys = {url: get_video_id(url) or url for url in requested}
+
+        with self._lock:
+            # First URL of each video not resolved yet
+            pending: Dict[str, str] = {}
+            for url in requested:
+                if keys[url] not in self._resolved:
+                    pending.setdefault(keys[url], url)
+
+        with ExitStack() as stack:
+            if len(pending) > 1 and self.max_workers > 1:
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=self.max_workers)
+                )
+                infos = executor.map(self.extract, pending.values())
+            else:
+                infos = map(self.extract, pending.values())
+
+            # Extracted in pending order, which follows urls order
+            extracted = zip(pending, infos)
+            for url in requested:
+                while True:
+                    with self._lock:
+                        if keys[url] in self._resolved:
+                            info = self._resolved[keys[url]]
+                            break
+
+                    key, info = next(extracted)
+                    with self._lock:
+                        self._resolved[key] = info
+
+                yield url, info
+
+            # Videos a concurrent resolve() stored first
+            for key, info in extracted:
+                with self._lock:
+                    self._resolved[key] = info
+
+    def close(self) -> None:
+        """
+        Close every YoutubeDL instance created by this resolver
+        """
+        with self._lock:
+            extractors, self._extractors = self._extractors, []
+            self._idle = queue.LifoQueue()
+
+        for ydl in extractors:
+            ydl.close()
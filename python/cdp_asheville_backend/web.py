@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import GatherMetrics
+from .throttle import RequestScheduler
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/35.0.1916.47 Safari/537.36"
+)
+
+###############################################################################
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class MemoryResponseStore:
+    """
+    Keep cached responses in memory for the lifetime of the store
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses: Dict[str, CachedResponse] = {}
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._responses.get(url)
+
+    def put(self, url: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._responses[url] = response
+
+
+class DiskResponseStore:
+    """
+    Keep cached responses as files in a directory
+
+    Parameters
+    ----------
+    directory: Union[str, Path]
+        Directory holding one body and one metadata file per URL
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        path = self._path(url)
+        try:
+            meta = json.loads(path.with_suffix(".json").read_text())
+            body = path.with_suffix(".body").read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        return CachedResponse(body, meta.get("etag"), meta.get("last_modified"))
+
+    def put(self, url: str, response: CachedResponse) -> None:
+        path = self._path(url)
+        meta = {
+            "url": url,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+        }
+
+        # Write the body before the metadata and replace atomically,
+        # so a concurrent get() never pairs metadata with a partial body
+        for suffix, data in (
+            (".body", response.body),
+            (".json", json.dumps(meta).encode("utf-8")),
+        ):
+            tmp_path = path.with_suffix(f"{suffix}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path.with_suffix(suffix))
+
+
+class HttpSession:
+    """
+    Connection-pooled keep-alive session shared by every scraper request
+
+    Parameters
+    ----------
+    max_connections_per_host: int
+        Size of each host's connection pool.
+        Requests beyond it wait for a free connection.
+    max_hosts: int
+        Number of per-host connection pools kept alive
+    timeout: float
+        Seconds to wait for a server response
+    scheduler: Optional[RequestScheduler]
+        Per-host rate limiter and retry policy every request goes through.
+        Default creates one with default limits.
+    metrics: Optional[GatherMetrics]
+        Records request latencies, bytes downloaded and cache hits.
+        Default creates one.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 4,
+        max_hosts: int = 10,
+        timeout: float = 30,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional[GatherMetrics] = None,
+    ):
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+        self.metrics = metrics or GatherMetrics()
+
+        adapter = HTTPAdapter(
+            pool_connections=max_hosts,
+            pool_maxsize=max(1, max_connections_per_host),
+            pool_block=True,
+        )
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = USER_AGENT
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        GET url, raising for error statuses.
+        Transient failures are retried by the scheduler.
+
+        Raises
+        ------
+        requests.RequestException
+            If url could not be loaded
+        """
+        with self.metrics.timed(
+            "fetch", f"{url}?{urlencode(params)}" if params else url
+        ):
+            resp = self.scheduler.call(url, lambda: self.send(url, params, headers))
+
+        self.metrics.increment("http_requests")
+        self.metrics.increment("http_bytes_downloaded", len(resp.content))
+        return resp
+
+    def send(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        Send a single GET request, raising for error statuses
+        """
+        resp = self._session.get(
+            url, params=params, headers=headers, timeout=self.timeout
+        )
+        resp.raise_for_status()
+        return resp
+
+    def fetch(self, url: str, store=None) -> bytes:
+        """
+        Fetch url, revalidating any response cached in store
+
+        Parameters
+        ----------
+        url: str
+            URL to fetch
+        store: Optional[Union[MemoryResponseStore, DiskResponseStore]]
+            Response cache. When it has a response for url,
+            If-None-Match / If-Modified-Since are sent and a 304 reuses its body.
+
+        Returns
+        -------
+        body: bytes
+            Decompressed response body
+
+        Raises
+        ------
+        requests.RequestException
+            If url could not be loaded
+        """
+        headers = {}
+
+        cached = store.get(url) if store is not None else None
+        if cached is not None:
+            if cached.etag is not None:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified is not None:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        resp = self.get(url, headers=headers)
+
+        if resp.status_code == 304 and cached is not None:
+            log.debug(f"Not modified: {url}")
+            self.metrics.increment("http_cache_hits")
+            return cached.body
+
+        if store is not None:
+            self.metrics.increment("http_cache_misses")
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if store is not None and (etag is not None or last_modified is not None):
+            store.put(url, CachedResponse(resp.content, etag, last_modified))
+
+        return resp.content
+
+    def close(self) -> None:
+        self._session.close()
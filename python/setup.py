@@ -8,6 +8,7 @@ from setuptools import find_packages, setup
 requirements = [
     "cdp-scrapers[portland]>=0.4.0",
     "cdp-backend[pipeline] @ git+https://github.com/sunshine-request/cdp-backend@v4.1.1",
+    "requests>=2.28",
     "spacy-transformers",
     "en_core_web_trf @ https://github.com/explosion/spacy-models/releases/download/en_core_web_trf-3.7.2/en_core_web_trf-3.7.2-py3-none-any.whl"
 ]
@@ -16,6 +17,8 @@ test_requirements = [
     "black>=19.10b0",
     "flake8>=3.8.3",
     "flake8-debugger>=3.2.1",
+    "pytest>=7.0",
+    "pytest-benchmark>=4.0",
 ]
 
 dev_requirements = [